@@ -13,18 +13,24 @@ Workflow:
 4. Process results and generate comparison reports
 5. Generate AI-driven analysis using Ollama
 
-Supported test modes: standard, batch, concurrent, streaming, scenarios
+Supported test modes: standard, batch, concurrent, streaming, scenarios, conversation, cache, multicore, throughput,
+soak
 Supported agent types: HelloWorld, AzureOpenAI, Ollama, All
 """
 
 import argparse
+import asyncio
+import csv
 import glob
 import json
 import os
 import platform
 import shutil
+import statistics
 import subprocess
 import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -39,6 +45,13 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
 
 DEFAULT_TEST_MODE = "standard"
 DEFAULT_MODEL = "ministral-3"
@@ -109,6 +122,117 @@ def clean_old_metrics(script_dir: str) -> int:
     print()
 
 
+def build_test_env(test_config: Dict[str, Any]) -> Dict[str, str]:
+    """Build the environment passed to agent test processes."""
+    env = os.environ.copy()
+    env["TEST_MODE"] = test_config["test_mode"]
+    env["ITERATIONS"] = str(test_config["iterations"])
+    env["BATCH_SIZE"] = str(test_config["batch_size"])
+    env["CONCURRENT_REQUESTS"] = str(test_config["concurrent_requests"])
+    env["OLLAMA_MODEL_NAME"] = test_config["model"]
+
+    # Adaptive termination: ITERATIONS acts as the upper bound unless --max-iterations is set
+    if test_config.get("adaptive"):
+        env["ADAPTIVE_ITERATIONS"] = "1"
+        env["TARGET_CI_WIDTH"] = str(test_config["target_ci_width"])
+        env["MIN_ITERATIONS"] = str(test_config["min_iterations"])
+        env["MAX_ITERATIONS"] = str(test_config["max_iterations"] or test_config["iterations"])
+        env["CI_STATISTIC"] = test_config["ci_statistic"]
+
+    if test_config.get("allocation_profiling"):
+        env["ALLOCATION_PROFILING"] = "1"
+
+    if test_config.get("trace_phases"):
+        env["TRACE_PHASES"] = "1"
+        env["TRACE_FORMAT"] = test_config.get("trace_format", "chrome")
+
+    if test_config.get("http_timing"):
+        env["HTTP_TIMING"] = "1"
+
+    if test_config.get("process_workers"):
+        env["PROCESS_WORKERS"] = str(test_config["process_workers"])
+
+    if test_config.get("test_mode") == "throughput":
+        env["THROUGHPUT_MAX_CONCURRENCY"] = str(test_config.get("max_concurrency", 64))
+
+    if test_config.get("test_mode") == "soak":
+        env["SOAK_DURATION_S"] = str(test_config.get("soak_duration", 300))
+        if test_config.get("soak_warmup") is not None:
+            env["SOAK_WARMUP_S"] = str(test_config["soak_warmup"])
+
+    if test_config.get("conversation_turns"):
+        env["CONVERSATION_TURNS"] = str(test_config["conversation_turns"])
+
+    # Client-side load balancing over several Ollama hosts (Python Ollama agent)
+    if test_config.get("ollama_hosts"):
+        env["OLLAMA_HOSTS"] = test_config["ollama_hosts"]
+        env["LB_POLICY"] = test_config.get("lb_policy", "round_robin")
+
+    if test_config.get("single_flight"):
+        env["SINGLE_FLIGHT"] = "1"
+    if test_config.get("duplicate_ratio"):
+        env["DUPLICATE_RATIO"] = str(test_config["duplicate_ratio"])
+
+    # Per-request timeout, retries and circuit breaker (Python Ollama and Azure OpenAI agents)
+    if test_config.get("request_timeout"):
+        env["REQUEST_TIMEOUT_S"] = str(test_config["request_timeout"])
+    if test_config.get("max_retries"):
+        env["MAX_RETRIES"] = str(test_config["max_retries"])
+        env["RETRY_BACKOFF_MS"] = str(test_config.get("retry_backoff_ms", 200))
+    if test_config.get("breaker_failures"):
+        env["BREAKER_FAILURES"] = str(test_config["breaker_failures"])
+
+    # Response cache: enabled by --response-cache, always on in cache mode
+    if test_config.get("response_cache"):
+        env["RESPONSE_CACHE"] = "1"
+    if test_config.get("response_cache") or test_config.get("test_mode") == "cache":
+        env["CACHE_BACKEND"] = test_config.get("cache_backend", "memory")
+        env["CACHE_MAX_ENTRIES"] = str(test_config.get("cache_max_entries", 1000))
+        env["CACHE_REPEAT_RATIO"] = str(test_config.get("cache_repeat_ratio", 0.5))
+        if test_config.get("cache_ttl"):
+            env["CACHE_TTL_SECONDS"] = str(test_config["cache_ttl"])
+        if test_config.get("cache_path"):
+            env["CACHE_PATH"] = test_config["cache_path"]
+
+    if test_config.get("prompt_corpus"):
+        env["PROMPT_CORPUS"] = test_config["prompt_corpus"]
+        env["CORPUS_SEED"] = str(test_config.get("corpus_seed", 42))
+    if test_config.get("trace_replay"):
+        env["TRACE_REPLAY"] = test_config["trace_replay"]
+        env["REPLAY_SPEEDUP"] = str(test_config.get("replay_speedup", 1.0))
+
+    # Per-run overrides (GC settings, matrix/sweep points, ...)
+    env.update(test_config.get("extra_env") or {})
+
+    return env
+
+
+def dotnet_app_command(agent_dir: str, env: Dict[str, str]) -> List[str]:
+    """
+    Command running the built agent assembly directly (dotnet <TargetPath>).
+
+    `dotnet run` keeps the CLI host and an incremental MSBuild pass (plus any MSBuild nodes)
+    in the process tree, which would be measured and constrained along with the agent.
+    Falls back to `dotnet run --no-build` if the target path cannot be resolved.
+    """
+    try:
+        result = subprocess.run(
+            ["dotnet", "msbuild", "-nologo", "-getProperty:TargetPath"],
+            cwd=agent_dir,
+            env=env,
+            capture_output=True,
+            check=False,
+            text=True,
+        )
+        lines = result.stdout.strip().splitlines() if result.returncode == 0 else []
+        target_path = lines[-1].strip() if lines else ""
+    except OSError:
+        target_path = ""
+    if target_path.endswith(".dll") and os.path.isfile(target_path):
+        return ["dotnet", target_path]
+    return ["dotnet", "run", "--no-build"]
+
+
 def run_dotnet_test(
     agent_dir: str, agent_name: str, test_config: Dict[str, Any]
 ) -> bool:
@@ -123,15 +247,12 @@ def run_dotnet_test(
     print_colored(f"Running .NET {agent_name} test...", "YELLOW")
 
     # Set environment variables
-    env = os.environ.copy()
-    env["TEST_MODE"] = test_config["test_mode"]
-    env["ITERATIONS"] = str(test_config["iterations"])
-    env["BATCH_SIZE"] = str(test_config["batch_size"])
-    env["CONCURRENT_REQUESTS"] = str(test_config["concurrent_requests"])
-    env["OLLAMA_MODEL_NAME"] = test_config["model"]
+    env = build_test_env(test_config)
+    profile = test_config.get("resource_profile")
+    before = set(glob.glob(os.path.join(agent_dir, "metrics_*.json")))
 
     try:
-        # Build
+        # Build (unconstrained: only the test run emulates the target container)
         result = subprocess.run(
             ["dotnet", "build"],
             cwd=agent_dir,
@@ -142,16 +263,27 @@ def run_dotnet_test(
         if result.returncode != 0:
             print_colored(f"Failed to build .NET project: {result.stderr.decode()}", "RED")
             return False
+        command = dotnet_app_command(agent_dir, env)
 
-        # Run
-        result = subprocess.run(
-            ["dotnet", "run"],
-            cwd=agent_dir,
-            env=env,
-            check=False,
+        if test_config.get("trials", 1) > 1:
+            # Trials share one project directory and metrics location, so .NET trials are sequential
+            completed = run_trials(
+                command, agent_dir, f".NET {agent_name}", env, test_config, parallel=False
+            )
+            annotate_metrics_files(_new_metrics_files(agent_dir, before), profile)
+            return completed
+
+        # Run the built assembly, so the monitored and constrained tree is the agent alone
+        returncode, usage = run_monitored(
+            constrained_command(command, profile),
+            agent_dir,
+            constrained_env(env, profile),
+            test_config,
+            preexec_fn=_child_preexec(profile=profile),
         )
 
-        if result.returncode == 0:
+        if returncode == 0:
+            annotate_metrics_files(_new_metrics_files(agent_dir, before), profile, usage)
             print_colored(f"[OK] .NET {agent_name} test completed", "GREEN")
         else:
             print_colored(f"[FAILED] .NET {agent_name} test failed", "RED")
@@ -179,12 +311,7 @@ def run_python_test(
     print_colored(f"Running Python {agent_name} test...", "YELLOW")
 
     # Set environment variables
-    env = os.environ.copy()
-    env["TEST_MODE"] = test_config["test_mode"]
-    env["ITERATIONS"] = str(test_config["iterations"])
-    env["BATCH_SIZE"] = str(test_config["batch_size"])
-    env["CONCURRENT_REQUESTS"] = str(test_config["concurrent_requests"])
-    env["OLLAMA_MODEL_NAME"] = test_config["model"]
+    env = build_test_env(test_config)
     env["OLLAMA_CHAT_MODEL_ID"] = test_config["model"]
 
     python_exe = find_python_executable()
@@ -197,15 +324,31 @@ def run_python_test(
         print()
         return True
 
-    try:
-        result = subprocess.run(
+    profile = test_config.get("resource_profile")
+    before = set(glob.glob(os.path.join(agent_dir, "metrics_*.json")))
+    if test_config.get("trials", 1) > 1:
+        completed = run_trials(
             [python_exe, "main.py"],
-            cwd=agent_dir,
-            env=env,
-            check=False,
+            agent_dir,
+            f"Python {agent_name}",
+            env,
+            test_config,
+            parallel=test_config.get("parallel_trials", False),
         )
+        annotate_metrics_files(_new_metrics_files(agent_dir, before), profile)
+        return completed
 
-        if result.returncode == 0:
+    try:
+        returncode, usage = run_monitored(
+            constrained_command([python_exe, "main.py"], profile),
+            agent_dir,
+            constrained_env(env, profile),
+            test_config,
+            preexec_fn=_child_preexec(profile=profile),
+        )
+
+        if returncode == 0:
+            annotate_metrics_files(_new_metrics_files(agent_dir, before), profile, usage)
             print_colored(f"[OK] Python {agent_name} test completed", "GREEN")
         else:
             print_colored(f"[FAILED] Python {agent_name} test failed", "RED")
@@ -225,6 +368,695 @@ def run_python_test(
     return True
 
 
+# ============================================================================
+# Resource Profiles (constrained agent processes)
+# ============================================================================
+
+# Container sizes to emulate: number of CPUs and memory limit
+RESOURCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "1cpu-512mb": {"cpus": 1, "memory_mb": 512},
+    "1cpu-1gb": {"cpus": 1, "memory_mb": 1024},
+    "2cpu-2gb": {"cpus": 2, "memory_mb": 2048},
+    "4cpu-4gb": {"cpus": 4, "memory_mb": 4096},
+}
+
+_cgroup_scopes: Optional[bool] = None
+
+
+def cgroup_scopes_available() -> bool:
+    """Whether systemd-run can start a process in its own memory-limited cgroup scope (probed once)."""
+    global _cgroup_scopes
+    if _cgroup_scopes is None:
+        _cgroup_scopes = False
+        if shutil.which("systemd-run"):
+            try:
+                probe = subprocess.run(
+                    ["systemd-run", "--user", "--scope", "--quiet", "-p", "MemoryMax=64M", "true"],
+                    capture_output=True,
+                    check=False,
+                    timeout=10,
+                )
+                _cgroup_scopes = probe.returncode == 0
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+    return _cgroup_scopes
+
+
+def resolve_resource_profile(
+    name: Optional[str], cpu_set: List[int], memory_mb: Optional[int], nice: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Limits for agent processes from a named profile and explicit overrides (Linux only).
+
+    CPUs become an affinity mask: the CPUs in cpu_set, else the first N CPUs this process may
+    run on. Memory is enforced by a systemd-run cgroup scope (MemoryMax, no swap) when one can
+    be created, else by RLIMIT_DATA, which caps committed private memory rather than RSS; with
+    the rlimit the .NET GC heap limit is set explicitly since the runtime only detects cgroup
+    limits. Returns None when nothing is constrained. The returned dict is recorded as
+    TestInfo.ResourceProfile of every metrics file written under it.
+    """
+    base = RESOURCE_PROFILES.get(name, {}) if name else {}
+    memory_mb = memory_mb if memory_mb is not None else base.get("memory_mb")
+    if not (base or cpu_set or memory_mb or nice):
+        return None
+    if not hasattr(os, "sched_setaffinity"):
+        print_colored("Resource profiles need Linux (CPU affinity, rlimits); running unconstrained", "YELLOW")
+        return None
+
+    host_cpus = sorted(os.sched_getaffinity(0))
+    cpus = [cpu for cpu in cpu_set if cpu in host_cpus]
+    if cpu_set and len(cpus) < len(cpu_set):
+        print_colored(f"CPUs {sorted(set(cpu_set) - set(cpus))} are not available to this process, ignoring them", "YELLOW")
+    if not cpu_set and base.get("cpus"):
+        if base["cpus"] > len(host_cpus):
+            print_colored(f"Profile {name} wants {base['cpus']} CPUs but only {len(host_cpus)} are available", "YELLOW")
+        cpus = host_cpus[: base["cpus"]]
+
+    enforcement = None
+    if memory_mb:
+        enforcement = "cgroup" if cgroup_scopes_available() else "rlimit"
+    return {
+        "Name": name or "custom",
+        "Cpus": cpus,
+        "HostCpus": len(host_cpus),
+        "MemoryLimitMB": memory_mb,
+        "MemoryEnforcement": enforcement,
+        "Nice": nice,
+    }
+
+
+def describe_resource_profile(profile: Dict[str, Any]) -> str:
+    """One-line summary of a resolved profile."""
+    parts = [profile["Name"]]
+    if profile.get("Cpus"):
+        parts.append(f"CPUs {','.join(str(cpu) for cpu in profile['Cpus'])} of {profile['HostCpus']}")
+    if profile.get("MemoryLimitMB"):
+        parts.append(f"{profile['MemoryLimitMB']} MB ({profile['MemoryEnforcement']})")
+    if profile.get("Nice"):
+        parts.append(f"nice {profile['Nice']:+d}")
+    return ", ".join(parts)
+
+
+def constrained_command(command: List[str], profile: Optional[Dict[str, Any]]) -> List[str]:
+    """Wrap command in a cgroup scope carrying the profile's memory limit, if cgroups enforce it."""
+    if not profile or profile.get("MemoryEnforcement") != "cgroup":
+        return command
+    return [
+        "systemd-run", "--user", "--scope", "--quiet",
+        "-p", f"MemoryMax={profile['MemoryLimitMB']}M",
+        "-p", "MemorySwapMax=0",
+        "--",
+    ] + command
+
+
+def constrained_env(env: Dict[str, str], profile: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Environment for a constrained child: the .NET GC cannot see an rlimit, so give it the container default."""
+    if not profile or profile.get("MemoryEnforcement") != "rlimit":
+        return env
+    env = dict(env)
+    # .NET sizes its heap to 75% of a container memory limit; the variable is hexadecimal bytes
+    env.setdefault("DOTNET_GCHeapHardLimit", format(profile["MemoryLimitMB"] * 1024 * 1024 * 3 // 4, "x"))
+    return env
+
+
+def _child_preexec(cpu: Optional[int] = None, profile: Optional[Dict[str, Any]] = None):
+    """Return a preexec_fn pinning the child to one CPU or applying a resource profile (Linux only)."""
+    profile = profile or {}
+    cpus = {cpu} if cpu is not None else set(profile.get("Cpus") or [])
+    nice = profile.get("Nice") or 0
+    memory_mb = profile.get("MemoryLimitMB") if profile.get("MemoryEnforcement") == "rlimit" else None
+    if not hasattr(os, "sched_setaffinity") or not (cpus or nice or memory_mb):
+        return None
+
+    def _apply():
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+        if nice:
+            os.nice(nice)
+        if memory_mb:
+            import resource
+
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+
+    return _apply
+
+
+def annotate_metrics_files(
+    paths: List[str],
+    profile: Optional[Dict[str, Any]] = None,
+    usage: Optional[Dict[str, Any]] = None,
+):
+    """
+    Add what only the orchestrator knows to metrics files written by an agent: the resource
+    profile it ran under (TestInfo.ResourceProfile) and its externally sampled process tree
+    usage (Metrics.ExternalProcess).
+    """
+    if not profile and not usage:
+        return
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if profile:
+                data.setdefault("TestInfo", {})["ResourceProfile"] = profile
+            if usage:
+                data.setdefault("Metrics", {})["ExternalProcess"] = usage
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except (OSError, ValueError) as exc:
+            print(f"Warning: Could not annotate {path}: {exc}")
+
+
+# ============================================================================
+# External Process Monitor (same sampler for every runtime)
+# ============================================================================
+
+
+class ProcessTreeMonitor:
+    """
+    Samples an agent process and all of its descendants from the orchestrator.
+
+    Agents report memory and CPU with their own runtime APIs, which do not measure the same
+    thing; this sampler reads every process tree the same way through psutil. RSS, USS (when
+    memory_full_info is permitted), threads and processes are gauges summed over the tree.
+    CPU time includes the children_* times of processes in the tree, so descendants that
+    exited and were reaped inside the tree still count. Context switches and I/O have no
+    such accounting and keep the last value sampled per process, missing the final interval
+    of processes that exit between samples.
+
+    join() must be called before the root process is reaped: the sampler waits for it to
+    become a zombie and takes the final CPU time from it. Windows has no zombie state and
+    psutil cannot query a process once it has exited, so there the last sample is the one
+    taken before exit and CPU and I/O miss up to one interval; FinalSample is then False.
+    """
+
+    def __init__(self, pid: int, interval_s: float = 0.5):
+        self.pid = pid
+        self.interval_s = interval_s
+        self._thread: Optional[threading.Thread] = None
+        self._counters: Dict[int, Dict[str, int]] = {}
+        self._rss_mb: List[float] = []
+        self._uss_mb: List[float] = []
+        self._cpu_percent: List[float] = []
+        self._peak_threads = 0
+        self._peak_processes = 0
+        self._cpu_user_s = 0.0
+        self._cpu_system_s = 0.0
+        self._uss_available = True
+        self._started = 0.0
+        self._elapsed_s = 0.0
+        self._final_sample = False
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"monitor-{self.pid}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            root = psutil.Process(self.pid)
+        except psutil.Error:
+            return
+        last_cpu, last_time = 0.0, time.perf_counter()
+        while True:
+            try:
+                exited = root.status() == psutil.STATUS_ZOMBIE
+            except psutil.Error:
+                # Already gone (always the case on Windows): the previous sample is the last one
+                break
+            cpu = self._sample(root, final=exited)
+            self._final_sample = exited and cpu is not None
+            now = time.perf_counter()
+            if cpu is not None and now > last_time:
+                self._cpu_percent.append((cpu - last_cpu) / (now - last_time) * 100)
+                last_cpu, last_time = cpu, now
+            if exited:
+                break
+            time.sleep(self.interval_s)
+        self._elapsed_s = time.perf_counter() - self._started
+
+    def _sample(self, root: "psutil.Process", final: bool) -> Optional[float]:
+        """Take one sample of the tree; returns its cumulative CPU time in seconds."""
+        try:
+            processes = [root] + ([] if final else root.children(recursive=True))
+        except psutil.Error:
+            return None
+        rss = uss = 0
+        threads = 0
+        user = system = 0.0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    user += times.user + getattr(times, "children_user", 0.0)
+                    system += times.system + getattr(times, "children_system", 0.0)
+                    threads += process.num_threads()
+                    switches = process.num_ctx_switches()
+                    counters = self._counters.setdefault(process.pid, {})
+                    counters["voluntary"] = switches.voluntary
+                    counters["involuntary"] = switches.involuntary
+                    if not final:
+                        rss += process.memory_info().rss
+                        if self._uss_available:
+                            try:
+                                uss += process.memory_full_info().uss
+                            except (psutil.AccessDenied, AttributeError):
+                                self._uss_available = False
+                    if hasattr(process, "io_counters"):
+                        io = process.io_counters()
+                        counters["read_bytes"] = io.read_bytes
+                        counters["write_bytes"] = io.write_bytes
+                        counters["read_count"] = io.read_count
+                        counters["write_count"] = io.write_count
+            except psutil.Error:
+                # Exited or inaccessible since the children() call
+                continue
+        if not final:
+            self._rss_mb.append(rss / 1024 / 1024)
+            if self._uss_available:
+                self._uss_mb.append(uss / 1024 / 1024)
+            self._peak_threads = max(self._peak_threads, threads)
+            self._peak_processes = max(self._peak_processes, len(processes))
+        self._cpu_user_s = max(self._cpu_user_s, user)
+        self._cpu_system_s = max(self._cpu_system_s, system)
+        return self._cpu_user_s + self._cpu_system_s
+
+    def join(self) -> Dict[str, Any]:
+        """Wait until the root process exits and summarize the samples (PascalCase, for metrics files)."""
+        if self._thread:
+            self._thread.join()
+
+        def _total(name: str) -> Optional[int]:
+            values = [counters[name] for counters in self._counters.values() if name in counters]
+            return sum(values) if values else None
+
+        cpu_total = self._cpu_user_s + self._cpu_system_s
+        return {
+            "Sampler": f"psutil {psutil.__version__}",
+            "IntervalS": self.interval_s,
+            "DurationS": self._elapsed_s,
+            "Samples": len(self._rss_mb),
+            "PeakRSSMB": max(self._rss_mb) if self._rss_mb else None,
+            "MeanRSSMB": statistics.mean(self._rss_mb) if self._rss_mb else None,
+            "PeakUSSMB": max(self._uss_mb) if self._uss_available and self._uss_mb else None,
+            "CpuUserS": self._cpu_user_s,
+            "CpuSystemS": self._cpu_system_s,
+            "CpuTotalS": cpu_total,
+            "MeanCpuPercent": cpu_total / self._elapsed_s * 100 if self._elapsed_s else None,
+            "PeakCpuPercent": max(self._cpu_percent) if self._cpu_percent else None,
+            "PeakThreads": self._peak_threads,
+            "PeakProcesses": self._peak_processes,
+            "VoluntaryContextSwitches": _total("voluntary"),
+            "InvoluntaryContextSwitches": _total("involuntary"),
+            "ReadBytes": _total("read_bytes"),
+            "WriteBytes": _total("write_bytes"),
+            "ReadCount": _total("read_count"),
+            "WriteCount": _total("write_count"),
+            "FinalSample": self._final_sample,
+        }
+
+
+def start_process_monitor(pid: int, test_config: Dict[str, Any]) -> Optional[ProcessTreeMonitor]:
+    """Start sampling a child's process tree unless psutil is missing or --monitor-interval is 0."""
+    interval_s = test_config.get("monitor_interval", 0.5)
+    if not PSUTIL_AVAILABLE or not interval_s:
+        return None
+    monitor = ProcessTreeMonitor(pid, interval_s)
+    monitor.start()
+    return monitor
+
+
+def run_monitored(
+    command: List[str],
+    cwd: str,
+    env: Dict[str, str],
+    test_config: Dict[str, Any],
+    preexec_fn=None,
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Run a child to completion (like subprocess.run) while its process tree is sampled externally."""
+    process = subprocess.Popen(command, cwd=cwd, env=env, preexec_fn=preexec_fn)
+    try:
+        monitor = start_process_monitor(process.pid, test_config)
+        usage = monitor.join() if monitor else None
+        return process.wait(), usage
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+
+
+# ============================================================================
+# Repeated Trials (fresh process per trial)
+# ============================================================================
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Linear-interpolated percentile, matching performance_utils.PerformanceMetrics."""
+    if not sorted_values:
+        return 0.0
+    index = percentile * (len(sorted_values) - 1)
+    lower = int(index)
+    if lower + 1 >= len(sorted_values):
+        return sorted_values[lower]
+    fraction = index - lower
+    return sorted_values[lower] * (1 - fraction) + sorted_values[lower + 1] * fraction
+
+
+def summarize_samples(samples: List[float]) -> Dict[str, float]:
+    """Descriptive statistics for a list of iteration times (ms)."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "Mean": statistics.mean(ordered),
+        "Median": statistics.median(ordered),
+        "Min": ordered[0],
+        "Max": ordered[-1],
+        "P90": _percentile(ordered, 0.90),
+        "P95": _percentile(ordered, 0.95),
+        "P99": _percentile(ordered, 0.99),
+        "StandardDeviation": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def extract_iteration_stats(metrics_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract per-iteration statistics from a metrics file in any of the repo's layouts.
+
+    Prefers raw samples (EXPORT_SAMPLES=1), then the enhanced Statistics section,
+    then the legacy flat fields written by the basic runners and .NET agents.
+    """
+    metrics = metrics_data.get("Metrics", {})
+    samples = metrics.get("Samples") or []
+    if samples:
+        stats = summarize_samples(samples)
+    elif metrics.get("Statistics"):
+        stats = dict(metrics["Statistics"])
+    else:
+        stats = {
+            "Mean": metrics.get("AverageTimePerIterationMs"),
+            "Median": metrics.get("MedianIterationTimeMs"),
+            "Min": metrics.get("MinIterationTimeMs"),
+            "Max": metrics.get("MaxIterationTimeMs"),
+            "StandardDeviation": metrics.get("StandardDeviationMs"),
+        }
+
+    stats["TotalIterations"] = metrics.get("TotalIterations") or len(samples)
+    stats["TotalExecutionTimeMs"] = metrics.get("TotalExecutionTimeMs")
+    stats["MemoryUsedMB"] = metrics.get("MemoryUsedMB")
+    return stats
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def merge_gc_sections(sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum the collection counts and pause totals of several GarbageCollection sections.
+
+    Pause percentiles and timelines cannot be combined from summaries, so they are left out.
+    """
+    merged: Dict[str, Any] = {"Trials": len(sections)}
+    for key in ("Gen0Collections", "Gen1Collections", "Gen2Collections", "TotalPauseMs",
+                "CollectedObjects", "UncollectableObjects"):
+        values = [section[key] for section in sections if _is_number(section.get(key))]
+        if values:
+            merged[key] = sum(values)
+    pauses = [section["MaxPauseMs"] for section in sections if _is_number(section.get("MaxPauseMs"))]
+    if pauses:
+        merged["MaxPauseMs"] = max(pauses)
+    collections = sum(merged.get(f"Gen{gen}Collections", 0) for gen in range(3))
+    if "TotalPauseMs" in merged and collections:
+        merged["MeanPauseMs"] = merged["TotalPauseMs"] / collections
+    return merged
+
+
+def aggregate_trials(trial_metrics: List[Dict[str, Any]], parallel: bool) -> Dict[str, Any]:
+    """
+    Merge per-trial metrics into one metrics payload.
+
+    Raw samples from all trials are pooled for the within-trial distribution, and the
+    spread of per-trial means/percentiles is reported as between-trial variance.
+    """
+    base = trial_metrics[0]
+    per_trial = [extract_iteration_stats(entry) for entry in trial_metrics]
+    pooled_samples: List[float] = []
+    for entry in trial_metrics:
+        pooled_samples.extend(entry.get("Metrics", {}).get("Samples") or [])
+
+    def _spread(key: str) -> Dict[str, Optional[float]]:
+        values = [t[key] for t in per_trial if t.get(key) is not None]
+        if not values:
+            return {}
+        mean = statistics.mean(values)
+        stdev = statistics.stdev(values) if len(values) > 1 else 0.0
+        return {
+            "Mean": mean,
+            "StandardDeviation": stdev,
+            "Variance": stdev ** 2,
+            "CoefficientOfVariation": stdev / mean if mean else None,
+            "Min": min(values),
+            "Max": max(values),
+        }
+
+    between_trial: Dict[str, Dict[str, Optional[float]]] = {}
+    for key in ("Mean", "Median", "P95", "P99"):
+        spread = _spread(key)
+        if spread:
+            between_trial[key] = spread
+
+    # Within-trial noise: average per-trial variance and the implied standard error of one trial's mean
+    within_variances = [
+        t["StandardDeviation"] ** 2 for t in per_trial if t.get("StandardDeviation") is not None
+    ]
+    within_trial: Dict[str, Any] = {}
+    if within_variances:
+        within_trial["MeanVariance"] = statistics.mean(within_variances)
+        iterations = [t["TotalIterations"] for t in per_trial if t.get("TotalIterations")]
+        if iterations:
+            within_trial["ExpectedStdErrorOfMean"] = (
+                within_trial["MeanVariance"] / statistics.mean(iterations)
+            ) ** 0.5
+            between_sd = between_trial.get("Mean", {}).get("StandardDeviation")
+            if between_sd is not None and within_trial["ExpectedStdErrorOfMean"]:
+                # >1 means process-level noise dominates what a single run suggests
+                within_trial["BetweenToWithinRatio"] = between_sd / within_trial["ExpectedStdErrorOfMean"]
+
+    merged_stats = summarize_samples(pooled_samples) if pooled_samples else {
+        key: between_trial[key]["Mean"] for key in between_trial
+    }
+
+    metrics: Dict[str, Any] = {}
+    metrics["TotalIterations"] = sum(t["TotalIterations"] or 0 for t in per_trial)
+    metrics["TotalExecutionTimeMs"] = sum(t["TotalExecutionTimeMs"] or 0 for t in per_trial)
+    if merged_stats:
+        metrics["Statistics"] = merged_stats
+        metrics["AverageTimePerIterationMs"] = merged_stats.get("Mean")
+        metrics["MinIterationTimeMs"] = merged_stats.get("Min")
+        metrics["MaxIterationTimeMs"] = merged_stats.get("Max")
+        metrics["MedianIterationTimeMs"] = merged_stats.get("Median")
+        metrics["StandardDeviationMs"] = merged_stats.get("StandardDeviation")
+    memory = [t["MemoryUsedMB"] for t in per_trial if t.get("MemoryUsedMB") is not None]
+    if memory:
+        metrics["MemoryUsedMB"] = statistics.mean(memory)
+
+    # Externally sampled usage: the mean of every numeric figure across trials
+    external = [entry["Metrics"]["ExternalProcess"] for entry in trial_metrics
+                if entry.get("Metrics", {}).get("ExternalProcess")]
+    if external:
+        merged_external: Dict[str, Any] = {"Sampler": external[0].get("Sampler"), "Trials": len(external)}
+        for key, value in external[0].items():
+            if isinstance(value, bool):
+                merged_external[key] = all(e.get(key) for e in external)
+                continue
+            values = [e[key] for e in external if isinstance(e.get(key), (int, float))]
+            if isinstance(value, (int, float)) and values:
+                merged_external[key] = statistics.mean(values)
+        metrics["ExternalProcess"] = merged_external
+
+    # Every other section is merged across trials or kept per trial: trial 1's values alone
+    # would misdescribe a payload whose TotalIterations covers all trials
+    handled = set(metrics) | {
+        "Samples", "Statistics", "AverageTimePerIterationMs", "MinIterationTimeMs", "MaxIterationTimeMs",
+        "MedianIterationTimeMs", "StandardDeviationMs", "ExternalProcess", "Trials",
+    }
+    sections = [entry.get("Metrics", {}) for entry in trial_metrics]
+    for key in dict.fromkeys(key for section in sections for key in section):
+        if key in handled:
+            continue
+        values = [section[key] for section in sections if section.get(key) is not None]
+        if not values:
+            continue
+        if all(_is_number(value) for value in values):
+            # Scalar figures (CPU %, TTFT, ...) are averaged
+            metrics[key] = statistics.mean(values)
+        elif key == "GarbageCollection":
+            metrics[key] = merge_gc_sections(values)
+        elif all(isinstance(value, dict) and value and all(_is_number(v) for v in value.values()) for value in values):
+            # Flat numeric sections (Memory, CPU, ...) are averaged field by field
+            metrics[key] = {
+                field: statistics.mean([value[field] for value in values if _is_number(value.get(field))])
+                for field in values[0]
+            }
+        else:
+            for stats, section in zip(per_trial, sections):
+                if section.get(key) is not None:
+                    stats.setdefault("Sections", {})[key] = section[key]
+
+    metrics["Trials"] = {
+        "Count": len(trial_metrics),
+        "Parallel": parallel,
+        "PooledSampleCount": len(pooled_samples),
+        "BetweenTrial": between_trial,
+        "WithinTrial": within_trial,
+        "PerTrial": per_trial,
+    }
+
+    aggregated = {key: value for key, value in base.items() if not key.startswith("_")}
+    aggregated["TestInfo"] = dict(base.get("TestInfo", {}), Trials=len(trial_metrics))
+    aggregated["Metrics"] = metrics
+    return aggregated
+
+
+def _new_metrics_files(directory: str, before: set) -> List[str]:
+    """Metrics files in directory that did not exist in the `before` snapshot."""
+    current = set(glob.glob(os.path.join(directory, "metrics_*.json")))
+    return sorted(current - before, key=os.path.getmtime)
+
+
+def kill_process_tree(process: subprocess.Popen):
+    """Kill a child process and its descendants (when psutil is available) and reap it."""
+    children = []
+    if PSUTIL_AVAILABLE:
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.Error:
+            pass
+    process.kill()
+    for child in children:
+        try:
+            child.kill()
+        except psutil.Error:
+            pass
+    process.wait()
+
+
+def run_trials(
+    command: List[str],
+    agent_dir: str,
+    label: str,
+    env: Dict[str, str],
+    test_config: Dict[str, Any],
+    parallel: bool = False,
+) -> bool:
+    """
+    Run K independent trials of one agent configuration, each in a fresh process.
+
+    Each trial writes its metrics into its own folder (METRICS_OUTPUT_DIR) with raw
+    samples enabled; the trials are then merged into a single metrics file in agent_dir.
+    """
+    trials = test_config["trials"]
+    trial_cpus: List[int] = test_config.get("trial_cpus") or []
+    profile = test_config.get("resource_profile")
+    trials_root = os.path.join(agent_dir, ".trials")
+    shutil.rmtree(trials_root, ignore_errors=True)
+
+    mode = "in parallel" if parallel else "sequentially"
+    print_colored(f"Running {trials} trials of {label} {mode}...", "CYAN")
+
+    launched: List[subprocess.Popen] = []
+
+    def _launch(index: int) -> Tuple[subprocess.Popen, str, set, Optional[ProcessTreeMonitor]]:
+        trial_dir = os.path.join(trials_root, f"trial_{index + 1:02d}")
+        os.makedirs(trial_dir, exist_ok=True)
+        trial_env = dict(env)
+        trial_env["METRICS_OUTPUT_DIR"] = trial_dir
+        trial_env["EXPORT_SAMPLES"] = "1"
+        trial_env["TRIAL_INDEX"] = str(index + 1)
+        # A different hash seed per trial samples hash-randomization noise explicitly
+        trial_env["PYTHONHASHSEED"] = str(index + 1)
+        cpu = trial_cpus[index % len(trial_cpus)] if trial_cpus else None
+        before = set(glob.glob(os.path.join(agent_dir, "metrics_*.json")))
+        process = subprocess.Popen(
+            constrained_command(command, profile),
+            cwd=agent_dir,
+            env=constrained_env(trial_env, profile),
+            stdout=subprocess.DEVNULL if parallel else None,
+            # A trial CPU replaces the profile's CPU set
+            preexec_fn=_child_preexec(cpu, profile),
+        )
+        launched.append(process)
+        return process, trial_dir, before, start_process_monitor(process.pid, test_config)
+
+    def _finish(process: subprocess.Popen, monitor: Optional[ProcessTreeMonitor]) -> Tuple[int, Optional[Dict[str, Any]]]:
+        # The monitor reads the final CPU time from the exited process, so join it before reaping
+        usage = monitor.join() if monitor else None
+        return process.wait(), usage
+
+    try:
+        results: List[Tuple[int, int, List[str]]] = []
+        try:
+            if parallel:
+                running = [_launch(index) for index in range(trials)]
+                for index, (process, trial_dir, before, monitor) in enumerate(running):
+                    returncode, usage = _finish(process, monitor)
+                    files = glob.glob(os.path.join(trial_dir, "metrics_*.json"))
+                    annotate_metrics_files(files, usage=usage)
+                    results.append((index, returncode, files))
+            else:
+                for index in range(trials):
+                    process, trial_dir, before, monitor = _launch(index)
+                    returncode, usage = _finish(process, monitor)
+                    files = glob.glob(os.path.join(trial_dir, "metrics_*.json"))
+                    if not files:
+                        # Runners that ignore METRICS_OUTPUT_DIR (e.g. .NET) write into agent_dir
+                        files = _new_metrics_files(agent_dir, before)
+                        for path in files:
+                            shutil.move(path, os.path.join(trial_dir, os.path.basename(path)))
+                        files = glob.glob(os.path.join(trial_dir, "metrics_*.json"))
+                    annotate_metrics_files(files, usage=usage)
+                    results.append((index, returncode, files))
+        except Exception as e:
+            print_colored(f"Error running {label} trials: {e}", "RED")
+            return False
+
+        trial_metrics: List[Dict[str, Any]] = []
+        for index, returncode, files in results:
+            status = "OK" if returncode == 0 and files else "FAILED"
+            print(f"  Trial {index + 1}/{trials}: {status}")
+            if returncode == 0:
+                trial_metrics.extend(load_metrics_file(path) for path in sorted(files))
+
+        trial_metrics = [entry for entry in trial_metrics if entry]
+        if not trial_metrics:
+            print_colored(f"[FAILED] No {label} trial produced metrics", "RED")
+            return False
+
+        aggregated = aggregate_trials(trial_metrics, parallel)
+        output_path = os.path.join(agent_dir, trial_metrics[0]["_filename"])
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(aggregated, f, indent=2)
+    finally:
+        # An error or Ctrl-C must not leave other trials running, nor their folders behind
+        for process in launched:
+            if process.poll() is None:
+                kill_process_tree(process)
+        shutil.rmtree(trials_root, ignore_errors=True)
+
+    between = aggregated["Metrics"]["Trials"]["BetweenTrial"].get("Mean", {})
+    if between:
+        cv = between.get("CoefficientOfVariation") or 0.0
+        print(
+            f"  Between-trial mean: {between['Mean']:.3f} ms ± {between['StandardDeviation']:.3f} ms "
+            f"(CV {cv:.2%}, range {between['Min']:.3f}-{between['Max']:.3f} ms)"
+        )
+    print_colored(f"[OK] {label}: {len(trial_metrics)}/{trials} trials merged into {os.path.basename(output_path)}", "GREEN")
+    print()
+    return len(trial_metrics) == trials
+
+
 def run_agent_tests(script_dir: str, agent_type: str, test_config: Dict[str, Any]) -> bool:
     """Execute tests for specified agent type."""
     success = True
@@ -268,18 +1100,576 @@ def run_agent_tests(script_dir: str, agent_type: str, test_config: Dict[str, Any
     return success
 
 
+# ============================================================================
+# GC Tuning Matrix
+# ============================================================================
+
+# Label -> environment overrides understood by performance_utils.GcTuning
+GC_MATRIX: List[Tuple[str, Dict[str, str]]] = [
+    ("default", {}),
+    ("aggressive", {"GC_PRESET": "aggressive"}),
+    ("relaxed", {"GC_PRESET": "relaxed"}),
+    ("high", {"GC_PRESET": "high"}),
+    ("freeze", {"GC_FREEZE": "1"}),
+    ("relaxed+freeze", {"GC_PRESET": "relaxed", "GC_FREEZE": "1"}),
+    ("disabled", {"GC_DISABLE": "1"}),
+    ("freeze+disabled", {"GC_FREEZE": "1", "GC_DISABLE": "1"}),
+]
+
+# Policies understood by performance_utils.OllamaLoadBalancer
+LB_POLICIES = ["round_robin", "least_outstanding", "ewma"]
+
+# Implementations understood by performance_utils.run_with_event_loop
+EVENT_LOOPS = ["asyncio", "uvloop"]
+
+# Python agents with a closed-loop concurrent mode (CONCURRENT_REQUESTS workers)
+CONCURRENT_AGENTS = ["HelloWorld", "Ollama"]
+
+# A step whose throughput gain over the previous step is below this counts as saturated
+SATURATION_GAIN = 0.05
+
+# Agent type -> workload run by performance_utils.distributed workers
+DISTRIBUTED_WORKLOADS = {"HelloWorld": "mock", "Ollama": "ollama"}
+
+PYTHON_AGENT_DIRS = {
+    "HelloWorld": "hello_world_agent",
+    "AzureOpenAI": "azure_openai_agent",
+    "Ollama": "ollama_agent",
+}
+
+
+def python_agent_dirs(script_dir: str, agent_type: str) -> List[Tuple[str, str]]:
+    """(agent_name, directory) pairs for the Python agents selected by agent_type."""
+    return [
+        (name, os.path.join(script_dir, "python", folder))
+        for name, folder in PYTHON_AGENT_DIRS.items()
+        if agent_type in (name, "All")
+    ]
+
+
+def run_python_matrix_point(
+    agent_dir: str, agent_name: str, test_config: Dict[str, Any], label: str, destination: str
+) -> List[Dict[str, Any]]:
+    """Run one Python agent for one matrix point and move its metrics into destination/label."""
+    before = set(glob.glob(os.path.join(agent_dir, "metrics_*.json")))
+    if not run_python_test(agent_dir, agent_name, test_config):
+        return []
+
+    point_dir = os.path.join(destination, label.replace("+", "_"))
+    os.makedirs(point_dir, exist_ok=True)
+    loaded: List[Dict[str, Any]] = []
+    for path in _new_metrics_files(agent_dir, before):
+        target = os.path.join(point_dir, os.path.basename(path))
+        shutil.move(path, target)
+        data = load_metrics_file(target)
+        if data:
+            loaded.append(data)
+    return loaded
+
+
+def summarize_matrix_entry(metrics_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Latency, memory and GC figures of one matrix point."""
+    stats = extract_iteration_stats(metrics_data)
+    metrics = metrics_data.get("Metrics", {})
+    memory = metrics.get("Memory", {})
+    gc_data = metrics.get("GarbageCollection", {})
+    return {
+        "Mean": stats.get("Mean"),
+        "Median": stats.get("Median"),
+        "P95": stats.get("P95"),
+        "P99": stats.get("P99"),
+        "Max": stats.get("Max"),
+        "RSSDeltaMB": memory.get("RSSDeltaMB", metrics.get("MemoryUsedMB")),
+        "PeakRSSMB": memory.get("PeakRSSMB"),
+        "GcCollections": sum(gc_data.get(f"Gen{gen}Collections", 0) or 0 for gen in range(3)),
+        "GcTotalPauseMs": gc_data.get("TotalPauseMs"),
+        "GcMaxPauseMs": gc_data.get("MaxPauseMs"),
+    }
+
+
+def _fmt(value: Any, digits: int = 3) -> str:
+    """Format a number for report tables, 'N/A' for missing values."""
+    if value is None:
+        return "N/A"
+    if isinstance(value, (int, float)):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def run_gc_matrix(script_dir: str, agent_type: str, test_config: Dict[str, Any]) -> int:
+    """Run the Python agents once per GC configuration and report latency/memory trade-offs."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destination = os.path.join("tests_results", f"{timestamp}_gc_matrix_{test_config['iterations']}iter")
+    os.makedirs(destination, exist_ok=True)
+
+    rows: List[Dict[str, Any]] = []
+    for agent_name, agent_dir in python_agent_dirs(script_dir, agent_type):
+        for label, overrides in GC_MATRIX:
+            print_colored(f"GC matrix: {agent_name} / {label}", "CYAN")
+            point_config = dict(test_config, extra_env=dict(test_config.get("extra_env") or {}, **overrides))
+            for entry in run_python_matrix_point(agent_dir, agent_name, point_config, label, destination):
+                rows.append(dict(summarize_matrix_entry(entry), Agent=agent_name, Configuration=label))
+
+    if not rows:
+        print_colored("GC matrix produced no metrics", "RED")
+        return 1
+
+    lines = [
+        "# GC Tuning Matrix",
+        "",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Iterations per configuration: {test_config['iterations']}",
+        "",
+        "Latency deltas are relative to the `default` configuration of the same agent.",
+        "",
+        "| Agent | Configuration | Mean (ms) | P95 (ms) | P99 (ms) | Max (ms) | vs default P99 | "
+        "GC Collections | GC Pause (ms) | Max Pause (ms) | RSS Delta (MB) | Peak RSS (MB) |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    baselines = {row["Agent"]: row for row in rows if row["Configuration"] == "default"}
+    for row in rows:
+        baseline = baselines.get(row["Agent"])
+        delta = "N/A"
+        if baseline and baseline.get("P99") and row.get("P99") is not None:
+            delta = f"{(row['P99'] - baseline['P99']) / baseline['P99']:+.1%}"
+        lines.append(
+            f"| {row['Agent']} | {row['Configuration']} | {_fmt(row['Mean'])} | {_fmt(row['P95'])} | "
+            f"{_fmt(row['P99'])} | {_fmt(row['Max'])} | {delta} | {_fmt(row['GcCollections'], 0)} | "
+            f"{_fmt(row['GcTotalPauseMs'])} | {_fmt(row['GcMaxPauseMs'])} | {_fmt(row['RSSDeltaMB'], 2)} | "
+            f"{_fmt(row['PeakRSSMB'], 2)} |"
+        )
+
+    report_path = os.path.join(destination, "gc_matrix_report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(destination, "gc_matrix.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+    print_colored(f"GC matrix report: {report_path}", "GREEN")
+    return 0
+
+
+def run_event_loop_matrix(script_dir: str, agent_type: str, test_config: Dict[str, Any]) -> int:
+    """Run the Python agents on every event loop implementation and compare latency and throughput."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destination = os.path.join("tests_results", f"{timestamp}_event_loops_{test_config['iterations']}iter")
+    os.makedirs(destination, exist_ok=True)
+
+    # Concurrent mode measures throughput; the configured mode (e.g. trace replay) is compared as well
+    modes = ["concurrent"] + ([test_config["test_mode"]] if test_config["test_mode"] != "concurrent" else [])
+    rows: List[Dict[str, Any]] = []
+    for agent_name, agent_dir in python_agent_dirs(script_dir, agent_type):
+        # Other agents would silently run concurrent mode as standard
+        agent_modes = [mode for mode in modes if mode != "concurrent" or agent_name in CONCURRENT_AGENTS]
+        if not agent_modes:
+            print_colored(f"Event loop matrix: {agent_name} has no concurrent mode, skipping", "YELLOW")
+        for mode in agent_modes:
+            for loop_name in EVENT_LOOPS:
+                label = f"{mode}_{loop_name}"
+                print_colored(f"Event loop matrix: {agent_name} / {mode} / {loop_name}", "CYAN")
+                point_config = dict(
+                    test_config,
+                    test_mode=mode,
+                    extra_env=dict(test_config.get("extra_env") or {}, EVENT_LOOP=loop_name),
+                )
+                for entry in run_python_matrix_point(agent_dir, agent_name, point_config, label, destination):
+                    metrics = entry.get("Metrics", {})
+                    concurrency = metrics.get("Concurrency") or {}
+                    total_ms = metrics.get("TotalExecutionTimeMs")
+                    throughput = concurrency.get("RequestsPerSecond")
+                    if throughput is None and total_ms:
+                        throughput = metrics.get("TotalIterations", 0) / (total_ms / 1000)
+                    rows.append(dict(
+                        summarize_matrix_entry(entry),
+                        Agent=agent_name,
+                        # The mode the agent actually ran, after any fallback to standard
+                        Mode=entry.get("TestInfo", {}).get("TestMode", mode),
+                        Requested=loop_name,
+                        # The runner falls back to asyncio when uvloop is not installed
+                        EventLoop=entry.get("TestInfo", {}).get("EventLoop", "unknown"),
+                        RequestsPerSecond=throughput,
+                    ))
+
+    if not rows:
+        print_colored("Event loop matrix produced no metrics", "RED")
+        return 1
+
+    lines = [
+        "# Event Loop Comparison",
+        "",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Iterations per run: {test_config['iterations']}, concurrent requests: {test_config['concurrent_requests']}",
+        "",
+        "Requests/s is the concurrent wall-clock throughput where the agent reports it, otherwise "
+        "iterations over total execution time. Deltas are relative to asyncio for the same agent and mode.",
+        "",
+        "| Agent | Mode | Event Loop | Requests/s | vs asyncio | Mean (ms) | P95 (ms) | P99 (ms) | Max (ms) |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    baselines = {
+        (row["Agent"], row["Mode"]): row for row in rows if row["Requested"] == "asyncio"
+    }
+    for row in rows:
+        baseline = baselines.get((row["Agent"], row["Mode"]))
+        delta = "N/A"
+        if baseline and baseline is not row and baseline.get("RequestsPerSecond") and row.get("RequestsPerSecond"):
+            delta = f"{(row['RequestsPerSecond'] - baseline['RequestsPerSecond']) / baseline['RequestsPerSecond']:+.1%}"
+        loop_name = row["EventLoop"]
+        if loop_name != row["Requested"]:
+            loop_name += f" (requested {row['Requested']}, not installed)"
+        lines.append(
+            f"| {row['Agent']} | {row['Mode']} | {loop_name} | {_fmt(row['RequestsPerSecond'], 2)} | {delta} | "
+            f"{_fmt(row['Mean'])} | {_fmt(row['P95'])} | {_fmt(row['P99'])} | {_fmt(row['Max'])} |"
+        )
+
+    report_path = os.path.join(destination, "event_loops_report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(destination, "event_loops.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+    print_colored(f"Event loop report: {report_path}", "GREEN")
+    return 0
+
+
+def run_lb_comparison(script_dir: str, test_config: Dict[str, Any]) -> int:
+    """Run the Python Ollama agent once per balancing policy and compare aggregate throughput."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destination = os.path.join("tests_results", f"{timestamp}_lb_policies_{test_config['iterations']}iter")
+    os.makedirs(destination, exist_ok=True)
+
+    rows: List[Dict[str, Any]] = []
+    for agent_name, agent_dir in python_agent_dirs(script_dir, "Ollama"):
+        for policy in LB_POLICIES:
+            print_colored(f"Load balancing: {policy}", "CYAN")
+            point_config = dict(test_config, lb_policy=policy)
+            for entry in run_python_matrix_point(agent_dir, agent_name, point_config, policy, destination):
+                balancer = entry.get("Metrics", {}).get("LoadBalancer") or {}
+                rows.append(dict(
+                    summarize_matrix_entry(entry),
+                    Policy=policy,
+                    RequestsPerSecond=balancer.get("RequestsPerSecond"),
+                    Errors=balancer.get("Errors"),
+                    Split=", ".join(
+                        f"{endpoint.get('Host')} {_fmt(endpoint.get('Share'), 2)}"
+                        for endpoint in balancer.get("Endpoints") or []
+                    ),
+                ))
+
+    if not rows:
+        print_colored("Load balancing comparison produced no metrics", "RED")
+        return 1
+
+    lines = [
+        "# Load Balancing Policies",
+        "",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Endpoints: {test_config['ollama_hosts']}",
+        "",
+        f"Test mode: {test_config['test_mode']}, requests per policy: {test_config['iterations']}",
+        "",
+        "| Policy | Requests/s | Mean (ms) | P95 (ms) | P99 (ms) | Max (ms) | Errors | Split |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['Policy']} | {_fmt(row['RequestsPerSecond'], 2)} | {_fmt(row['Mean'])} | {_fmt(row['P95'])} | "
+            f"{_fmt(row['P99'])} | {_fmt(row['Max'])} | {_fmt(row['Errors'], 0)} | {row['Split']} |"
+        )
+
+    report_path = os.path.join(destination, "lb_policies_report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(destination, "lb_policies.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+    print_colored(f"Load balancing report: {report_path}", "GREEN")
+    return 0
+
+
+def concurrency_steps(spec: str, maximum: int) -> List[int]:
+    """Sweep steps from "1,2,4,8" or "auto" (powers of two up to maximum)."""
+    if spec == "auto":
+        steps = [1]
+        while steps[-1] * 2 <= maximum:
+            steps.append(steps[-1] * 2)
+        if steps[-1] != maximum and maximum > 1:
+            steps.append(maximum)
+        return steps
+    return sorted({int(step) for step in spec.split(",") if step.strip() and int(step) > 0})
+
+
+def find_knee(points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Knee and saturation point of a concurrency sweep (points sorted by concurrency).
+
+    The knee is the step with the highest power, throughput / mean latency (Kleinrock): below
+    it more concurrency buys throughput almost for free, above it mostly adds queueing delay.
+    Saturation is the first step whose throughput gain over the previous step is below
+    SATURATION_GAIN.
+    """
+    measured = [p for p in points if p.get("RequestsPerSecond") and p.get("Mean")]
+    if not measured:
+        return {"Knee": None, "Saturation": None}
+    for point in measured:
+        point["Power"] = point["RequestsPerSecond"] / point["Mean"]
+    knee = max(measured, key=lambda p: p["Power"])
+    saturation = None
+    for previous, point in zip(measured, measured[1:]):
+        if point["RequestsPerSecond"] < previous["RequestsPerSecond"] * (1 + SATURATION_GAIN):
+            saturation = previous
+            break
+    return {
+        "Knee": knee["Concurrency"],
+        "Saturation": saturation["Concurrency"] if saturation else None,
+        "PeakRequestsPerSecond": max(p["RequestsPerSecond"] for p in measured),
+    }
+
+
+def sweep_chart(points: List[Dict[str, Any]], knee: Optional[int], width: int = 40) -> List[str]:
+    """Text bar chart of throughput by concurrency, annotated with p50/p99."""
+    highest = max((p.get("RequestsPerSecond") or 0 for p in points), default=0) or 1.0
+    lines = []
+    for point in points:
+        throughput = point.get("RequestsPerSecond") or 0
+        bar = "#" * max(1, round(throughput / highest * width))
+        marker = "  <- knee" if point["Concurrency"] == knee else ""
+        lines.append(
+            f"c={point['Concurrency']:>4} | {bar:<{width}} {throughput:.2f} req/s, "
+            f"p50 {_fmt(point.get('P50'), 1)} ms, p99 {_fmt(point.get('P99'), 1)} ms{marker}"
+        )
+    return lines
+
+
+def run_concurrency_sweep(script_dir: str, agent_type: str, test_config: Dict[str, Any]) -> int:
+    """Run the concurrent workload at increasing concurrency and locate the throughput/latency knee."""
+    steps = test_config["concurrency_sweep"]
+    agents = [(name, path) for name, path in python_agent_dirs(script_dir, agent_type) if name in CONCURRENT_AGENTS]
+    if not agents:
+        print_colored(f"Concurrency sweep needs a concurrent-mode agent ({', '.join(CONCURRENT_AGENTS)})", "RED")
+        return 1
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destination = os.path.join("tests_results", f"{timestamp}_concurrency_sweep_{test_config['iterations']}iter")
+    os.makedirs(destination, exist_ok=True)
+
+    sweeps: Dict[str, List[Dict[str, Any]]] = {}
+    for agent_name, agent_dir in agents:
+        points = sweeps.setdefault(agent_name, [])
+        for concurrency in steps:
+            print_colored(f"Concurrency sweep: {agent_name} / {concurrency} concurrent", "CYAN")
+            point_config = dict(test_config, test_mode="concurrent", concurrent_requests=concurrency)
+            for entry in run_python_matrix_point(agent_dir, agent_name, point_config, f"c{concurrency}", destination):
+                metrics = entry.get("Metrics", {})
+                summary = summarize_matrix_entry(entry)
+                throughput = (metrics.get("Concurrency") or {}).get("RequestsPerSecond")
+                if throughput is None and metrics.get("TotalExecutionTimeMs"):
+                    throughput = metrics.get("TotalIterations", 0) / (metrics["TotalExecutionTimeMs"] / 1000)
+                points.append(dict(
+                    Concurrency=concurrency,
+                    RequestsPerSecond=throughput,
+                    Mean=summary["Mean"],
+                    P50=summary["Median"],
+                    P95=summary["P95"],
+                    P99=summary["P99"],
+                ))
+
+    if not any(sweeps.values()):
+        print_colored("Concurrency sweep produced no metrics", "RED")
+        return 1
+
+    lines = [
+        "# Concurrency Sweep",
+        "",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Requests per step: {test_config['iterations']}, steps: {', '.join(str(step) for step in steps)}",
+        "",
+        "The knee is the step with the highest throughput / mean latency; beyond it extra concurrency "
+        "mostly adds queueing delay. Saturation is the last step before throughput grows by less than "
+        f"{SATURATION_GAIN:.0%} per step.",
+    ]
+    results: Dict[str, Any] = {}
+    csv_path = os.path.join(destination, "concurrency_sweep.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["agent", "concurrency", "requests_per_second", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "power"])
+        for agent_name, points in sweeps.items():
+            knee = find_knee(points)
+            results[agent_name] = {"Points": points, **knee}
+            for point in points:
+                writer.writerow([
+                    agent_name, point["Concurrency"], point["RequestsPerSecond"], point["Mean"],
+                    point["P50"], point["P95"], point["P99"], point.get("Power"),
+                ])
+            lines += [
+                "",
+                f"## {agent_name}",
+                "",
+                f"Knee: {_fmt(knee['Knee'], 0)} concurrent requests (recommended CONCURRENT_REQUESTS), "
+                f"saturation: {_fmt(knee['Saturation'], 0)}, "
+                f"peak: {_fmt(knee.get('PeakRequestsPerSecond'), 2)} requests/s",
+                "",
+                "| Concurrency | Requests/s | Mean (ms) | P50 (ms) | P95 (ms) | P99 (ms) |",
+                "|---|---|---|---|---|---|",
+            ]
+            for point in points:
+                lines.append(
+                    f"| {point['Concurrency']} | {_fmt(point['RequestsPerSecond'], 2)} | {_fmt(point['Mean'])} | "
+                    f"{_fmt(point['P50'])} | {_fmt(point['P95'])} | {_fmt(point['P99'])} |"
+                )
+            lines += ["", "```"] + sweep_chart(points, knee["Knee"]) + ["```"]
+
+    report_path = os.path.join(destination, "concurrency_sweep_report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(destination, "concurrency_sweep.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for agent_name, result in results.items():
+        print_colored(f"{agent_name}: knee at {_fmt(result['Knee'], 0)} concurrent requests", "GREEN")
+    print_colored(f"Concurrency sweep report: {report_path}", "GREEN")
+    return 0
+
+
+def run_distributed(script_dir: str, agent_type: str, test_config: Dict[str, Any]) -> int:
+    """Spread the workload over coordinated worker processes/hosts and merge their histograms."""
+    workload_name = DISTRIBUTED_WORKLOADS.get(agent_type)
+    if workload_name is None:
+        print_colored(
+            f"Distributed mode supports {', '.join(DISTRIBUTED_WORKLOADS)} agents, not {agent_type}", "RED"
+        )
+        return 1
+
+    python_dir = os.path.join(script_dir, "python")
+    sys.path.insert(0, python_dir)
+    try:
+        from performance_utils import Coordinator, distributed_to_dict
+    except ImportError as ex:
+        print_colored(f"performance_utils not available in {python_dir}: {ex}", "RED")
+        return 1
+
+    local_workers = test_config["distributed_workers"]
+    total_workers = local_workers + test_config["remote_workers"]
+    host = test_config["coordinator_host"]
+    workload = {
+        "agent": workload_name,
+        "iterations": test_config["iterations"],
+        "concurrency": test_config["concurrent_requests"] if test_config["test_mode"] == "concurrent" else 1,
+        "model": test_config["model"],
+        "endpoint": os.getenv("OLLAMA_ENDPOINT", "http://localhost:11434"),
+    }
+
+    completed: Dict[str, int] = {}
+
+    def on_progress(worker) -> None:
+        completed[worker.worker] = worker.completed + worker.errors
+        print(f"\r  Progress: {sum(completed.values())}/{workload['iterations']} requests", end="", flush=True)
+
+    async def coordinate():
+        coordinator = Coordinator(
+            total_workers, host=host, port=test_config["coordinator_port"], on_progress=on_progress
+        )
+        port = await coordinator.start()
+        print_colored(f"Coordinator listening on {host}:{port}, waiting for {total_workers} worker(s)", "CYAN")
+        if test_config["remote_workers"]:
+            print(f"  On each remote host: python -m performance_utils worker --connect <this-host>:{port}")
+
+        python_exe = find_python_executable() or sys.executable
+        local_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+        env = build_test_env(test_config)
+        processes = [
+            subprocess.Popen(
+                [python_exe, "-m", "performance_utils", "worker",
+                 "--connect", f"{local_host}:{port}", "--id", f"local-{index + 1}"],
+                cwd=python_dir,
+                env=env,
+            )
+            for index in range(local_workers)
+        ]
+        try:
+            return await coordinator.run(workload)
+        finally:
+            await coordinator.close()
+            for process in processes:
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    try:
+        result = asyncio.run(coordinate())
+    except TimeoutError as ex:
+        print_colored(f"Distributed run aborted: {ex}", "RED")
+        return 1
+    print()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destination = os.path.join("tests_results", f"{timestamp}_distributed_{total_workers}workers")
+    os.makedirs(destination, exist_ok=True)
+
+    latency = result.histogram.summary()
+    lines = [
+        "# Distributed Load Test",
+        "",
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"Workload: {workload_name} ({agent_type}), {workload['iterations']} requests, "
+        f"{workload['concurrency']} concurrent per worker",
+        "",
+        f"Workers: {total_workers} ({local_workers} local, {test_config['remote_workers']} remote)",
+        "",
+        "Latency percentiles come from per-worker histograms (1% precision) merged on the coordinator.",
+        "",
+        "## Combined",
+        "",
+        "| Completed | Errors | Wall Time (s) | Requests/s | Mean (ms) | P50 (ms) | P90 (ms) | P95 (ms) | "
+        "P99 (ms) | Max (ms) |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+        f"| {result.completed} | {result.errors} | {_fmt(result.wall_time_ms / 1000, 2)} | "
+        f"{_fmt(result.requests_per_second, 2)} | {_fmt(latency['Mean'])} | {_fmt(latency['P50'])} | "
+        f"{_fmt(latency['P90'])} | {_fmt(latency['P95'])} | {_fmt(latency['P99'])} | {_fmt(latency['Max'])} |",
+        "",
+        "## Per Worker",
+        "",
+        "| Worker | Host | PID | Assigned | Completed | Errors | Requests/s | CPU % | Mean (ms) | P95 (ms) | "
+        "P99 (ms) | Max (ms) | Finished |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for worker in result.workers:
+        stats = worker.histogram.summary()
+        lines.append(
+            f"| {worker.worker} | {worker.host} | {worker.pid} | {worker.iterations} | {worker.completed} | "
+            f"{worker.errors} | {_fmt(worker.requests_per_second, 2)} | {_fmt(worker.cpu_percent, 1)} | "
+            f"{_fmt(stats['Mean'])} | {_fmt(stats['P95'])} | {_fmt(stats['P99'])} | {_fmt(stats['Max'])} | "
+            f"{'yes' if worker.finished else 'no'} |"
+        )
+
+    report_path = os.path.join(destination, "distributed_report.md")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(destination, "distributed.json"), "w", encoding="utf-8") as f:
+        json.dump(distributed_to_dict(result), f, indent=2)
+
+    print_colored(f"Distributed report: {report_path}", "GREEN")
+    return 0 if all(worker.finished for worker in result.workers) else 1
+
+
 # ============================================================================
 # Results Processing Functions (from original process_results_ollama.py)
 # ============================================================================
 
 
-def find_metrics_files(search_dir: str = ".") -> List[str]:
+def find_metrics_files(search_dir: str = ".", prefix: str = "metrics_", extension: str = "json") -> List[str]:
     """Find all NEW metrics JSON files (excluding tests_results folder)."""
 
     patterns = [
-        os.path.join(search_dir, "metrics_*.json"),
-        os.path.join(search_dir, "dotnet", "**", "metrics_*.json"),
-        os.path.join(search_dir, "python", "**", "metrics_*.json"),
+        os.path.join(search_dir, f"{prefix}*.{extension}"),
+        os.path.join(search_dir, "dotnet", "**", f"{prefix}*.{extension}"),
+        os.path.join(search_dir, "python", "**", f"{prefix}*.{extension}"),
     ]
 
     files: List[str] = []
@@ -305,7 +1695,8 @@ def parse_metrics_filename(filename: str) -> Dict[str, str]:
     }
 
     if len(parts) >= 4:
-        test_modes = ["standard", "batch", "concurrent", "streaming", "scenarios"]
+        test_modes = ["standard", "batch", "concurrent", "streaming", "scenarios", "conversation", "cache", "multicore", "throughput",
+                      "soak"]
         if parts[2] in test_modes:
             info["test_mode"] = parts[2]
             info["timestamp"] = "_".join(parts[3:])
@@ -402,6 +1793,29 @@ def filter_ollama_metrics(metrics_files: List[str]) -> List[Dict[str, Any]]:
     return ollama_metrics
 
 
+# Per-sample arrays (latency samples, GC, loop lag and allocation timelines) run to thousands of
+# entries and would swamp the prompt; the summary fields next to them carry the same information
+PROMPT_DROPPED_ARRAYS = {"Samples", "Timeline"}
+PROMPT_MAX_LIST_ITEMS = 20
+
+
+def strip_prompt_arrays(value: Any) -> Any:
+    """Drop per-sample arrays and cap other lists so a metrics payload fits in a prompt."""
+
+    if isinstance(value, dict):
+        return {
+            key: strip_prompt_arrays(item)
+            for key, item in value.items()
+            if not (key in PROMPT_DROPPED_ARRAYS and isinstance(item, list))
+        }
+    if isinstance(value, list):
+        kept = [strip_prompt_arrays(item) for item in value[:PROMPT_MAX_LIST_ITEMS]]
+        if len(value) > PROMPT_MAX_LIST_ITEMS:
+            kept.append(f"... {len(value) - PROMPT_MAX_LIST_ITEMS} more entries omitted")
+        return kept
+    return value
+
+
 def build_comparison_prompt(
     first_metrics: Dict[str, Any],
     second_metrics: Dict[str, Any],
@@ -409,8 +1823,8 @@ def build_comparison_prompt(
 ) -> str:
     """Fill the comparison template with two metrics payloads."""
 
-    first_json = json.dumps(first_metrics, indent=2)
-    second_json = json.dumps(second_metrics, indent=2)
+    first_json = json.dumps(strip_prompt_arrays(first_metrics), indent=2)
+    second_json = json.dumps(strip_prompt_arrays(second_metrics), indent=2)
 
     if "{first}" in template_body and "{second}" in template_body:
         return template_body.replace("{first}", first_json).replace("{second}", second_json)
@@ -442,6 +1856,49 @@ def group_metrics_by_mode(metrics: List[Dict[str, Any]]) -> Dict[str, Dict[str,
     return grouped
 
 
+# Figures of Metrics.ExternalProcess compared across languages
+EXTERNAL_USAGE_ROWS = [
+    ("Peak RSS (MB)", "PeakRSSMB", 1),
+    ("Mean RSS (MB)", "MeanRSSMB", 1),
+    ("Peak USS (MB)", "PeakUSSMB", 1),
+    ("CPU time (s)", "CpuTotalS", 2),
+    ("Mean CPU (%)", "MeanCpuPercent", 1),
+    ("Peak threads", "PeakThreads", 0),
+    ("Voluntary context switches", "VoluntaryContextSwitches", 0),
+    ("Involuntary context switches", "InvoluntaryContextSwitches", 0),
+    ("Read (MB)", "ReadBytes", None),
+    ("Written (MB)", "WriteBytes", None),
+]
+
+
+def external_usage_table(by_language: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Markdown table of the externally sampled usage of each language's run (empty if none has it)."""
+    usage = {
+        language: entry.get("Metrics", {}).get("ExternalProcess")
+        for language, entry in by_language.items()
+    }
+    if not any(usage.values()):
+        return []
+    languages = list(usage)
+    lines = [
+        "#### Process Tree Resources (sampled externally, same method for every runtime)",
+        "",
+        "| | " + " | ".join(languages) + " |",
+        "|---|" + "---:|" * len(languages),
+    ]
+    for label, key, digits in EXTERNAL_USAGE_ROWS:
+        cells = []
+        for language in languages:
+            value = (usage[language] or {}).get(key)
+            if digits is None and value is not None:
+                # Byte counters are shown in MB
+                value = value / 1024 / 1024
+            cells.append(_fmt(value, 1 if digits is None else digits))
+        lines.append(f"| {label} | " + " | ".join(cells) + " |")
+    lines.append("")
+    return lines
+
+
 def create_comparison_markdown(
     metrics: List[Dict[str, Any]],
     output_dir: str,
@@ -489,6 +1946,9 @@ def create_comparison_markdown(
             [
                 f"### Comparison: Ollama - {test_mode}",
                 "",
+            ]
+            + external_usage_table({first_lang: first_metrics, second_lang: second_metrics})
+            + [
                 "#### Files Analyzed",
                 f"- {first_metrics['_filename']}",
                 f"- {second_metrics['_filename']}",
@@ -557,6 +2017,9 @@ def create_comparison_markdown(
         if machine_info.get("PythonVersion"):
             markdown_lines.append(f"- Python Version: {machine_info.get('PythonVersion')}")
 
+        if test_info.get("ResourceProfile"):
+            markdown_lines.append(f"- Resource Profile: {describe_resource_profile(test_info['ResourceProfile'])}")
+
         markdown_lines.extend(
             [
                 "",
@@ -578,6 +2041,198 @@ def create_comparison_markdown(
                 f"- Time to First Token: {metrics_data.get('TimeToFirstTokenMs', 'N/A')} ms"
             )
 
+        scenarios = metrics_data.get("ScenarioResults")
+        if scenarios:
+            markdown_lines.append("- Scenarios:")
+            for name, values in scenarios.items():
+                ttft = values.get("TimeToFirstToken") or {}
+                completion = ((values.get("Tokens") or {}).get("Distributions") or {}).get("CompletionTokens", {})
+                markdown_lines.append(
+                    f"  - {name}: mean {_fmt(values.get('AverageMs'))} ms, TTFT {_fmt(ttft.get('MeanMs'))} ms, "
+                    f"completion tokens {_fmt(completion.get('Mean'), 1)}"
+                )
+
+        trials = metrics_data.get("Trials")
+        if trials:
+            between = trials.get("BetweenTrial", {}).get("Mean", {})
+            markdown_lines.append(
+                f"- Trials: {trials.get('Count')} (between-trial mean stdev: {between.get('StandardDeviation', 'N/A')} ms, "
+                f"CV: {between.get('CoefficientOfVariation', 'N/A')})"
+            )
+
+        phases = (metrics_data.get("Phases") or {}).get("Phases")
+        if phases:
+            markdown_lines.append("- Request Phases (per request):")
+            for phase, values in phases.items():
+                markdown_lines.append(
+                    f"  - {phase}: mean {_fmt(values.get('MeanMs'))} ms, P50 {_fmt(values.get('P50Ms'))} ms, "
+                    f"P99 {_fmt(values.get('P99Ms'))} ms"
+                )
+
+        tokens = metrics_data.get("Tokens")
+        if tokens and tokens.get("Iterations"):
+            estimated = " (estimated)" if tokens.get("EstimatedIterations") else ""
+            markdown_lines.append(
+                f"- Tokens{estimated}: {tokens.get('TotalPromptTokens')} prompt / {tokens.get('TotalCompletionTokens')} "
+                f"completion, throughput {_fmt(tokens.get('CompletionThroughputTokensPerSecond'), 1)} completion tokens/s"
+            )
+
+        server_timing = metrics_data.get("ServerTiming")
+        if server_timing and server_timing.get("Distributions"):
+            distributions = server_timing["Distributions"]
+            markdown_lines.append(
+                f"- Ollama Server Time: mean {_fmt(distributions.get('ServerTotalMs', {}).get('Mean'))} ms, "
+                f"client overhead mean {_fmt(distributions.get('ClientOverheadMs', {}).get('Mean'))} ms "
+                f"({_fmt(server_timing.get('ClientOverheadFraction'))} of wall time), generation "
+                f"{_fmt(distributions.get('GenerationTokensPerSecond', {}).get('Mean'), 1)} tokens/s"
+            )
+
+        conversation = metrics_data.get("Conversation")
+        if conversation:
+            markdown_lines.append(
+                f"- Conversation: {conversation.get('Conversations')} x {conversation.get('TurnsPerConversation')} turns, "
+                f"{_fmt(conversation.get('LatencyMsPer1kContextTokens'))} ms per 1k context tokens, "
+                f"request payload +{_fmt(conversation.get('RequestBytesPerTurn'), 0)} B/turn"
+            )
+            per_turn = conversation.get("PerTurn") or []
+            longest = max((point.get("MeanLatencyMs") or 0 for point in per_turn), default=0) or 1
+            if per_turn:
+                markdown_lines.append("")
+                markdown_lines.append("```text")
+                for point in per_turn:
+                    bar = "#" * max(1, round((point.get("MeanLatencyMs") or 0) / longest * 40))
+                    markdown_lines.append(
+                        f"turn {point.get('Turn'):>3} | ctx {int(point.get('MeanContextTokens') or 0):>6} tok | "
+                        f"{bar} {_fmt(point.get('MeanLatencyMs'), 1)} ms"
+                    )
+                markdown_lines.append("```")
+                markdown_lines.append("")
+
+        cache = metrics_data.get("Cache")
+        if cache:
+            latency = cache.get("LatencyMs") or {}
+            markdown_lines.append(
+                f"- Response Cache ({cache.get('Backend')}): hit ratio {_fmt(cache.get('HitRatio'))} "
+                f"({cache.get('Hits')}/{cache.get('Requests')}), hit {_fmt(latency.get('HitRequest', {}).get('Mean'))} ms "
+                f"vs miss {_fmt(latency.get('MissRequest', {}).get('Mean'))} ms, miss lookup overhead "
+                f"{_fmt(latency.get('MissLookup', {}).get('Mean'))} ms, est. saved {_fmt(cache.get('EstimatedSavedMs'), 0)} ms"
+            )
+
+        balancer = metrics_data.get("LoadBalancer")
+        if balancer:
+            split = ", ".join(
+                f"{endpoint.get('Host')} {_fmt(endpoint.get('Share'), 2)}"
+                + ("" if endpoint.get("Healthy") else " (unhealthy)")
+                for endpoint in balancer.get("Endpoints") or []
+            )
+            markdown_lines.append(
+                f"- Load Balancing ({balancer.get('Policy')}): {_fmt(balancer.get('RequestsPerSecond'), 2)} requests/s, "
+                f"{balancer.get('Errors')} errors, split {split}"
+            )
+
+        multicore = metrics_data.get("MultiCore")
+        if multicore and multicore.get("Points"):
+            scaling = ", ".join(
+                f"{point.get('Processes')}p {_fmt(point.get('RequestsPerSecond'), 0)}/s "
+                f"({_fmt(point.get('Efficiency'), 2)})"
+                for point in multicore["Points"]
+            )
+            markdown_lines.append(
+                f"- Multi-core Scaling ({multicore.get('CpuCount')} CPUs), requests/s (efficiency): {scaling}"
+            )
+
+        loop_lag = metrics_data.get("LoopLag")
+        if loop_lag and loop_lag.get("Samples"):
+            markdown_lines.append(
+                f"- Event Loop Lag: p50 {_fmt(loop_lag.get('P50Ms'))} ms, p99 {_fmt(loop_lag.get('P99Ms'))} ms, "
+                f"max {_fmt(loop_lag.get('MaxMs'))} ms, {loop_lag.get('Stalls')} stalls >= "
+                f"{_fmt(loop_lag.get('StallThresholdMs'), 0)} ms"
+            )
+
+        throughput = metrics_data.get("Throughput")
+        if throughput:
+            concurrency = throughput.get("Concurrency") or {}
+            markdown_lines.append(
+                f"- Rate-limited Throughput: {_fmt(throughput.get('TokensPerMinute'), 0)} tokens/min, "
+                f"{_fmt(throughput.get('RequestsPerMinute'), 1)} requests/min, "
+                f"{throughput.get('ThrottleEvents')} throttle events costing {_fmt(throughput.get('ThrottleWaitMs'), 0)} ms "
+                f"of waiting, concurrency limit {_fmt(concurrency.get('Initial'), 0)} -> "
+                f"{_fmt(concurrency.get('Final'), 1)} (max {_fmt(concurrency.get('Max'), 1)})"
+            )
+
+        external = metrics_data.get("ExternalProcess")
+        if external:
+            markdown_lines.append(
+                f"- External Process Monitor: peak RSS {_fmt(external.get('PeakRSSMB'), 1)} MB "
+                f"(USS {_fmt(external.get('PeakUSSMB'), 1)} MB), CPU {_fmt(external.get('CpuTotalS'), 2)} s "
+                f"({_fmt(external.get('MeanCpuPercent'), 1)}% mean), peak {external.get('PeakThreads')} threads in "
+                f"{external.get('PeakProcesses')} process(es), context switches "
+                f"{_fmt(external.get('VoluntaryContextSwitches'), 0)}/{_fmt(external.get('InvoluntaryContextSwitches'), 0)} "
+                f"(voluntary/involuntary)"
+                + ("" if external.get("FinalSample", True) else "; final sample missed, CPU and I/O exclude the last interval")
+            )
+
+        leak = metrics_data.get("LeakDetection")
+        if leak:
+            trends = ", ".join(
+                f"{metric} {_fmt(trend.get('SlopePer1kRequests'))}/1k requests"
+                + (" (significant)" if trend.get("Significant") else "")
+                for metric, trend in (leak.get("Trends") or {}).items()
+            )
+            growing = ", ".join(t.get("Type") for t in (leak.get("TopGrowingTypes") or [])[:3])
+            objects = leak.get("GcObjects") or {}
+            markdown_lines.append(
+                f"- Leak Detection ({_fmt(leak.get('DurationS'), 0)} s, {leak.get('Requests')} requests): "
+                f"{'growth detected' if leak.get('LeakSuspected') else 'no significant growth'}"
+                + (f"; {trends}" if trends else "")
+                + (f"; GC objects {_fmt(objects.get('GrowthPer1kRequests'), 1)}/1k requests" if objects else "")
+                + (f"; most grown types: {growing}" if growing else "")
+            )
+
+        resilience = metrics_data.get("Resilience")
+        if resilience:
+            errors = ", ".join(f"{name} {count}" for name, count in (resilience.get("AttemptErrors") or {}).items())
+            first_attempt = resilience.get("FirstAttemptLatencyMs") or {}
+            retried = resilience.get("RetriedLatencyMs") or {}
+            markdown_lines.append(
+                f"- Resilience: {resilience.get('Failed')}/{resilience.get('Requests')} requests failed, "
+                f"{resilience.get('Retries')} retries, {resilience.get('Timeouts')} timeouts, "
+                f"{resilience.get('CircuitRejections')} circuit rejections; mean latency first attempt "
+                f"{_fmt(first_attempt.get('Mean'))} ms, retried {_fmt(retried.get('Mean'))} ms"
+                + (f"; failed attempts: {errors}" if errors else "")
+            )
+
+        single_flight = metrics_data.get("SingleFlight")
+        if single_flight:
+            markdown_lines.append(
+                f"- Single-Flight: {single_flight.get('CoalescedRequests')}/{single_flight.get('Requests')} requests "
+                f"coalesced ({_fmt(single_flight.get('CoalescedRatio'))}), {single_flight.get('ModelCalls')} model calls"
+            )
+
+        workload = metrics_data.get("Workload")
+        if workload:
+            line = f"- Workload: {workload.get('Source')} ({workload.get('DistinctPrompts')} distinct prompts"
+            replay = workload.get("Replay")
+            if replay:
+                line += f", replayed at {replay.get('Speedup')}x, max {replay.get('MaxInFlight')} in flight"
+            markdown_lines.append(line + ")")
+
+        http_timing = metrics_data.get("HttpTiming")
+        if http_timing:
+            ttfb = (http_timing.get("Phases") or {}).get("TimeToFirstByte", {})
+            connect = (http_timing.get("Phases") or {}).get("Connect", {})
+            markdown_lines.append(
+                f"- HTTP: {http_timing.get('NewConnections')} new / {http_timing.get('ReusedConnections')} reused "
+                f"connections, TTFB P50 {_fmt(ttfb.get('P50Ms'))} ms, connect mean {_fmt(connect.get('MeanMs'))} ms"
+            )
+
+        precision = metrics_data.get("Precision")
+        if precision:
+            markdown_lines.append(
+                f"- Precision: {precision.get('Statistic')} CI width {precision.get('RelativeWidth')} "
+                f"(target {precision.get('TargetRelativeWidth')}, met: {precision.get('TargetMet')})"
+            )
+
         if entry.get("Summary"):
             markdown_lines.extend(["", f"**Summary:** {entry.get('Summary')}"])
 
@@ -765,6 +2420,14 @@ def process_results(script_dir: str) -> int:
         [m["_filepath"] for m in ollama_metrics if m.get("_filepath")],
         destination_folder,
     )
+    trace_files = find_metrics_files(prefix="trace_")
+    if trace_files:
+        print("Moving trace files...")
+        copy_metrics_files(trace_files, destination_folder)
+    conversation_files = find_metrics_files(prefix="conversation_", extension="csv")
+    if conversation_files:
+        print("Moving conversation CSV files...")
+        copy_metrics_files(conversation_files, destination_folder)
     print()
 
     # Reload from current location to ensure paths/filenames are accurate
@@ -834,6 +2497,54 @@ Examples:
   # Run concurrent tests with 50 requests
   python run_performance_tests.py -m concurrent -c 50
   
+  # Iterate until the 95% CI of the p95 is within ±2.5% (30-5000 iterations)
+  python run_performance_tests.py --adaptive --ci-statistic p95 --target-ci-width 0.05 --max-iterations 5000
+
+  # Five fresh-process trials, run in parallel on isolated cores 2-6
+  python run_performance_tests.py --trials 5 --parallel-trials --trial-cpus 2,3,4,5,6
+
+  # Compare GC thresholds, gc.freeze() and a disabled collector for the Python agent
+  python run_performance_tests.py --gc-matrix -i 500
+
+  # Replay a recorded production trace at 10x speed against Ollama
+  python run_performance_tests.py -a Ollama --trace-replay traces/prod.jsonl --replay-speedup 10
+
+  # asyncio vs uvloop: latency and throughput of the concurrent mode with 50 requests in flight
+  python run_performance_tests.py -a HelloWorld -c 50 -i 5000 --event-loop all
+
+  # Aggregate throughput of two Ollama boxes under every balancing policy
+  python run_performance_tests.py -a Ollama -m concurrent -c 16 --ollama-hosts http://gpu1:11434,http://gpu2:11434 --lb-policy all
+
+  # Four local worker processes, 8 concurrent requests each, one merged report
+  python run_performance_tests.py -a HelloWorld -m concurrent -c 8 -i 20000 --distributed-workers 4
+
+  # Two local workers plus three remote hosts running: python -m performance_utils worker --connect COORDINATOR:7070
+  python run_performance_tests.py -a Ollama --distributed-workers 2 --remote-workers 3
+
+  # How far the mock client scales over 1, 2, 4 and 8 processes with 20 concurrent requests each
+  python run_performance_tests.py -a HelloWorld -m multicore -c 20 -i 50000 --process-workers 8
+
+  # Bursts of 20 concurrent requests, 40% duplicates, coalesced onto shared model calls
+  python run_performance_tests.py -a HelloWorld -m concurrent -c 20 --duplicate-ratio 0.4 --single-flight
+
+  # Throughput and p50/p99 at 1..64 concurrent requests, with the knee marked in the report
+  python run_performance_tests.py -a Ollama -i 200 -c 64 --concurrency-sweep auto
+
+  # Sustainable tokens/min of an Azure OpenAI deployment: AIMD concurrency from 4 up to 32, honoring retry-after
+  python run_performance_tests.py -a AzureOpenAI -m throughput -i 2000 -c 4 --max-concurrency 32
+
+  # One-hour soak against Ollama with 8 workers: flags RSS/heap growth per 1k requests after a 10 minute warmup
+  python run_performance_tests.py -a Ollama -m soak -c 8 --soak-duration 3600 --soak-warmup 600
+
+  # 30 s timeout per attempt, 3 retries, circuit breaker after 5 consecutive failures
+  python run_performance_tests.py -a Ollama -m concurrent -c 16 --request-timeout 30 --max-retries 3 --breaker-failures 5
+
+  # How much of a workload with 30% repeated prompts a disk cache absorbs
+  python run_performance_tests.py -a Ollama -m cache --cache-repeat-ratio 0.3 --cache-backend disk
+
+  # Emulate a 1 vCPU / 512 MB container for both runtimes
+  python run_performance_tests.py -a HelloWorld -m concurrent -c 10 -i 2000 --resource-profile 1cpu-512mb
+
   # Process results only (without running tests)
   python run_performance_tests.py --process-only
         """,
@@ -850,7 +2561,8 @@ Examples:
         "-m",
         "--test-mode",
         default="standard",
-        choices=["standard", "batch", "concurrent", "streaming", "scenarios"],
+        choices=["standard", "batch", "concurrent", "streaming", "scenarios", "conversation", "cache", "multicore", "throughput",
+                 "soak"],
         help="Test mode (default: standard)",
     )
     parser.add_argument(
@@ -874,11 +2586,292 @@ Examples:
         default=5,
         help="Number of concurrent requests (default: 5)",
     )
+    parser.add_argument(
+        "--process-workers",
+        type=int,
+        default=0,
+        help="Largest process pool for -m multicore (HelloWorld); the sweep runs 1, 2, 4, ... up to it "
+        "(default: CPU count)",
+    )
+    parser.add_argument(
+        "--concurrency-sweep",
+        metavar="STEPS",
+        help="Run concurrent mode at each concurrency in STEPS (e.g. 1,2,4,8,16, or 'auto' for powers of two up "
+        "to --concurrent-requests) and report the throughput/latency knee (HelloWorld, Ollama)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=64,
+        help="Upper bound of the AIMD concurrency limit in -m throughput (Azure OpenAI), which starts at "
+        "--concurrent-requests (default: 64)",
+    )
+    parser.add_argument(
+        "--soak-duration",
+        type=float,
+        default=300.0,
+        help="Wall-clock seconds of -m soak (HelloWorld, Ollama) (default: 300)",
+    )
+    parser.add_argument(
+        "--soak-warmup",
+        type=float,
+        help="Seconds at the start of -m soak excluded from the leak trend (default: a fifth of --soak-duration)",
+    )
     parser.add_argument(
         "--model",
         default=DEFAULT_MODEL,
         help="Ollama model to use for both .NET and Python agents (default: ministral-3)",
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Keep iterating until the confidence interval is narrower than --target-ci-width "
+        "(Python agents in standard mode; .NET agents and other modes run --iterations)",
+    )
+    parser.add_argument(
+        "--target-ci-width",
+        type=float,
+        default=0.05,
+        help="Target relative CI width for --adaptive, e.g. 0.05 = ±2.5%% (default: 0.05)",
+    )
+    parser.add_argument(
+        "--min-iterations",
+        type=int,
+        default=30,
+        help="Minimum iterations for --adaptive (default: 30)",
+    )
+    parser.add_argument(
+        "--max-iterations",
+        type=int,
+        default=None,
+        help="Maximum iterations for --adaptive (default: --iterations)",
+    )
+    parser.add_argument(
+        "--ci-statistic",
+        default="mean",
+        choices=["mean", "median", "p90", "p95", "p99"],
+        help="Statistic whose CI drives --adaptive termination (default: mean)",
+    )
+    parser.add_argument(
+        "--allocation-profiling",
+        action="store_true",
+        help="Enable tracemalloc allocation profiling in Python agents (adds overhead)",
+    )
+    parser.add_argument(
+        "--trace-phases",
+        action="store_true",
+        help="Record per-request phase spans in Python agents and export a trace file",
+    )
+    parser.add_argument(
+        "--trace-format",
+        default="chrome",
+        choices=["chrome", "otlp"],
+        help="Trace file format for --trace-phases (default: chrome)",
+    )
+    parser.add_argument(
+        "--conversation-turns",
+        type=int,
+        default=10,
+        help="Turns per conversation for --test-mode conversation (default: 10)",
+    )
+    parser.add_argument(
+        "--ollama-hosts",
+        help="Comma-separated Ollama endpoints to balance across client-side in the Python Ollama agent",
+    )
+    parser.add_argument(
+        "--event-loop",
+        default="asyncio",
+        choices=EVENT_LOOPS + ["all"],
+        help="Event loop for the Python agents (uvloop falls back to asyncio if not installed); "
+        "'all' runs each and writes a comparison report (default: asyncio)",
+    )
+    parser.add_argument(
+        "--lb-policy",
+        default="round_robin",
+        choices=LB_POLICIES + ["all"],
+        help="Balancing policy for --ollama-hosts; 'all' runs every policy and writes a comparison report "
+        "(default: round_robin)",
+    )
+    parser.add_argument(
+        "--distributed-workers",
+        type=int,
+        default=0,
+        help="Run the HelloWorld/Ollama workload on N local worker processes under a coordinator",
+    )
+    parser.add_argument(
+        "--remote-workers",
+        type=int,
+        default=0,
+        help="Additional workers the coordinator waits for from other hosts (python -m performance_utils worker)",
+    )
+    parser.add_argument(
+        "--coordinator-host",
+        help="Address the coordinator listens on (default: 127.0.0.1, 0.0.0.0 with --remote-workers)",
+    )
+    parser.add_argument(
+        "--coordinator-port",
+        type=int,
+        default=7070,
+        help="Port the coordinator listens on (default: 7070)",
+    )
+    parser.add_argument(
+        "--single-flight",
+        action="store_true",
+        help="Coalesce identical in-flight requests onto one model call (concurrent mode, Ollama trace replay)",
+    )
+    parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=0.0,
+        help="Share of each concurrent group repeating a prompt of the same group in concurrent mode (default: 0)",
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        help="Per-attempt model call timeout in seconds for the Python agents (default: none)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=0,
+        help="Retries of timed-out, throttled, 5xx or connection failures, with jittered backoff (default: 0)",
+    )
+    parser.add_argument(
+        "--retry-backoff-ms",
+        type=float,
+        default=200.0,
+        help="Backoff cap before the first retry, doubling per retry (default: 200)",
+    )
+    parser.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=0,
+        help="Consecutive failed attempts that open the circuit breaker (default: 0, disabled)",
+    )
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="Serve repeated prompts from an exact-match response cache in the Python Ollama agent",
+    )
+    parser.add_argument(
+        "--cache-backend",
+        default="memory",
+        choices=["memory", "disk"],
+        help="Response cache backend: in-process LRU or SQLite file (default: memory)",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=1000,
+        help="Response cache capacity before LRU eviction (default: 1000)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="Response cache entry time-to-live in seconds (default: no expiry)",
+    )
+    parser.add_argument(
+        "--cache-path",
+        help="SQLite file for --cache-backend disk, kept between runs "
+        "(default: .response_cache.sqlite in the agent directory, emptied at startup)",
+    )
+    parser.add_argument(
+        "--cache-repeat-ratio",
+        type=float,
+        default=0.5,
+        help="Fraction of requests repeating an earlier prompt in --test-mode cache (default: 0.5)",
+    )
+    parser.add_argument(
+        "--prompt-corpus",
+        help="JSONL prompt corpus (prompt, weight, expected_output_tokens) for the Python Ollama/Azure agents",
+    )
+    parser.add_argument(
+        "--corpus-seed",
+        type=int,
+        default=42,
+        help="Random seed for weighted corpus sampling (default: 42)",
+    )
+    parser.add_argument(
+        "--trace-replay",
+        help="JSONL request trace (timestamp or offset_ms, prompt) to replay open-loop in the Python Ollama agent",
+    )
+    parser.add_argument(
+        "--replay-speedup",
+        type=float,
+        default=1.0,
+        help="Divide the trace inter-arrival times by this factor (default: 1.0)",
+    )
+    parser.add_argument(
+        "--http-timing",
+        action="store_true",
+        help="Record HTTP connection timing (connect, TTFB, body read, keep-alive reuse) in the Python Ollama agent",
+    )
+    parser.add_argument(
+        "--gc-preset",
+        default="default",
+        choices=["default", "aggressive", "relaxed", "high"],
+        help="gc.set_threshold preset for Python agents (default: interpreter defaults)",
+    )
+    parser.add_argument(
+        "--gc-freeze",
+        action="store_true",
+        help="Call gc.freeze() in Python agents after warmup",
+    )
+    parser.add_argument(
+        "--gc-disable",
+        action="store_true",
+        help="Disable the Python garbage collector during the timed loop",
+    )
+    parser.add_argument(
+        "--gc-matrix",
+        action="store_true",
+        help="Run Python agents under every GC configuration and write a trade-off report",
+    )
+    parser.add_argument(
+        "--trials",
+        type=int,
+        default=1,
+        help="Independent trials per configuration, each in a fresh process (default: 1)",
+    )
+    parser.add_argument(
+        "--parallel-trials",
+        action="store_true",
+        help="Run Python trials concurrently instead of one after another",
+    )
+    parser.add_argument(
+        "--trial-cpus",
+        default="",
+        help="Comma-separated CPU ids to pin trials to, round-robin (Linux only), e.g. 2,3,4,5",
+    )
+    parser.add_argument(
+        "--resource-profile",
+        choices=sorted(RESOURCE_PROFILES),
+        help="Run agent processes constrained like a container of this size: CPU affinity and a memory "
+        "limit (cgroup scope via systemd-run, else RLIMIT_DATA; Linux only)",
+    )
+    parser.add_argument(
+        "--cpu-set",
+        default="",
+        help="Comma-separated CPU ids agent processes may run on, overriding the profile's CPU count",
+    )
+    parser.add_argument(
+        "--memory-limit-mb",
+        type=int,
+        help="Memory limit of agent processes in MB, overriding the profile",
+    )
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=0,
+        help="Niceness increment for agent processes (default: 0)",
+    )
+    parser.add_argument(
+        "--monitor-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between external samples of each agent's process tree (RSS, USS, CPU time, threads, "
+        "context switches, I/O; needs psutil); 0 disables the monitor (default: 0.5)",
+    )
     parser.add_argument(
         "--process-only",
         action="store_true",
@@ -913,15 +2906,35 @@ Examples:
         print()
         return process_results(script_dir)
 
+    resource_profile = resolve_resource_profile(
+        args.resource_profile,
+        [int(cpu) for cpu in args.cpu_set.split(",") if cpu.strip()],
+        args.memory_limit_mb,
+        args.nice,
+    )
+
     print_colored("Configuration:", "GREEN")
     print(f"  Agent Type: {args.agent_type}")
     print(f"  Test Mode: {args.test_mode}")
     print(f"  Iterations: {args.iterations}")
     print(f"  Model: {args.model}")
+    if args.adaptive:
+        print(
+            f"  Adaptive: {args.ci_statistic} CI width <= {args.target_ci_width:.1%} "
+            f"({args.min_iterations}-{args.max_iterations or args.iterations} iterations)"
+        )
+        if args.test_mode != "standard":
+            print_colored(f"  --adaptive only applies to standard mode; {args.test_mode} runs --iterations", "YELLOW")
+        else:
+            print_colored("  --adaptive only applies to the Python agents; .NET agents run --iterations", "YELLOW")
+    if args.trials > 1:
+        print(f"  Trials: {args.trials} ({'parallel' if args.parallel_trials else 'sequential'})")
     if args.test_mode == "batch":
         print(f"  Batch Size: {args.batch_size}")
     if args.test_mode == "concurrent":
         print(f"  Concurrent Requests: {args.concurrent_requests}")
+    if resource_profile:
+        print(f"  Resource Profile: {describe_resource_profile(resource_profile)}")
     print()
 
     # Clean up old metrics
@@ -935,8 +2948,87 @@ Examples:
         "batch_size": args.batch_size,
         "concurrent_requests": args.concurrent_requests,
         "model": args.model,
+        "adaptive": args.adaptive,
+        "target_ci_width": args.target_ci_width,
+        "min_iterations": args.min_iterations,
+        "max_iterations": args.max_iterations,
+        "ci_statistic": args.ci_statistic,
+        "allocation_profiling": args.allocation_profiling,
+        "trace_phases": args.trace_phases,
+        "trace_format": args.trace_format,
+        "http_timing": args.http_timing,
+        "conversation_turns": args.conversation_turns,
+        "process_workers": args.process_workers,
+        "max_concurrency": args.max_concurrency,
+        "soak_duration": args.soak_duration,
+        "soak_warmup": args.soak_warmup,
+        "concurrency_sweep": concurrency_steps(args.concurrency_sweep, args.concurrent_requests)
+        if args.concurrency_sweep else [],
+        "ollama_hosts": args.ollama_hosts,
+        "lb_policy": args.lb_policy,
+        "distributed_workers": max(0, args.distributed_workers),
+        "remote_workers": max(0, args.remote_workers),
+        "coordinator_host": args.coordinator_host or ("0.0.0.0" if args.remote_workers else "127.0.0.1"),
+        "coordinator_port": args.coordinator_port,
+        "single_flight": args.single_flight,
+        "duplicate_ratio": args.duplicate_ratio,
+        "request_timeout": args.request_timeout,
+        "max_retries": max(0, args.max_retries),
+        "retry_backoff_ms": args.retry_backoff_ms,
+        "breaker_failures": max(0, args.breaker_failures),
+        "response_cache": args.response_cache,
+        "cache_backend": args.cache_backend,
+        "cache_max_entries": args.cache_max_entries,
+        "cache_ttl": args.cache_ttl,
+        "cache_repeat_ratio": args.cache_repeat_ratio,
+        # Child processes run in the agent directory, so pass absolute paths
+        "prompt_corpus": os.path.abspath(args.prompt_corpus) if args.prompt_corpus else None,
+        "corpus_seed": args.corpus_seed,
+        "trace_replay": os.path.abspath(args.trace_replay) if args.trace_replay else None,
+        "cache_path": os.path.abspath(args.cache_path) if args.cache_path else None,
+        "replay_speedup": args.replay_speedup,
+        "trials": max(1, args.trials),
+        "parallel_trials": args.parallel_trials,
+        "trial_cpus": [int(cpu) for cpu in args.trial_cpus.split(",") if cpu.strip()],
+        "resource_profile": resource_profile,
+        "monitor_interval": args.monitor_interval,
+        "extra_env": {},
     }
 
+    if args.gc_preset != "default":
+        test_config["extra_env"]["GC_PRESET"] = args.gc_preset
+    if args.gc_freeze:
+        test_config["extra_env"]["GC_FREEZE"] = "1"
+    if args.gc_disable:
+        test_config["extra_env"]["GC_DISABLE"] = "1"
+    if args.event_loop != "all":
+        test_config["extra_env"]["EVENT_LOOP"] = args.event_loop
+
+    if test_config["distributed_workers"] or test_config["remote_workers"]:
+        print_colored("Running distributed load test...", "CYAN")
+        print()
+        return run_distributed(script_dir, args.agent_type, test_config)
+
+    if test_config["concurrency_sweep"]:
+        print_colored("Running concurrency sweep (Python agents only)...", "CYAN")
+        print()
+        return run_concurrency_sweep(script_dir, args.agent_type, test_config)
+
+    if args.event_loop == "all":
+        print_colored("Comparing event loop implementations (Python agents only)...", "CYAN")
+        print()
+        return run_event_loop_matrix(script_dir, args.agent_type, test_config)
+
+    if args.ollama_hosts and args.lb_policy == "all":
+        print_colored("Comparing load balancing policies (Python Ollama agent)...", "CYAN")
+        print()
+        return run_lb_comparison(script_dir, test_config)
+
+    if args.gc_matrix:
+        print_colored("Running GC tuning matrix (Python agents only)...", "CYAN")
+        print()
+        return run_gc_matrix(script_dir, args.agent_type, test_config)
+
     # Run tests
     print_colored("Running tests...", "CYAN")
     print()
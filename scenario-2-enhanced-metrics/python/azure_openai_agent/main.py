@@ -1,16 +1,49 @@
-import asyncio
 import json
 import os
 import time
-import psutil
+import sys
+from pathlib import Path
 from random import randint
 from typing import Annotated
 from datetime import datetime, timezone
 
+# Add parent directory to path for performance_utils import
+_parent_dir = Path(__file__).resolve().parent.parent
+if str(_parent_dir) not in sys.path:
+    sys.path.insert(0, str(_parent_dir))
+
 from agent_framework.azure import AzureAIClient
 from azure.identity.aio import AzureCliCredential
 from pydantic import Field
 from dotenv import load_dotenv
+from performance_utils import (
+    BENCHMARK_SCENARIOS,
+    GcTuning,
+    PerformanceMetrics,
+    PromptEntry,
+    PromptSampler,
+    RateLimitedRunner,
+    ResilientCaller,
+    ScenarioStats,
+    TokenAccounting,
+    adaptive_rule_from_env,
+    aimd_from_env,
+    classify_error,
+    current_event_loop,
+    gc_to_dict,
+    interleaved_schedule,
+    load_corpus,
+    loop_lag_to_dict,
+    precision_to_dict,
+    resilience_policy_from_env,
+    resilience_to_dict,
+    run_streamed,
+    run_with_event_loop,
+    scenario_results_to_dict,
+    throughput_to_dict,
+    tokens_to_dict,
+    workload_to_dict,
+)
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +58,9 @@ Shows both streaming and non-streaming responses with iteration testing.
 Reference: https://github.com/microsoft/agent-framework/blob/main/python/samples/getting_started/agents/azure_ai/azure_ai_basic.py
 """
 
+# Modes implemented by this runner; other TEST_MODE values fall back to standard
+SUPPORTED_TEST_MODES = ("standard", "scenarios", "throughput")
+
 
 def get_weather(
     location: Annotated[str, Field(description="The location to get the weather for.")],
@@ -41,16 +77,46 @@ async def run_performance_test() -> None:
     endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
     deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5-mini")
     
-    # Start performance measurement
-    start_time = time.time()
-    process = psutil.Process(os.getpid())
-    start_memory = process.memory_info().rss / 1024 / 1024  # Convert to MB
-    
     # Performance test: Run agent operations. Make configurable via environment variable for easier testing.
     ITERATIONS = int(os.getenv("ITERATIONS", "1000"))
-    iteration_times = []
+    test_mode = os.getenv("TEST_MODE", "standard").lower()
+    if test_mode not in SUPPORTED_TEST_MODES:
+        print(f"Test mode '{test_mode}' is not supported by this agent, running standard mode\n")
+        test_mode = "standard"
+    scenario_results = {}
+    token_accounting = TokenAccounting()
     warmup_successful = False
     
+    # Optional weighted prompts from a JSONL corpus (PROMPT_CORPUS) instead of "Say hello {i}"
+    corpus_path = os.getenv("PROMPT_CORPUS")
+    prompt_sampler = PromptSampler(load_corpus(corpus_path), seed=int(os.getenv("CORPUS_SEED", "42"))) if corpus_path else None
+    prompts_used = []
+    
+    # Optional per-request timeout, retries with backoff and circuit breaker (REQUEST_TIMEOUT_S, MAX_RETRIES,
+    # BREAKER_FAILURES, ...). With a policy set, requests that fail for good are counted instead of aborting the run
+    resilience_policy = resilience_policy_from_env(os.environ)
+    resilient_caller = ResilientCaller(resilience_policy)
+    if resilience_policy.enabled:
+        print(f"Resilience policy: {resilience_policy.describe()}\n")
+    
+    # Throughput mode: ITERATIONS requests under an AIMD concurrency limit starting at CONCURRENT_REQUESTS,
+    # halved on every round of 429s and waiting out retry-after, to find the sustainable throughput
+    throughput_result = None
+    
+    # Optional adaptive termination of standard mode: iterate until the CI is narrow enough (ADAPTIVE_ITERATIONS=1)
+    adaptive_rule = adaptive_rule_from_env(os.environ) if test_mode == "standard" else None
+    max_iterations = adaptive_rule.max_iterations if adaptive_rule else ITERATIONS
+    precision_report = None
+    
+    # GC experiment settings (GC_PRESET, GC_THRESHOLD, GC_FREEZE, GC_DISABLE); defaults change nothing
+    gc_tuning = GcTuning.from_env(os.environ)
+    gc_tuning.apply()
+    if not gc_tuning.is_default:
+        print(f"GC configuration: {gc_tuning.describe()}\n")
+    
+    performance_metrics = PerformanceMetrics(loop_lag_interval_ms=float(os.getenv("LOOP_LAG_INTERVAL_MS", "0")))
+    performance_metrics.start()
+    
     try:
         if not endpoint:
             raise RuntimeError("AZURE_OPENAI_ENDPOINT not set. Set AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT_NAME.")
@@ -76,21 +142,107 @@ async def run_performance_test() -> None:
             warmup_time_ms = (warmup_end - warmup_start) * 1000
             print(f"✓ Warmup completed in {warmup_time_ms:.3f} ms")
             warmup_successful = True
+            gc_tuning.after_warmup()
             
-            print(f"✓ Running {ITERATIONS} iterations for performance testing\n")
-            
-            # Run 1000 iterations with actual API calls
-            for i in range(ITERATIONS):
-                iteration_start = time.time()
+            gc_tuning.enter_timed_loop()
+            try:
+                if test_mode == "scenarios":
+                    # Benchmark prompts in interleaved randomized rounds, streamed for TTFT
+                    scenario_results = {name: ScenarioStats(prompt) for name, prompt in BENCHMARK_SCENARIOS.items()}
+                    schedule = interleaved_schedule(
+                        list(BENCHMARK_SCENARIOS),
+                        max(1, ITERATIONS // len(BENCHMARK_SCENARIOS)),
+                        seed=int(os.getenv("SCENARIO_SEED", "42")),
+                    )
+                    print(f"✓ Running {len(schedule)} interleaved scenario requests\n")
+                    for i, name in enumerate(schedule):
+                        stats = scenario_results[name]
+                        try:
+                            run = await resilient_caller.call(lambda: run_streamed(agent, stats.prompt))
+                        except Exception as ex:
+                            stats.errors += 1
+                            print(f"  Scenario {name} (request {i + 1}) failed: {ex}")
+                            continue
+                        performance_metrics.record_measurement(run.latency_ms)
+                        stats.latencies_ms.append(run.latency_ms)
+                        if run.ttft_ms is not None:
+                            stats.ttfts_ms.append(run.ttft_ms)
+                        stats.tokens.record(run.latency_ms, stats.prompt, run.response)
+                        token_accounting.record(run.latency_ms, stats.prompt, run.response)
+                    
+                        if (i + 1) % 100 == 0:
+                            performance_metrics.capture_memory_snapshot()
+                            performance_metrics.capture_cpu_snapshot()
+                            print(f"  Progress: {i + 1}/{len(schedule)} requests completed")
+                elif test_mode == "throughput":
+                    runner = RateLimitedRunner(
+                        aimd_from_env(os.environ),
+                        max_throttle_retries=int(os.getenv("THROTTLE_MAX_RETRIES", "10")),
+                    )
+                    print(f"✓ Running {ITERATIONS} requests starting at {runner.controller.limit:g} concurrent "
+                          f"(AIMD, max {runner.controller.maximum:g})\n")
+                
+                    async def throughput_request(index: int) -> int:
+                        entry = prompt_sampler.next() if prompt_sampler else PromptEntry(f"Say hello {index + 1}")
+                        request_start = time.time()
+                        response = await agent.run(entry.prompt)
+                        request_time_ms = (time.time() - request_start) * 1000
+                        performance_metrics.record_measurement(request_time_ms)
+                        token_sample = token_accounting.record(request_time_ms, entry.prompt, response)
+                        prompts_used.append(entry)
+                        return token_sample.prompt_tokens + token_sample.completion_tokens
                 
-                # Invoke the agent
-                await agent.run(f"Say hello {i + 1}")
+                    def throughput_progress(completed: int):
+                        if completed % 100 == 0:
+                            performance_metrics.capture_memory_snapshot()
+                            performance_metrics.capture_cpu_snapshot()
+                            print(f"  Progress: {completed}/{ITERATIONS} requests completed "
+                                  f"(concurrency limit {runner.controller.limit:.1f})")
                 
-                iteration_end = time.time()
-                iteration_times.append((iteration_end - iteration_start) * 1000)
+                    throughput_result = await runner.run(ITERATIONS, throughput_request, throughput_progress)
+                else:
+                    if adaptive_rule:
+                        print(f"✓ Running adaptive iterations ({adaptive_rule.min_iterations}-"
+                              f"{adaptive_rule.max_iterations}) until the {adaptive_rule.confidence:.0%} CI of the "
+                              f"{adaptive_rule.statistic} is within ±{adaptive_rule.target_relative_width / 2:.1%}\n")
+                    else:
+                        print(f"✓ Running {ITERATIONS} iterations for performance testing\n")
                 
-                if (i + 1) % 100 == 0:
-                    print(f"  Progress: {i + 1}/{ITERATIONS} iterations completed")
+                    # Run 1000 iterations with actual API calls
+                    for i in range(max_iterations):
+                        entry = prompt_sampler.next() if prompt_sampler else PromptEntry(f"Say hello {i + 1}")
+                        iteration_start = time.time()
+                    
+                        # Invoke the agent
+                        try:
+                            response = await resilient_caller.call(lambda: agent.run(entry.prompt))
+                        except Exception as ex:
+                            if not resilience_policy.enabled:
+                                raise
+                            print(f"  Request {i + 1} failed ({classify_error(ex)}): {ex}")
+                            continue
+                    
+                        iteration_end = time.time()
+                        iteration_time_ms = (iteration_end - iteration_start) * 1000
+                        performance_metrics.record_measurement(iteration_time_ms)
+                        token_accounting.record(iteration_time_ms, entry.prompt, response)
+                        prompts_used.append(entry)
+                    
+                        if (i + 1) % 100 == 0:
+                            performance_metrics.capture_memory_snapshot()
+                            performance_metrics.capture_cpu_snapshot()
+                            print(f"  Progress: {i + 1}/{max_iterations} iterations completed")
+                        
+                        if adaptive_rule and adaptive_rule.should_stop(performance_metrics.measurements):
+                            break
+                    
+                    if adaptive_rule:
+                        precision_report = adaptive_rule.final_report(performance_metrics.measurements)
+                        status = "reached" if precision_report.target_met else "NOT reached"
+                        print(f"✓ Precision target {status} after {precision_report.sample_count} iterations "
+                              f"(relative CI width {precision_report.relative_width:.2%})")
+            finally:
+                gc_tuning.exit_timed_loop()
             
             # Show a sample streaming response
             print("\n--- Sample Agent Streaming Response ---")
@@ -100,11 +252,6 @@ async def run_performance_test() -> None:
                     print(chunk.text, end="", flush=True)
             print("\n---------------------------\n")
         
-        # Calculate statistics
-        avg_iteration_time = sum(iteration_times) / len(iteration_times)
-        min_iteration_time = min(iteration_times)
-        max_iteration_time = max(iteration_times)
-        
     except Exception as ex:
         print(f"Error: {ex}")
         print(f"Type: {type(ex).__name__}")
@@ -112,19 +259,40 @@ async def run_performance_test() -> None:
         traceback.print_exc()
         raise
     
-    # Stop performance measurement
-    end_time = time.time()
-    end_memory = process.memory_info().rss / 1024 / 1024  # Convert to MB
-    total_execution_time = (end_time - start_time) * 1000  # Convert to ms
-    memory_used = end_memory - start_memory
+    # Get comprehensive metrics results
+    result = performance_metrics.get_result()
     
     print("=== Performance Metrics ===")
-    print(f"Total Iterations: {ITERATIONS}")
-    print(f"Total Execution Time: {total_execution_time:.0f} ms")
-    print(f"Average Time per Iteration: {avg_iteration_time:.3f} ms")
-    print(f"Min Iteration Time: {min_iteration_time:.3f} ms")
-    print(f"Max Iteration Time: {max_iteration_time:.3f} ms")
-    print(f"Memory Used: {memory_used:.2f} MB")
+    print(f"Total Iterations: {result.measurement_count}")
+    print(f"Total Execution Time: {result.total_elapsed_ms:.0f} ms")
+    print(f"Mean/Median: {result.mean:.3f}/{result.median:.3f} ms, P95/P99: {result.p95:.3f}/{result.p99:.3f} ms")
+    print(f"Min/Max Iteration Time: {result.min:.3f}/{result.max:.3f} ms")
+    print(f"RSS Delta: {result.rss_delta_mb:.2f} MB, Peak RSS: {result.peak_rss_mb:.2f} MB")
+    print(f"GC Gen0/Gen1/Gen2: {result.gc_gen0_collections}/{result.gc_gen1_collections}/{result.gc_gen2_collections} "
+          f"({result.gc_total_pause_ms:.3f} ms paused)")
+    if result.loop_lag and result.loop_lag.samples:
+        print(f"Event Loop Lag P99/Max: {result.loop_lag.p99_ms:.3f}/{result.loop_lag.max_ms:.3f} ms "
+              f"({result.loop_lag.stalls} stalls)")
+    # Throughput requests overlap, so token throughput is relative to the wall time of the run
+    token_result = token_accounting.get_result(throughput_result.elapsed_ms if throughput_result else None)
+    print(f"Tokens: {token_result.total_prompt_tokens} prompt, {token_result.total_completion_tokens} completion "
+          f"({token_result.completion_throughput_tokens_per_second:.1f} completion tokens/s)")
+    if throughput_result:
+        print(f"Throughput: {throughput_result.tokens_per_minute:.0f} tokens/min, "
+              f"{throughput_result.requests_per_minute:.1f} requests/min "
+              f"({throughput_result.succeeded} succeeded, {throughput_result.failed} failed)")
+        print(f"Throttling: {throughput_result.throttle_events} throttle events on "
+              f"{throughput_result.throttled_requests} requests, {throughput_result.throttle_wait_ms:.0f} ms waiting "
+              f"({throughput_result.retry_after_honored} retry-after honored, "
+              f"{throughput_result.paused_ms:.0f} ms all workers paused)")
+        print(f"Concurrency limit: {throughput_result.initial_concurrency:g} -> {throughput_result.final_concurrency:.1f} "
+              f"(max {throughput_result.max_concurrency:.1f}, mean in flight {throughput_result.mean_in_flight:.1f}, "
+              f"{throughput_result.concurrency_decreases} decreases)")
+    resilience_result = resilient_caller.get_result() if resilience_policy.enabled else None
+    if resilience_result:
+        print(f"Resilience: {resilience_result.succeeded} succeeded, {resilience_result.failed} failed, "
+              f"{resilience_result.retries} retries, {resilience_result.timeouts} timeouts, "
+              f"{resilience_result.circuit_rejections} rejected by the circuit breaker")
     print("========================\n")
     
     # Export metrics to JSON file
@@ -136,25 +304,86 @@ async def run_performance_test() -> None:
             "Provider": "AzureOpenAI",
             "Model": deployment_name,
             "Endpoint": endpoint or "N/A (Demo Mode)",
+            "TestMode": test_mode,
+            "EventLoop": current_event_loop(),
             "Timestamp": current_timestamp.isoformat(),
             "WarmupSuccessful": warmup_successful
         },
         "Metrics": {
-            "TotalIterations": ITERATIONS,
-            "TotalExecutionTimeMs": total_execution_time,
-            "AverageTimePerIterationMs": avg_iteration_time,
-            "MinIterationTimeMs": min_iteration_time,
-            "MaxIterationTimeMs": max_iteration_time,
-            "MemoryUsedMB": memory_used
+            "TotalIterations": result.measurement_count,
+            "TotalExecutionTimeMs": result.total_elapsed_ms,
+            
+            "Statistics": {
+                "Mean": result.mean,
+                "Median": result.median,
+                "Min": result.min,
+                "Max": result.max,
+                "P90": result.p90,
+                "P95": result.p95,
+                "P99": result.p99,
+                "StandardDeviation": result.stdev
+            },
+            
+            "Memory": {
+                "RSSDeltaMB": result.rss_delta_mb,
+                "VMSDeltaMB": result.vms_delta_mb,
+                "PeakRSSMB": result.peak_rss_mb,
+                "PeakVMSMB": result.peak_vms_mb
+            },
+            
+            "GarbageCollection": gc_to_dict(result.gc),
+            "LoopLag": loop_lag_to_dict(result.loop_lag) if result.loop_lag else None,
+            "GcTuning": gc_tuning.to_dict(),
+            
+            "CPU": {
+                "AveragePercent": result.average_cpu_percent,
+                "MaxPercent": result.max_cpu_percent
+            },
+            
+            "Tokens": tokens_to_dict(token_result),
+            
+            # Legacy fields for backward compatibility
+            "AverageTimePerIterationMs": result.mean,
+            "MinIterationTimeMs": result.min,
+            "MaxIterationTimeMs": result.max,
+            "MemoryUsedMB": result.rss_delta_mb
         }
     }
     
+    if scenario_results:
+        metrics_data["Metrics"]["ScenarioResults"] = scenario_results_to_dict(scenario_results)
+        all_ttfts = [ttft for stats in scenario_results.values() for ttft in stats.ttfts_ms]
+        metrics_data["Metrics"]["TimeToFirstTokenMs"] = sum(all_ttfts) / len(all_ttfts) if all_ttfts else None
+    
+    if resilience_result:
+        metrics_data["Metrics"]["Resilience"] = resilience_to_dict(resilience_result)
+    
+    if throughput_result:
+        metrics_data["Metrics"]["Throughput"] = throughput_to_dict(throughput_result)
+    
+    if precision_report:
+        metrics_data["Metrics"]["Precision"] = precision_to_dict(precision_report)
+    
+    if corpus_path and test_mode in ("standard", "throughput"):
+        metrics_data["Metrics"]["Workload"] = workload_to_dict(
+            os.path.basename(corpus_path),
+            prompts_used,
+            [sample.completion_tokens for sample in token_accounting.samples],
+        )
+    
+    # Raw samples let run_performance_tests.py merge repeated trials
+    if os.getenv("EXPORT_SAMPLES", "").lower() in ("1", "true", "yes"):
+        metrics_data["Metrics"]["Samples"] = performance_metrics.measurements
+    
     timestamp = current_timestamp.strftime("%Y%m%d_%H%M%S")
-    output_filename = f"metrics_python_azureopenai_{timestamp}.json"
+    mode_suffix = f"{test_mode}_" if test_mode != "standard" else ""
+    output_filename = os.path.join(
+        os.getenv("METRICS_OUTPUT_DIR", "."), f"metrics_python_azureopenai_{mode_suffix}{timestamp}.json"
+    )
     with open(output_filename, 'w') as f:
         json.dump(metrics_data, f, indent=2)
     print(f"✓ Metrics exported to: {output_filename}\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(run_performance_test())
+    run_with_event_loop(run_performance_test())
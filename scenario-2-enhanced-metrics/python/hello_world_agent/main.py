@@ -3,17 +3,68 @@ import json
 import time
 import psutil
 import os
+import random
 import statistics
+import sys
 from datetime import datetime, timezone
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional
+
+# Add parent directory to path for performance_utils import
+_parent_dir = Path(__file__).resolve().parent.parent
+if str(_parent_dir) not in sys.path:
+    sys.path.insert(0, str(_parent_dir))
+
+from performance_utils import (
+    AdaptiveStopRule,
+    GcMonitor,
+    GcResult,
+    GcTuning,
+    LoopLagMonitor,
+    LoopLagResult,
+    LeakDetector,
+    LeakResult,
+    PrecisionReport,
+    ScalingPoint,
+    SingleFlight,
+    SingleFlightResult,
+    TokenAccounting,
+    adaptive_rule_from_env,
+    current_event_loop,
+    duplicate_bursts,
+    gc_to_dict,
+    leak_detector_from_env,
+    leak_to_dict,
+    loop_lag_to_dict,
+    precision_to_dict,
+    run_with_event_loop,
+    scaling_sweep,
+    scaling_to_dict,
+    single_flight_to_dict,
+    tokens_to_dict,
+)
 
 print("=== Python Microsoft Agent Framework - Hello World ===\n")
 
 # Configuration - Test modes
-test_mode = os.getenv("TEST_MODE", "standard")  # standard, batch, concurrent, streaming, scenarios
+test_mode = os.getenv("TEST_MODE", "standard")  # standard, batch, concurrent, streaming, scenarios, multicore, soak
 ITERATIONS = int(os.getenv("ITERATIONS", "1000"))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "10"))
 CONCURRENT_REQUESTS = int(os.getenv("CONCURRENT_REQUESTS", "5"))
+# Concurrent mode: DUPLICATE_RATIO of each group repeats a prompt of the same group;
+# SINGLE_FLIGHT=1 coalesces identical in-flight requests onto one (simulated) model call
+DUPLICATE_RATIO = float(os.getenv("DUPLICATE_RATIO", "0"))
+single_flight = SingleFlight() if os.getenv("SINGLE_FLIGHT", "").lower() in ("1", "true", "yes") else None
+# Multicore mode: shard ITERATIONS over 1..PROCESS_WORKERS processes, CONCURRENT_REQUESTS tasks each
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", "0")) or os.cpu_count() or 1
+# Soak mode: CONCURRENT_REQUESTS closed-loop workers for SOAK_DURATION_S seconds with leak detection;
+# SOAK_LEAK_KB retains that much per request to check that the detector catches a known leak
+SOAK_DURATION_S = float(os.getenv("SOAK_DURATION_S", "300"))
+SOAK_LEAK_KB = float(os.getenv("SOAK_LEAK_KB", "0"))
+# Latency statistics of a soak run come from a uniform reservoir, so measuring does not grow memory
+SOAK_LATENCY_SAMPLES = 10000
+# Optional adaptive termination of standard mode: iterate until the CI is narrow enough (ADAPTIVE_ITERATIONS=1)
+adaptive_rule = adaptive_rule_from_env(os.environ)
 
 # Comprehensive benchmarking scenarios
 benchmark_scenarios = {
@@ -33,10 +84,17 @@ iteration_times = []
 cpu_samples = []
 time_to_first_tokens = []
 scenario_results = {}
+scenario_tokens = {}
+scaling_points = []
+# Scheduling delay of the event loop, off unless LOOP_LAG_INTERVAL_MS is set (e.g. 10)
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "0"))
+# GC experiment settings (GC_PRESET, GC_THRESHOLD, GC_FREEZE, GC_DISABLE); defaults change nothing
+gc_tuning = GcTuning.from_env(os.environ)
 
 
-async def run_standard_test(iterations: int, times: List[float], cpu_samples: List[float]) -> None:
-    """Run standard sequential test"""
+async def run_standard_test(iterations: int, times: List[float], cpu_samples: List[float],
+                            rule: Optional[AdaptiveStopRule] = None) -> None:
+    """Run standard sequential test, stopping early once `rule` reaches its precision target"""
     for i in range(iterations):
         iteration_start = time.time()
         
@@ -50,6 +108,9 @@ async def run_standard_test(iterations: int, times: List[float], cpu_samples: Li
         if (i + 1) % 100 == 0:
             cpu_samples.append(process.cpu_percent(interval=0.1))
             print(f"  Progress: {i + 1}/{iterations} iterations completed")
+        
+        if rule and rule.should_stop(times):
+            break
 
 
 async def run_batch_test(iterations: int, batch_size: int, times: List[float], cpu_samples: List[float]) -> None:
@@ -82,14 +143,23 @@ async def run_batch_test(iterations: int, batch_size: int, times: List[float], c
 async def run_concurrent_test(iterations: int, concurrent_req: int, times: List[float], cpu_samples: List[float]) -> None:
     """Run concurrent request test"""
     groups = (iterations + concurrent_req - 1) // concurrent_req
+    prompts = duplicate_bursts(lambda n: f"Say hello {n + 1}", iterations, concurrent_req, DUPLICATE_RATIO, seed=42)
+    
+    async def call_model(prompt: str) -> str:
+        await asyncio.sleep(0.001)  # Simulate work
+        return f"Concurrent response to: {prompt}"
+    
     for group in range(groups):
         group_start = time.time()
         current_group_size = min(concurrent_req, iterations - group * concurrent_req)
         
         async def process_request(request_id: int) -> float:
             start = time.time()
-            await asyncio.sleep(0.001)  # Simulate work
-            response = f"Concurrent response {request_id + 1}"
+            prompt = prompts[request_id]
+            if single_flight:
+                response, _ = await single_flight.run(prompt, lambda: call_model(prompt))
+            else:
+                response = await call_model(prompt)
             end = time.time()
             return (end - start) * 1000
         
@@ -104,6 +174,50 @@ async def run_concurrent_test(iterations: int, concurrent_req: int, times: List[
         print(f"  Group {group + 1}/{groups} completed ({current_group_size} concurrent requests in {group_time_ms:.3f} ms)")
 
 
+async def run_soak_test(duration_s: float, concurrent_req: int, times: List[float], cpu_samples: List[float],
+                        detector: LeakDetector) -> None:
+    """Run closed-loop concurrent requests for a wall-clock duration while sampling memory"""
+    retained = []
+    rng = random.Random(42)
+    process.cpu_percent(interval=None)
+    detector.start()
+    deadline = time.time() + duration_s
+    
+    async def worker() -> None:
+        while time.time() < deadline:
+            start = time.time()
+            await asyncio.sleep(0.001)  # Simulate work
+            if SOAK_LEAK_KB:
+                retained.append(bytearray(int(SOAK_LEAK_KB * 1024)))
+            latency_ms = (time.time() - start) * 1000
+            detector.record_request(latency_ms)
+            if len(times) < SOAK_LATENCY_SAMPLES:
+                times.append(latency_ms)
+            else:
+                slot = rng.randrange(detector.requests)
+                if slot < SOAK_LATENCY_SAMPLES:
+                    times[slot] = latency_ms
+            if detector.requests % 10000 == 0:
+                print(f"  {detector.requests} requests, {detector.elapsed_s:.0f}/{duration_s:.0f} s")
+    
+    await asyncio.gather(*(worker() for _ in range(concurrent_req)))
+    cpu_samples.append(process.cpu_percent(interval=None))
+
+
+def run_multicore_test(iterations: int, concurrent_req: int, max_processes: int, times: List[float],
+                       cpu_samples: List[float], points: List[ScalingPoint]) -> None:
+    """Run concurrent mock requests over process pools of 1..max_processes workers"""
+    sweep, last_run = scaling_sweep(max_processes, iterations, concurrent_req)
+    for point in sweep:
+        print(f"  {point.processes} process(es): {point.requests_per_second:.0f} requests/s, "
+              f"speedup {point.speedup:.2f}x, efficiency {point.efficiency:.0%}, "
+              f"{point.cpu_percent_per_process:.0f}% CPU per process")
+    points.extend(sweep)
+    # Latency and CPU figures describe the largest pool
+    times.extend(last_run.samples)
+    cpu_samples.append(last_run.cpu_percent)
+
+
 async def run_streaming_test(iterations: int, times: List[float], ttfts: List[float], cpu_samples: List[float]) -> None:
     """Run streaming response test with time-to-first-token"""
     for i in range(iterations):
@@ -127,11 +241,13 @@ async def run_streaming_test(iterations: int, times: List[float], ttfts: List[fl
 
 
 async def run_scenarios_test(scenarios: Dict[str, str], times: List[float], 
-                            scenario_results: Dict[str, List[float]], cpu_samples: List[float]) -> None:
+                            scenario_results: Dict[str, List[float]], cpu_samples: List[float],
+                            scenario_tokens: Dict[str, TokenAccounting]) -> None:
     """Run comprehensive scenarios test"""
     for scenario_name, prompt in scenarios.items():
         print(f"Running scenario: {scenario_name}")
         scenario_times = []
+        token_accounting = scenario_tokens.setdefault(scenario_name, TokenAccounting())
         
         # Run each scenario 200 times
         for i in range(200):
@@ -146,6 +262,8 @@ async def run_scenarios_test(scenarios: Dict[str, str], times: List[float],
             iteration_time_ms = (iteration_end - iteration_start) * 1000
             scenario_times.append(iteration_time_ms)
             times.append(iteration_time_ms)
+            # Mock responses carry no usage data, so token counts are estimated locally
+            token_accounting.record(iteration_time_ms, prompt, response_text=response)
         
         scenario_results[scenario_name] = scenario_times
         cpu_samples.append(process.cpu_percent(interval=0.1))
@@ -154,7 +272,14 @@ async def run_scenarios_test(scenarios: Dict[str, str], times: List[float],
 
 async def export_metrics(test_mode: str, total_time_ms: float, iteration_times: List[float],
                         memory_used: float, avg_cpu: float, ttfts: List[float],
-                        scenarios: Dict[str, List[float]], batch_size: int, concurrent_requests: int) -> None:
+                        scenarios: Dict[str, List[float]], batch_size: int, concurrent_requests: int,
+                        tokens: Dict[str, TokenAccounting],
+                        coalescing: Optional[SingleFlightResult] = None,
+                        scaling: Optional[List[ScalingPoint]] = None,
+                        loop_lag: Optional[LoopLagResult] = None,
+                        leak: Optional[LeakResult] = None,
+                        gc_result: Optional[GcResult] = None,
+                        precision: Optional[PrecisionReport] = None) -> None:
     """Export comprehensive metrics to JSON"""
     current_timestamp = datetime.now(timezone.utc)
     
@@ -166,15 +291,17 @@ async def export_metrics(test_mode: str, total_time_ms: float, iteration_times:
             "Model": "N/A (Demo Mode)",
             "Endpoint": "N/A (Demo Mode)",
             "TestMode": test_mode,
+            "EventLoop": current_event_loop(),
             "Timestamp": current_timestamp.isoformat(),
             "WarmupSuccessful": False
         },
         "Configuration": {
             "BatchSize": batch_size,
-            "ConcurrentRequests": concurrent_requests
+            "ConcurrentRequests": concurrent_requests,
+            "ProcessWorkers": PROCESS_WORKERS if scaling else None
         },
         "Metrics": {
-            "TotalIterations": len(iteration_times),
+            "TotalIterations": leak.requests if leak else len(iteration_times),
             "TotalExecutionTimeMs": total_time_ms,
             "AverageTimePerIterationMs": statistics.mean(iteration_times),
             "MinIterationTimeMs": min(iteration_times),
@@ -189,7 +316,8 @@ async def export_metrics(test_mode: str, total_time_ms: float, iteration_times:
                     "AverageMs": statistics.mean(times),
                     "MinMs": min(times),
                     "MaxMs": max(times),
-                    "MedianMs": statistics.median(times)
+                    "MedianMs": statistics.median(times),
+                    "Tokens": tokens_to_dict(tokens[name].get_result()) if name in tokens else None
                 }
                 for name, times in scenarios.items()
             } if scenarios else None
@@ -197,8 +325,34 @@ async def export_metrics(test_mode: str, total_time_ms: float, iteration_times:
         "Summary": generate_summary(test_mode, iteration_times, memory_used, avg_cpu, ttfts, scenarios)
     }
     
+    if coalescing:
+        metrics_data["Metrics"]["SingleFlight"] = single_flight_to_dict(coalescing)
+    
+    if scaling:
+        metrics_data["Metrics"]["MultiCore"] = scaling_to_dict(scaling)
+    
+    if loop_lag:
+        metrics_data["Metrics"]["LoopLag"] = loop_lag_to_dict(loop_lag)
+    
+    if leak:
+        metrics_data["Metrics"]["LeakDetection"] = leak_to_dict(leak)
+    
+    if gc_result:
+        metrics_data["Metrics"]["GarbageCollection"] = gc_to_dict(gc_result)
+    
+    metrics_data["Metrics"]["GcTuning"] = gc_tuning.to_dict()
+    
+    if precision:
+        metrics_data["Metrics"]["Precision"] = precision_to_dict(precision)
+    
+    # Raw samples let run_performance_tests.py merge repeated trials
+    if os.getenv("EXPORT_SAMPLES", "").lower() in ("1", "true", "yes"):
+        metrics_data["Metrics"]["Samples"] = iteration_times
+    
     timestamp = current_timestamp.strftime("%Y%m%d_%H%M%S")
-    output_filename = f"metrics_python_helloworld_{test_mode}_{timestamp}.json"
+    output_filename = os.path.join(
+        os.getenv("METRICS_OUTPUT_DIR", "."), f"metrics_python_helloworld_{test_mode}_{timestamp}.json"
+    )
     with open(output_filename, 'w') as f:
         json.dump(metrics_data, f, indent=2)
     print(f"✓ Metrics exported to: {output_filename}\n")
@@ -232,21 +386,71 @@ async def main():
         print("Note: This is a demo/mock setup without external AI services")
         print("For actual Azure OpenAI or Ollama, see the respective agent examples.\n")
         
-        if test_mode.lower() == "batch":
-            print(f"Running in BATCH mode with batch size: {BATCH_SIZE}\n")
-            await run_batch_test(ITERATIONS, BATCH_SIZE, iteration_times, cpu_samples)
-        elif test_mode.lower() == "concurrent":
-            print(f"Running in CONCURRENT mode with {CONCURRENT_REQUESTS} concurrent requests\n")
-            await run_concurrent_test(ITERATIONS, CONCURRENT_REQUESTS, iteration_times, cpu_samples)
-        elif test_mode.lower() == "streaming":
-            print("Running in STREAMING mode with time-to-first-token measurement\n")
-            await run_streaming_test(ITERATIONS, iteration_times, time_to_first_tokens, cpu_samples)
-        elif test_mode.lower() == "scenarios":
-            print("Running COMPREHENSIVE SCENARIOS test\n")
-            await run_scenarios_test(benchmark_scenarios, iteration_times, scenario_results, cpu_samples)
-        else:
-            print("Running in STANDARD mode\n")
-            await run_standard_test(ITERATIONS, iteration_times, cpu_samples)
+        gc_tuning.apply()
+        if not gc_tuning.is_default:
+            print(f"GC configuration: {gc_tuning.describe()}\n")
+        # The mock agent has no warmup call; freeze what startup allocated
+        gc_tuning.after_warmup()
+        
+        # The probe keeps every lag sample, which a soak run would report as growth; the multicore
+        # sweep blocks this loop on worker processes, which the probe would report as one long stall
+        loop_lag_monitor = (
+            LoopLagMonitor(interval_ms=LOOP_LAG_INTERVAL_MS)
+            if LOOP_LAG_INTERVAL_MS > 0 and test_mode.lower() not in ("soak", "multicore") else None
+        )
+        if loop_lag_monitor:
+            loop_lag_monitor.start()
+        
+        leak = None
+        precision = None
+        # Collections during the tests; a soak run keeps only counts, not a pause list that grows
+        gc_monitor = GcMonitor(record_pauses=test_mode.lower() != "soak")
+        gc_monitor.install()
+        gc_tuning.enter_timed_loop()
+        try:
+            if test_mode.lower() == "batch":
+                print(f"Running in BATCH mode with batch size: {BATCH_SIZE}\n")
+                await run_batch_test(ITERATIONS, BATCH_SIZE, iteration_times, cpu_samples)
+            elif test_mode.lower() == "concurrent":
+                print(f"Running in CONCURRENT mode with {CONCURRENT_REQUESTS} concurrent requests\n")
+                await run_concurrent_test(ITERATIONS, CONCURRENT_REQUESTS, iteration_times, cpu_samples)
+            elif test_mode.lower() == "multicore":
+                print(f"Running in MULTICORE mode on up to {PROCESS_WORKERS} processes "
+                      f"({CONCURRENT_REQUESTS} concurrent requests each)\n")
+                run_multicore_test(ITERATIONS, CONCURRENT_REQUESTS, PROCESS_WORKERS, iteration_times, cpu_samples,
+                                   scaling_points)
+            elif test_mode.lower() == "soak":
+                detector = leak_detector_from_env(os.environ, SOAK_DURATION_S)
+                print(f"Running in SOAK mode for {SOAK_DURATION_S:.0f} s with {CONCURRENT_REQUESTS} concurrent requests "
+                      f"(warmup {detector.warmup_s:.0f} s, memory sampled every {detector.interval_s:g} s)\n")
+                await run_soak_test(SOAK_DURATION_S, CONCURRENT_REQUESTS, iteration_times, cpu_samples, detector)
+                leak = await detector.stop()
+            elif test_mode.lower() == "streaming":
+                print("Running in STREAMING mode with time-to-first-token measurement\n")
+                await run_streaming_test(ITERATIONS, iteration_times, time_to_first_tokens, cpu_samples)
+            elif test_mode.lower() == "scenarios":
+                print("Running COMPREHENSIVE SCENARIOS test\n")
+                await run_scenarios_test(benchmark_scenarios, iteration_times, scenario_results, cpu_samples,
+                                         scenario_tokens)
+            elif adaptive_rule:
+                print(f"Running in STANDARD mode with adaptive iterations "
+                      f"({adaptive_rule.min_iterations}-{adaptive_rule.max_iterations}) until the "
+                      f"{adaptive_rule.confidence:.0%} CI of the {adaptive_rule.statistic} is within "
+                      f"±{adaptive_rule.target_relative_width / 2:.1%}\n")
+                await run_standard_test(adaptive_rule.max_iterations, iteration_times, cpu_samples, adaptive_rule)
+                precision = adaptive_rule.final_report(iteration_times)
+                status = "reached" if precision.target_met else "NOT reached"
+                print(f"✓ Precision target {status} after {precision.sample_count} iterations "
+                      f"(relative CI width {precision.relative_width:.2%})")
+            else:
+                print("Running in STANDARD mode\n")
+                await run_standard_test(ITERATIONS, iteration_times, cpu_samples)
+        finally:
+            gc_tuning.exit_timed_loop()
+            gc_monitor.uninstall()
+        gc_result = gc_monitor.get_result()
+        
+        loop_lag = loop_lag_monitor.get_result() if loop_lag_monitor else None
         
         print("\n--- Sample Agent Response ---")
         print("Hello from the Microsoft Agent Framework in Python!")
@@ -273,7 +477,7 @@ async def main():
     memory_used = end_memory - start_memory
     
     print("=== Performance Metrics ===")
-    print(f"Total Iterations: {len(iteration_times)}")
+    print(f"Total Iterations: {leak.requests if leak else len(iteration_times)}")
     print(f"Total Execution Time: {total_execution_time:.0f} ms")
     print(f"Average Time per Iteration: {avg_iteration_time:.3f} ms")
     print(f"Min Iteration Time: {min_iteration_time:.3f} ms")
@@ -284,12 +488,37 @@ async def main():
     if time_to_first_tokens:
         print(f"Average Time to First Token: {statistics.mean(time_to_first_tokens):.3f} ms")
     
+    if loop_lag and loop_lag.samples:
+        print(f"Event Loop Lag: P99 {loop_lag.p99_ms:.3f} ms, Max {loop_lag.max_ms:.3f} ms, "
+              f"{loop_lag.stalls} stalls >= {loop_lag.stall_threshold_ms:.0f} ms")
+    
+    if leak:
+        print(f"Leak Detection: {'growth detected' if leak.leak_suspected else 'no significant growth'} "
+              f"over {leak.requests - leak.warmup_requests} requests after warmup")
+        for trend in leak.trends:
+            print(f"  {trend.metric}: {trend.slope_per_1k:+.3f} per 1k requests "
+                  f"(95% CI {trend.slope_ci_lower:+.3f}..{trend.slope_ci_upper:+.3f}, R² {trend.r_squared:.2f})"
+                  + (" SIGNIFICANT" if trend.significant else ""))
+        if leak.gc_objects:
+            print(f"  GC-tracked objects: {leak.gc_objects.count_after_warmup} -> {leak.gc_objects.count_at_end} "
+                  f"({leak.gc_objects.growth_per_1k:+.1f} per 1k requests)")
+        for growth in leak.top_growing_types[:5]:
+            print(f"  {growth.type_name}: {growth.count_after_warmup} -> {growth.count_at_end} "
+                  f"({growth.growth_per_1k:+.1f} per 1k requests)")
+    
+    coalescing = single_flight.get_result() if single_flight else None
+    if coalescing and coalescing.requests:
+        print(f"Coalesced Requests: {coalescing.coalesced}/{coalescing.requests} "
+              f"({coalescing.executions} model calls)")
+    
     print("========================\n")
     
     # Export comprehensive metrics to JSON
     await export_metrics(test_mode, total_execution_time, iteration_times, memory_used,
-                        avg_cpu, time_to_first_tokens, scenario_results, BATCH_SIZE, CONCURRENT_REQUESTS)
+                        avg_cpu, time_to_first_tokens, scenario_results, BATCH_SIZE, CONCURRENT_REQUESTS,
+                        scenario_tokens, coalescing, scaling_points, loop_lag, leak, gc_result,
+                        precision)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_with_event_loop(main())
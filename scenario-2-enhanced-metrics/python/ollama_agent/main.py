@@ -5,8 +5,10 @@ import time
 import psutil
 import platform
 import sys
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path for performance_utils import
 _parent_dir = Path(__file__).resolve().parent.parent
@@ -15,7 +17,57 @@ if str(_parent_dir) not in sys.path:
 
 from agent_framework.ollama import OllamaChatClient
 from dotenv import load_dotenv
-from performance_utils import PerformanceMetrics
+from performance_utils import (
+    BENCHMARK_SCENARIOS,
+    ConversationRecorder,
+    GcTuning,
+    HttpTimingCollector,
+    OllamaLoadBalancer,
+    OllamaServerTiming,
+    PerformanceMetrics,
+    PhaseTracer,
+    PromptEntry,
+    PromptSampler,
+    ResilientCaller,
+    ScenarioStats,
+    SingleFlight,
+    TokenAccounting,
+    adaptive_rule_from_env,
+    allocations_to_dict,
+    cache_key,
+    cache_to_dict,
+    classify_error,
+    conversation_prompt,
+    conversation_to_dict,
+    current_event_loop,
+    duplicate_bursts,
+    gc_to_dict,
+    http_timing_to_dict,
+    interleaved_schedule,
+    latency_chart,
+    leak_detector_from_env,
+    leak_to_dict,
+    load_balancer_to_dict,
+    load_corpus,
+    load_trace,
+    loop_lag_to_dict,
+    merge_event_hooks,
+    parse_endpoints,
+    phase_statistics_to_dict,
+    precision_to_dict,
+    repeating_prompts,
+    replay_trace,
+    resilience_policy_from_env,
+    resilience_to_dict,
+    response_cache_from_env,
+    run_streamed,
+    run_with_event_loop,
+    scenario_results_to_dict,
+    server_timing_to_dict,
+    single_flight_to_dict,
+    tokens_to_dict,
+    workload_to_dict,
+)
 
 # Load environment variables
 load_dotenv()
@@ -90,10 +142,33 @@ def get_machine_info() -> dict:
     return machine_info
 
 
+# Modes implemented by this runner; other TEST_MODE values fall back to standard
+SUPPORTED_TEST_MODES = ("standard", "concurrent", "scenarios", "conversation", "cache", "soak")
+
+AGENT_INSTRUCTIONS = "You are a helpful assistant. Provide brief, concise responses."
+
+
 def get_time(location: str) -> str:
     """Get the current time."""
     return f"The current time in {location} is {datetime.now().strftime('%I:%M %p')}."
 
+
+def create_chat_client(
+    model_name: str,
+    endpoint: str,
+    event_hooks: dict,
+    server_timing: OllamaServerTiming,
+    balancer: Optional[OllamaLoadBalancer] = None,
+) -> OllamaChatClient:
+    """Create the Ollama chat client; responses feed server_timing, httpx event hooks are optional."""
+    if balancer:
+        # The balancer's per-endpoint clients already carry the event hooks
+        return OllamaChatClient(model_id=model_name, client=server_timing.instrument(balancer))
+    # ollama.AsyncClient forwards extra keyword arguments to httpx.AsyncClient
+    from ollama import AsyncClient
+    client = AsyncClient(host=endpoint, event_hooks=event_hooks) if event_hooks else AsyncClient(host=endpoint)
+    return OllamaChatClient(model_id=model_name, client=server_timing.instrument(client))
+
 async def run_performance_test() -> None:
     """Run 1000 iterations of agent operations for performance testing."""
     print("=== Python Microsoft Agent Framework - Ollama Agent ===\n")
@@ -102,8 +177,13 @@ async def run_performance_test() -> None:
     # Note: OllamaChatClient uses OLLAMA_HOST and OLLAMA_CHAT_MODEL_ID environment variables
     endpoint = os.getenv("OLLAMA_HOST", "http://localhost:11434")
     model_name = os.getenv("OLLAMA_CHAT_MODEL_ID", "ministral-3")
+    # Optional client-side balancing over several hosts (OLLAMA_HOSTS=http://a:11434,http://b:11434)
+    balanced_hosts = parse_endpoints(os.getenv("OLLAMA_HOSTS"))
+    balancing_policy = os.getenv("LB_POLICY", "round_robin").lower()
+    if balanced_hosts:
+        endpoint = ", ".join(balanced_hosts)
     
-    print(f"Configuring for Ollama endpoint: {endpoint}")
+    print(f"Configuring for Ollama endpoint: {endpoint}" + (f" ({balancing_policy})" if balanced_hosts else ""))
     print(f"Using model: {model_name}")
     print("\nNote: This requires Ollama to be running locally.")
     print("Install Ollama from: https://ollama.com/")
@@ -111,19 +191,124 @@ async def run_performance_test() -> None:
     
     # Performance test: Run agent operations. Make configurable via environment variable for easier testing.
     ITERATIONS = int(os.getenv("ITERATIONS", "1000"))
+    test_mode = os.getenv("TEST_MODE", "standard").lower()
+    if test_mode not in SUPPORTED_TEST_MODES:
+        print(f"Test mode '{test_mode}' is not supported by this agent, running standard mode\n")
+        test_mode = "standard"
     warmup_successful = False
     
+    # Scenarios mode: the benchmark prompts in interleaved randomized rounds, streamed for TTFT
+    scenario_results = {}
+    
+    # Concurrent mode: CONCURRENT_REQUESTS closed-loop workers share ITERATIONS requests;
+    # DUPLICATE_RATIO of each group of CONCURRENT_REQUESTS repeats a prompt of the group
+    concurrent_requests = max(1, int(os.getenv("CONCURRENT_REQUESTS", "5")))
+    duplicate_ratio = float(os.getenv("DUPLICATE_RATIO", "0"))
+    concurrent_elapsed_ms = None
+    
+    # Conversation mode: one thread across CONVERSATION_TURNS turns, ITERATIONS requests in total
+    conversation_recorder = ConversationRecorder() if test_mode == "conversation" else None
+    conversation_turns = max(1, int(os.getenv("CONVERSATION_TURNS", "10")))
+    
+    # Soak mode: CONCURRENT_REQUESTS closed-loop workers for SOAK_DURATION_S seconds while memory is sampled
+    # for leaks. Requests go straight to agent.run and only the detector's fixed-size histogram records them;
+    # cache, single-flight, retries and per-request collectors keep per-request state and are not applied
+    soak_duration_s = float(os.getenv("SOAK_DURATION_S", "300"))
+    leak_detector = leak_detector_from_env(os.environ, soak_duration_s) if test_mode == "soak" else None
+    soak_errors = {}
+    leak = None
+    
+    # Optional adaptive termination: iterate until the CI is narrow enough (ADAPTIVE_ITERATIONS=1)
+    adaptive_rule = adaptive_rule_from_env(os.environ)
+    max_iterations = adaptive_rule.max_iterations if adaptive_rule else ITERATIONS
+    precision_report = None
+    
+    # Optional workload: weighted prompts from a JSONL corpus (PROMPT_CORPUS) or open-loop replay of a
+    # recorded trace (TRACE_REPLAY, REPLAY_SPEEDUP) instead of "Say hello {i}"
+    corpus_path = os.getenv("PROMPT_CORPUS")
+    trace_path = os.getenv("TRACE_REPLAY")
+    prompt_sampler = PromptSampler(load_corpus(corpus_path), seed=int(os.getenv("CORPUS_SEED", "42"))) if corpus_path else None
+    trace_events = load_trace(trace_path) if trace_path else None
+    replay_speedup = float(os.getenv("REPLAY_SPEEDUP", "1.0"))
+    replay_result = None
+    workload_requests = []  # (PromptEntry, completion tokens or None for cache hits) of every measured request
+    
+    # Optional exact-match response cache (RESPONSE_CACHE=1, CACHE_BACKEND=memory|disk). Cache mode
+    # always enables it and sends ITERATIONS prompts of which CACHE_REPEAT_RATIO repeat earlier ones
+    cache_env = {**os.environ, "RESPONSE_CACHE": "1"} if test_mode == "cache" else os.environ
+    response_cache = response_cache_from_env(cache_env, AGENT_INSTRUCTIONS, model_name)
+    cache_repeat_ratio = float(os.getenv("CACHE_REPEAT_RATIO", "0.5"))
+    cache_workload = repeating_prompts(
+        lambda n: f"Say hello {n + 1}", ITERATIONS, cache_repeat_ratio, seed=int(os.getenv("CORPUS_SEED", "42"))
+    ) if test_mode == "cache" else None
+    
+    # Optional single-flight (SINGLE_FLIGHT=1): identical in-flight prompts share one model call.
+    # Only overlapping requests can be coalesced, i.e. in concurrent mode and during trace replay
+    single_flight = SingleFlight() if os.getenv("SINGLE_FLIGHT", "").lower() in ("1", "true", "yes") else None
+    
+    # Optional per-request timeout, retries with backoff and circuit breaker (REQUEST_TIMEOUT_S, MAX_RETRIES,
+    # BREAKER_FAILURES, ...). With a policy set, requests that fail for good are counted instead of aborting the run
+    resilience_policy = resilience_policy_from_env(os.environ)
+    resilient_caller = ResilientCaller(resilience_policy)
+    if resilience_policy.enabled:
+        print(f"Resilience policy: {resilience_policy.describe()}\n")
+    
+    # GC experiment settings (GC_PRESET, GC_THRESHOLD, GC_FREEZE, GC_DISABLE); defaults change nothing
+    gc_tuning = GcTuning.from_env(os.environ)
+    gc_tuning.apply()
+    if not gc_tuning.is_default:
+        print(f"GC configuration: {gc_tuning.describe()}\n")
+    
+    # Optional tracemalloc allocation profiling (ALLOCATION_PROFILING=1); slows every allocation down
+    allocation_profiling = os.getenv("ALLOCATION_PROFILING", "").lower() in ("1", "true", "yes")
+    
+    # Optional per-request phase tracing (TRACE_PHASES=1), exported as Chrome trace or OTLP JSON
+    tracer = None
+    event_hooks = {}
+    if os.getenv("TRACE_PHASES", "").lower() in ("1", "true", "yes"):
+        tracer = PhaseTracer(
+            service_name="python-ollama-agent",
+            buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "100000")),
+        )
+        event_hooks = tracer.httpx_event_hooks()
+    
+    # Optional HTTP connection timing (HTTP_TIMING=1): connect, request write, TTFB, body read, reuse
+    http_timing = None
+    if os.getenv("HTTP_TIMING", "").lower() in ("1", "true", "yes"):
+        http_timing = HttpTimingCollector()
+        event_hooks = merge_event_hooks(event_hooks, http_timing.httpx_event_hooks())
+    if conversation_recorder:
+        event_hooks = merge_event_hooks(event_hooks, conversation_recorder.httpx_event_hooks())
+    
+    balancer = OllamaLoadBalancer(
+        balanced_hosts,
+        balancing_policy,
+        health_interval_s=float(os.getenv("LB_HEALTH_INTERVAL", "10")),
+        **({"event_hooks": event_hooks} if event_hooks else {}),
+    ) if balanced_hosts else None
+    
+    # Ollama reports server-side durations with every response; wall - server total = client overhead
+    server_timing = OllamaServerTiming()
+    token_accounting = TokenAccounting()
+    
     # Create enhanced performance metrics tracker
-    performance_metrics = PerformanceMetrics()
+    performance_metrics = PerformanceMetrics(
+        allocation_profiling=allocation_profiling,
+        allocation_frames=int(os.getenv("ALLOCATION_FRAMES", "10")),
+        allocation_top_sites=int(os.getenv("ALLOCATION_TOP_SITES", "15")),
+        # The lag probe and the GC pause list keep a sample per tick and per collection
+        loop_lag_interval_ms=float(os.getenv("LOOP_LAG_INTERVAL_MS", "0")) if not leak_detector else None,
+        gc_pauses=not leak_detector,
+    )
     performance_metrics.start()
     
     try:
         # Create agent using agent-framework with Ollama
         # Note: The model is configured via OLLAMA_CHAT_MODEL_ID environment variable
-        agent = OllamaChatClient(model_id=model_name).create_agent(
+        agent = create_chat_client(model_name, endpoint, event_hooks, server_timing, balancer).create_agent(
             name="PerformanceTestAgent",
-            instructions="You are a helpful assistant. Provide brief, concise responses.",
-            tools=get_time,
+            instructions=AGENT_INSTRUCTIONS,
+            tools=tracer.trace_tool(get_time) if tracer else get_time,
         )
         print("✓ Agent framework initialized successfully")
         print("✓ Ollama service configured")
@@ -136,22 +321,234 @@ async def run_performance_test() -> None:
         warmup_time_ms = (warmup_end - warmup_start) * 1000
         print(f"✓ Warmup completed in {warmup_time_ms:.3f} ms")
         warmup_successful = True
+        gc_tuning.after_warmup()
+        if http_timing:
+            # The warmup opened the connection; from here on new connections mean keep-alive was lost
+            http_timing.reset()
+        if balancer:
+            # Only the measured requests count towards the per-endpoint split
+            balancer.reset()
+            balancer.start_health_checks()
         
-        print(f"✓ Running {ITERATIONS} iterations for performance testing\n")
+        async def call_model(prompt: str):
+            """agent.run under the resilience policy, coalesced with identical in-flight requests when
+            single-flight is enabled."""
+            if not single_flight:
+                return await resilient_caller.call(lambda: agent.run(prompt))
+            key = cache_key(prompt, AGENT_INSTRUCTIONS, model_name)
+            response, _ = await single_flight.run(key, lambda: resilient_caller.call(lambda: agent.run(prompt)))
+            return response
         
-        # Run iterations
-        for i in range(ITERATIONS):
+        async def run_request(entry: PromptEntry, iteration: int) -> float:
+            """Run and measure one agent request."""
             iteration_start = time.time()
-            await agent.run(f"Say hello {i + 1}")
+            with tracer.request(iteration=iteration) if tracer else nullcontext(), server_timing.iteration():
+                if response_cache:
+                    # Hits return the cached text and never reach Ollama
+                    response, hit = await response_cache.get_or_compute(entry.prompt, lambda: call_model(entry.prompt))
+                else:
+                    response, hit = await call_model(entry.prompt), False
             iteration_end = time.time()
             iteration_time_ms = (iteration_end - iteration_start) * 1000
             performance_metrics.record_measurement(iteration_time_ms)
-            
-            # Capture detailed snapshots periodically
-            if (i + 1) % 100 == 0:
-                performance_metrics.capture_memory_snapshot()
-                performance_metrics.capture_cpu_snapshot()
-                print(f"  Progress: {i + 1}/{ITERATIONS} iterations completed")
+            if hit:
+                # No tokens were generated; hits are reported under Metrics.Cache
+                workload_requests.append((entry, None))
+            else:
+                token_sample = token_accounting.record(iteration_time_ms, entry.prompt, response)
+                workload_requests.append((entry, token_sample.completion_tokens))
+            return iteration_time_ms
+        
+        async def run_tolerant_request(entry: PromptEntry, iteration: int):
+            """run_request; with a resilience policy a request that failed for good is logged and skipped."""
+            try:
+                await run_request(entry, iteration)
+            except Exception as ex:
+                if not resilience_policy.enabled:
+                    raise
+                print(f"  Request {iteration} failed ({classify_error(ex)}): {ex}")
+        
+        async def run_scenario_request(name: str, iteration: int):
+            """Stream and measure one scenario request; failures are counted per scenario."""
+            stats = scenario_results[name]
+            try:
+                with tracer.request(iteration=iteration, scenario=name) if tracer else nullcontext(), \
+                        server_timing.iteration():
+                    run = await resilient_caller.call(lambda: run_streamed(agent, stats.prompt))
+            except Exception as ex:
+                stats.errors += 1
+                print(f"  Scenario {name} (request {iteration}) failed: {ex}")
+                return
+            performance_metrics.record_measurement(run.latency_ms)
+            stats.latencies_ms.append(run.latency_ms)
+            if run.ttft_ms is not None:
+                stats.ttfts_ms.append(run.ttft_ms)
+            stats.tokens.record(run.latency_ms, stats.prompt, run.response)
+            token_sample = token_accounting.record(run.latency_ms, stats.prompt, run.response)
+            workload_requests.append((PromptEntry(stats.prompt, name=name), token_sample.completion_tokens))
+        
+        async def run_conversation(conversation: int):
+            """Run one conversation, measuring every turn against the growing history."""
+            thread = agent.get_new_thread()
+            process = psutil.Process(os.getpid())
+            estimated_context = 0
+            for turn in range(1, conversation_turns + 1):
+                prompt = conversation_prompt(turn)
+                conversation_recorder.begin_turn()
+                turn_start = time.time()
+                with tracer.request(iteration=turn, conversation=conversation) if tracer else nullcontext(), \
+                        server_timing.iteration():
+                    response = await agent.run(prompt, thread=thread)
+                turn_time_ms = (time.time() - turn_start) * 1000
+                performance_metrics.record_measurement(turn_time_ms)
+                token_sample = token_accounting.record(turn_time_ms, prompt, response)
+                # The provider's prompt token count is the real context size; estimate it otherwise
+                estimated_context += token_sample.prompt_tokens
+                context_tokens = token_sample.prompt_tokens if token_sample.source == "usage" else estimated_context
+                estimated_context += token_sample.completion_tokens
+                conversation_recorder.record_turn(
+                    conversation=conversation,
+                    turn=turn,
+                    latency_ms=turn_time_ms,
+                    context_messages=2 * turn - 1,
+                    context_tokens=context_tokens,
+                    rss_mb=process.memory_info().rss / 1024 / 1024,
+                )
+        
+        if trace_events:
+            print(f"✓ Replaying {len(trace_events)} requests from {trace_path} at {replay_speedup:g}x speed "
+                  f"({trace_events[-1].offset_s / replay_speedup:.1f} s)\n")
+        elif test_mode == "concurrent":
+            print(f"✓ Running {ITERATIONS} requests with {concurrent_requests} concurrent workers\n")
+        elif test_mode == "soak":
+            print(f"✓ Soaking for {soak_duration_s:.0f} s with {concurrent_requests} concurrent workers "
+                  f"(warmup {leak_detector.warmup_s:.0f} s, memory sampled every {leak_detector.interval_s:g} s)\n")
+        elif test_mode == "conversation":
+            conversation_count = max(1, ITERATIONS // conversation_turns)
+            print(f"✓ Running {conversation_count} conversations of {conversation_turns} turns\n")
+        elif test_mode == "scenarios":
+            scenario_rounds = max(1, ITERATIONS // len(BENCHMARK_SCENARIOS))
+            print(f"✓ Running {scenario_rounds} interleaved rounds of {len(BENCHMARK_SCENARIOS)} scenarios\n")
+        elif test_mode == "cache":
+            print(f"✓ Running {ITERATIONS} requests through the {response_cache.backend.name} response cache "
+                  f"({cache_repeat_ratio:.0%} repeated prompts, "
+                  f"{len(set(cache_workload))} distinct)\n")
+        elif adaptive_rule:
+            print(f"✓ Running adaptive iterations ({adaptive_rule.min_iterations}-{adaptive_rule.max_iterations}) "
+                  f"until the {adaptive_rule.confidence:.0%} CI of the {adaptive_rule.statistic} is within "
+                  f"±{adaptive_rule.target_relative_width / 2:.1%}\n")
+        else:
+            print(f"✓ Running {ITERATIONS} iterations for performance testing\n")
+        
+        # Run iterations
+        gc_tuning.enter_timed_loop()
+        try:
+            if trace_events:
+                replay_result = await replay_trace(
+                    trace_events,
+                    lambda index, event: run_request(PromptEntry(event.prompt, name=event.name), index + 1),
+                    replay_speedup,
+                )
+                print(f"  Replay finished: {replay_result.completed} completed, {replay_result.errors} failed, "
+                      f"max {replay_result.max_in_flight} in flight")
+            elif test_mode == "concurrent":
+                if duplicate_ratio > 0:
+                    entries = [PromptEntry(prompt) for prompt in duplicate_bursts(
+                        lambda n: f"Say hello {n + 1}", ITERATIONS, concurrent_requests, duplicate_ratio, seed=42
+                    )]
+                else:
+                    entries = [
+                        prompt_sampler.next() if prompt_sampler else PromptEntry(f"Say hello {i + 1}")
+                        for i in range(ITERATIONS)
+                    ]
+                pending = iter(range(len(entries)))
+                
+                async def concurrent_worker():
+                    # Closed loop: each worker starts its next request as soon as the previous one returns
+                    for i in pending:
+                        await run_tolerant_request(entries[i], i + 1)
+                        if (i + 1) % 100 == 0:
+                            performance_metrics.capture_memory_snapshot()
+                            performance_metrics.capture_cpu_snapshot()
+                            print(f"  Progress: {i + 1}/{len(entries)} requests started")
+                
+                concurrent_start = time.time()
+                await asyncio.gather(*(concurrent_worker() for _ in range(concurrent_requests)))
+                concurrent_elapsed_ms = (time.time() - concurrent_start) * 1000
+                print(f"  {len(entries)} requests in {concurrent_elapsed_ms:.0f} ms "
+                      f"({len(entries) / (concurrent_elapsed_ms / 1000):.2f} requests/s)")
+            elif test_mode == "soak":
+                deadline = time.perf_counter() + soak_duration_s
+                
+                async def soak_worker():
+                    while time.perf_counter() < deadline:
+                        request_start = time.perf_counter()
+                        try:
+                            await agent.run(f"Say hello {leak_detector.requests + 1}")
+                        except Exception as ex:
+                            error_class = classify_error(ex)
+                            soak_errors[error_class] = soak_errors.get(error_class, 0) + 1
+                            # Do not spin against a server that is down
+                            await asyncio.sleep(1)
+                            continue
+                        leak_detector.record_request((time.perf_counter() - request_start) * 1000)
+                        if leak_detector.requests % 100 == 0:
+                            print(f"  {leak_detector.requests} requests, "
+                                  f"{leak_detector.elapsed_s:.0f}/{soak_duration_s:.0f} s")
+                
+                leak_detector.start()
+                await asyncio.gather(*(soak_worker() for _ in range(concurrent_requests)))
+                leak = await leak_detector.stop()
+                if soak_errors:
+                    print(f"  Failed requests: {soak_errors}")
+            elif test_mode == "conversation":
+                for conversation in range(1, conversation_count + 1):
+                    await run_conversation(conversation)
+                    performance_metrics.capture_memory_snapshot()
+                    performance_metrics.capture_cpu_snapshot()
+                    print(f"  Conversation {conversation}/{conversation_count} completed")
+            elif test_mode == "scenarios":
+                scenario_results = {name: ScenarioStats(prompt) for name, prompt in BENCHMARK_SCENARIOS.items()}
+                schedule = interleaved_schedule(
+                    list(BENCHMARK_SCENARIOS), scenario_rounds, seed=int(os.getenv("SCENARIO_SEED", "42"))
+                )
+                for i, name in enumerate(schedule):
+                    await run_scenario_request(name, i + 1)
+                    if (i + 1) % 100 == 0:
+                        performance_metrics.capture_memory_snapshot()
+                        performance_metrics.capture_cpu_snapshot()
+                        print(f"  Progress: {i + 1}/{len(schedule)} requests completed")
+                for name, stats in scenario_results.items():
+                    if stats.latencies_ms:
+                        print(f"  {name}: avg {sum(stats.latencies_ms) / len(stats.latencies_ms):.3f} ms"
+                              + (f", TTFT avg {sum(stats.ttfts_ms) / len(stats.ttfts_ms):.3f} ms" if stats.ttfts_ms else ""))
+            else:
+                iterations = len(cache_workload) if cache_workload else max_iterations
+                for i in range(iterations):
+                    if cache_workload:
+                        entry = PromptEntry(cache_workload[i])
+                    else:
+                        entry = prompt_sampler.next() if prompt_sampler else PromptEntry(f"Say hello {i + 1}")
+                    await run_tolerant_request(entry, i + 1)
+                    
+                    # Capture detailed snapshots periodically
+                    if (i + 1) % 100 == 0:
+                        performance_metrics.capture_memory_snapshot()
+                        performance_metrics.capture_cpu_snapshot()
+                        print(f"  Progress: {i + 1}/{iterations} iterations completed")
+                    
+                    if adaptive_rule and adaptive_rule.should_stop(performance_metrics.measurements):
+                        break
+        finally:
+            gc_tuning.exit_timed_loop()
+            if balancer:
+                await balancer.stop_health_checks()
+        
+        if adaptive_rule:
+            precision_report = adaptive_rule.final_report(performance_metrics.measurements)
+            status = "reached" if precision_report.target_met else "NOT reached"
+            print(f"✓ Precision target {status} after {precision_report.sample_count} iterations "
+                  f"(relative CI width {precision_report.relative_width:.2%})")
         
         print("\n--- Sample Agent Streaming Response ---")
         print("Agent: ", end="", flush=True)
@@ -169,9 +566,19 @@ async def run_performance_test() -> None:
     
     # Get comprehensive metrics results
     result = performance_metrics.get_result()
+    if leak and leak.latency.count:
+        # Soak latencies are in the detector's histogram (within its precision); it keeps no standard deviation
+        result.measurement_count = leak.latency.count
+        result.mean = leak.latency.mean
+        result.min = leak.latency.min_ms
+        result.max = leak.latency.max_ms
+        result.median = leak.latency.percentile(0.50)
+        result.p90 = leak.latency.percentile(0.90)
+        result.p95 = leak.latency.percentile(0.95)
+        result.p99 = leak.latency.percentile(0.99)
     
     print("=== Enhanced Performance Metrics ===")
-    print(f"Total Iterations: {ITERATIONS}")
+    print(f"Total Iterations: {result.measurement_count}")
     print(f"Total Execution Time: {result.total_elapsed_ms:.0f} ms")
     print("\nTiming Statistics:")
     print(f"  Mean: {result.mean:.3f} ms")
@@ -188,9 +595,125 @@ async def run_performance_test() -> None:
     print(f"  Peak RSS: {result.peak_rss_mb:.2f} MB")
     print("\nGarbage Collection:")
     print(f"  Gen0/Gen1/Gen2: {result.gc_gen0_collections}/{result.gc_gen1_collections}/{result.gc_gen2_collections}")
+    print(f"  Total GC Pause Time: {result.gc_total_pause_ms:.3f} ms "
+          f"(P99: {result.gc_pause_p99_ms:.3f} ms, Max: {result.gc_max_pause_ms:.3f} ms)")
+    if result.gc and result.gc.correlation:
+        correlation = result.gc.correlation
+        print(f"  Slow iterations (>= {correlation.slow_iteration_threshold_ms:.3f} ms) with a GC pause: "
+              f"{correlation.slow_iterations_with_pause}/{correlation.slow_iterations}")
     print("\nCPU Metrics:")
     print(f"  Average CPU: {result.average_cpu_percent:.2f}%")
     print(f"  Max CPU: {result.max_cpu_percent:.2f}%")
+    if result.loop_lag and result.loop_lag.samples:
+        loop_lag = result.loop_lag
+        print("\nEvent Loop Lag:")
+        print(f"  P50/P95/P99: {loop_lag.p50_ms:.3f}/{loop_lag.p95_ms:.3f}/{loop_lag.p99_ms:.3f} ms, "
+              f"Max: {loop_lag.max_ms:.3f} ms")
+        print(f"  Stalls >= {loop_lag.stall_threshold_ms:.0f} ms: {loop_lag.stalls} "
+              f"({loop_lag.total_stall_ms:.1f} ms in total)")
+    if result.allocations:
+        allocations = result.allocations
+        print("\nAllocations (tracemalloc):")
+        print(f"  Net per Iteration: {allocations.net_bytes_per_iteration / 1024:.2f} KB "
+              f"({allocations.net_blocks_per_iteration:.1f} blocks)")
+        print(f"  Transient Peak per Iteration: {allocations.mean_transient_bytes_per_iteration / 1024:.2f} KB (mean), "
+              f"{allocations.max_transient_bytes_per_iteration / 1024:.2f} KB (max)")
+        for group, totals in sorted(allocations.by_module.items(), key=lambda item: -item[1]["bytes"]):
+            print(f"  {group}: {totals['bytes'] / 1024:.2f} KB in {totals['blocks']} blocks")
+    if tracer:
+        print("\nRequest Phases (per request):")
+        for phase, stats in tracer.phase_statistics().items():
+            print(f"  {phase}: mean {stats['mean']:.3f} ms, P50 {stats['p50']:.3f} ms, "
+                  f"P95 {stats['p95']:.3f} ms, P99 {stats['p99']:.3f} ms")
+    # Replayed and concurrent requests overlap, so throughput is relative to the wall time of the loop
+    token_result = token_accounting.get_result(
+        replay_result.actual_duration_ms if replay_result else concurrent_elapsed_ms
+    )
+    if token_result.iterations:
+        print("\nTokens:")
+        print(f"  Prompt: {token_result.total_prompt_tokens}, Completion: {token_result.total_completion_tokens} "
+              f"({token_result.estimated_iterations} of {token_result.iterations} iterations estimated)")
+        print(f"  Throughput: {token_result.completion_throughput_tokens_per_second:.1f} completion tokens/s, "
+              f"{token_result.total_throughput_tokens_per_second:.1f} total tokens/s")
+    conversation_result = conversation_recorder.get_result() if conversation_recorder else None
+    if conversation_result and conversation_result.per_turn:
+        print(f"\nConversation ({conversation_result.conversations} x {conversation_result.turns_per_conversation} turns):")
+        print(f"  Latency growth: {conversation_result.latency_ms_per_1k_context_tokens:.3f} ms per 1k context tokens")
+        print(f"  Request payload growth: {conversation_result.request_bytes_per_turn:.0f} bytes per turn")
+        print(f"  Client RSS growth: {conversation_result.rss_mb_per_turn:.3f} MB per turn")
+        for line in latency_chart(conversation_result.per_turn):
+            print(f"  {line}")
+    cache_result = response_cache.get_result() if response_cache else None
+    if cache_result:
+        response_cache.backend.close()
+        print(f"\nResponse Cache ({cache_result.backend}):")
+        print(f"  Hits: {cache_result.hits}, Misses: {cache_result.misses} (hit ratio {cache_result.hit_ratio:.1%}), "
+              f"Evictions: {cache_result.evictions}, Expirations: {cache_result.expirations}")
+        for name, stats in cache_result.latency_ms.items():
+            print(f"  {name}: mean {stats['mean']:.3f} ms, P50 {stats['p50']:.3f} ms, P99 {stats['p99']:.3f} ms")
+        print(f"  Estimated time saved: {cache_result.estimated_saved_ms:.0f} ms")
+    balancer_result = balancer.get_result() if balancer else None
+    if balancer_result:
+        print(f"\nLoad Balancing ({balancer_result.policy}): {balancer_result.requests_per_second:.2f} requests/s aggregate")
+        for stats in balancer_result.endpoints:
+            latency = f", mean {stats.latency_ms['mean']:.3f} ms" if stats.latency_ms else ""
+            health = "" if stats.healthy else " (unhealthy)"
+            print(f"  {stats.host}: {stats.requests} requests, {stats.errors} errors{latency}{health}")
+    resilience_result = resilient_caller.get_result() if resilience_policy.enabled else None
+    if resilience_result:
+        print(f"\nResilience ({resilience_policy.describe()}):")
+        print(f"  Requests: {resilience_result.succeeded} succeeded, {resilience_result.failed} failed, "
+              f"{resilience_result.retried_requests} needed retries")
+        print(f"  Attempts: {resilience_result.attempts} ({resilience_result.retries} retries, "
+              f"{resilience_result.timeouts} timeouts, {resilience_result.backoff_total_ms:.0f} ms backing off)")
+        if resilience_result.circuit_opens or resilience_result.circuit_rejections:
+            print(f"  Circuit breaker: opened {resilience_result.circuit_opens} times, "
+                  f"{resilience_result.circuit_rejections} requests rejected")
+        for name, summary in (("First attempt", resilience_result.first_attempt_latency_ms),
+                              ("Retried", resilience_result.retried_latency_ms)):
+            if summary:
+                print(f"  {name}: mean {summary['mean']:.3f} ms, P50 {summary['p50']:.3f} ms, P99 {summary['p99']:.3f} ms")
+        for error_class, count in sorted(resilience_result.attempt_errors.items(), key=lambda item: -item[1]):
+            print(f"  {error_class}: {count} failed attempts")
+    single_flight_result = single_flight.get_result() if single_flight else None
+    if single_flight_result:
+        print(f"\nSingle-Flight: {single_flight_result.coalesced}/{single_flight_result.requests} requests coalesced "
+              f"onto {single_flight_result.executions} model calls (max {single_flight_result.max_waiters} waiters)")
+    server_timing_result = server_timing.get_result()
+    if server_timing_result.iterations > server_timing_result.iterations_without_timing:
+        distributions = server_timing_result.distributions
+        print("\nOllama Server Timing (per iteration):")
+        for name in ("server_total_ms", "load_ms", "prompt_eval_ms", "eval_ms", "client_overhead_ms"):
+            if name in distributions:
+                stats = distributions[name]
+                print(f"  {name}: mean {stats['mean']:.3f}, P50 {stats['p50']:.3f}, P95 {stats['p95']:.3f}")
+        for name in ("prompt_tokens_per_second", "generation_tokens_per_second"):
+            if name in distributions:
+                stats = distributions[name]
+                print(f"  {name}: mean {stats['mean']:.1f}, P50 {stats['p50']:.1f}")
+        print(f"  Client overhead: {server_timing_result.client_overhead_fraction:.1%} of wall time")
+    if leak:
+        print(f"\nLeak Detection: {'growth detected' if leak.leak_suspected else 'no significant growth'} "
+              f"over {leak.requests - leak.warmup_requests} requests after warmup")
+        for trend in leak.trends:
+            print(f"  {trend.metric}: {trend.slope_per_1k:+.3f} per 1k requests "
+                  f"(95% CI {trend.slope_ci_lower:+.3f}..{trend.slope_ci_upper:+.3f}, R² {trend.r_squared:.2f})"
+                  + (" SIGNIFICANT" if trend.significant else ""))
+        if leak.gc_objects:
+            print(f"  GC-tracked objects: {leak.gc_objects.count_after_warmup} -> {leak.gc_objects.count_at_end} "
+                  f"({leak.gc_objects.growth_per_1k:+.1f} per 1k requests)")
+        for growth in leak.top_growing_types[:5]:
+            print(f"  {growth.type_name}: {growth.count_after_warmup} -> {growth.count_at_end} "
+                  f"({growth.growth_per_1k:+.1f} per 1k requests)")
+    http_timing_result = http_timing.get_result() if http_timing else None
+    if http_timing_result:
+        print("\nHTTP Timing (per request):")
+        print(f"  Requests: {http_timing_result.requests} "
+              f"({http_timing_result.new_connections} new connections, "
+              f"{http_timing_result.reused_connections} reused)")
+        for phase, stats in http_timing_result.phases.items():
+            print(f"  {phase}: mean {stats['mean']:.3f} ms, P50 {stats['p50']:.3f} ms, "
+                  f"P95 {stats['p95']:.3f} ms, P99 {stats['p99']:.3f} ms")
     print("====================================\n")
     
     # Export enhanced metrics to JSON file
@@ -203,12 +726,14 @@ async def run_performance_test() -> None:
             "Provider": "Ollama",
             "Model": model_name,
             "Endpoint": endpoint,
+            "TestMode": test_mode,
+            "EventLoop": current_event_loop(),
             "Timestamp": current_timestamp.isoformat(),
             "WarmupSuccessful": warmup_successful
         },
         "MachineInfo": machine_info,
         "Metrics": {
-            "TotalIterations": ITERATIONS,
+            "TotalIterations": result.measurement_count,
             "TotalExecutionTimeMs": result.total_elapsed_ms,
             
             "Statistics": {
@@ -229,11 +754,9 @@ async def run_performance_test() -> None:
                 "PeakVMSMB": result.peak_vms_mb
             },
             
-            "GarbageCollection": {
-                "Gen0Collections": result.gc_gen0_collections,
-                "Gen1Collections": result.gc_gen1_collections,
-                "Gen2Collections": result.gc_gen2_collections
-            },
+            "GarbageCollection": gc_to_dict(result.gc),
+            "LoopLag": loop_lag_to_dict(result.loop_lag) if result.loop_lag else None,
+            "GcTuning": gc_tuning.to_dict(),
             
             "CPU": {
                 "AveragePercent": result.average_cpu_percent,
@@ -248,12 +771,79 @@ async def run_performance_test() -> None:
         }
     }
     
+    if precision_report:
+        metrics_data["Metrics"]["Precision"] = precision_to_dict(precision_report)
+    
+    if result.allocations:
+        metrics_data["Metrics"]["Allocations"] = allocations_to_dict(result.allocations)
+    
+    if tracer:
+        metrics_data["Metrics"]["Phases"] = phase_statistics_to_dict(tracer.phase_statistics(), tracer.dropped_spans)
+    
+    metrics_data["Metrics"]["Tokens"] = tokens_to_dict(token_result)
+    
+    if conversation_result:
+        metrics_data["Metrics"]["Conversation"] = conversation_to_dict(conversation_result)
+    
+    if scenario_results:
+        metrics_data["Metrics"]["ScenarioResults"] = scenario_results_to_dict(scenario_results)
+        all_ttfts = [ttft for stats in scenario_results.values() for ttft in stats.ttfts_ms]
+        metrics_data["Metrics"]["TimeToFirstTokenMs"] = sum(all_ttfts) / len(all_ttfts) if all_ttfts else None
+    
+    if corpus_path or trace_path:
+        metrics_data["Metrics"]["Workload"] = workload_to_dict(
+            os.path.basename(trace_path or corpus_path),
+            [entry for entry, _ in workload_requests],
+            [tokens for _, tokens in workload_requests],
+            replay_result,
+        )
+    if cache_result:
+        metrics_data["Metrics"]["Cache"] = cache_to_dict(cache_result)
+        if cache_workload:
+            metrics_data["Metrics"]["Cache"]["RepeatRatio"] = cache_repeat_ratio
+    if balancer_result:
+        metrics_data["Metrics"]["LoadBalancer"] = load_balancer_to_dict(balancer_result)
+    if concurrent_elapsed_ms:
+        metrics_data["Metrics"]["Concurrency"] = {
+            "Workers": concurrent_requests,
+            "DuplicateRatio": duplicate_ratio,
+            "WallTimeMs": concurrent_elapsed_ms,
+            "RequestsPerSecond": result.measurement_count / (concurrent_elapsed_ms / 1000),
+        }
+    if single_flight_result:
+        metrics_data["Metrics"]["SingleFlight"] = single_flight_to_dict(single_flight_result)
+    if resilience_result:
+        metrics_data["Metrics"]["Resilience"] = resilience_to_dict(resilience_result)
+    if leak:
+        metrics_data["Metrics"]["LeakDetection"] = {**leak_to_dict(leak), "Errors": soak_errors}
+    metrics_data["Metrics"]["ServerTiming"] = server_timing_to_dict(server_timing_result)
+    
+    if http_timing_result:
+        metrics_data["Metrics"]["HttpTiming"] = http_timing_to_dict(http_timing_result)
+    
+    # Raw samples let run_performance_tests.py merge repeated trials
+    if os.getenv("EXPORT_SAMPLES", "").lower() in ("1", "true", "yes"):
+        metrics_data["Metrics"]["Samples"] = performance_metrics.measurements
+    
     timestamp = current_timestamp.strftime("%Y%m%d_%H%M%S")
-    output_filename = f"metrics_python_ollama_{timestamp}.json"
+    # Non-standard modes are encoded in the file name like the HelloWorld runner does
+    mode_suffix = f"{test_mode}_" if test_mode != "standard" else ""
+    output_filename = os.path.join(os.getenv("METRICS_OUTPUT_DIR", "."), f"metrics_python_ollama_{mode_suffix}{timestamp}.json")
     with open(output_filename, 'w') as f:
         json.dump(metrics_data, f, indent=2)
     print(f"✓ Metrics exported to: {output_filename}\n")
+    
+    if conversation_recorder:
+        csv_filename = os.path.join(os.getenv("METRICS_OUTPUT_DIR", "."), f"conversation_python_ollama_{timestamp}.csv")
+        conversation_recorder.write_csv(csv_filename)
+        print(f"✓ Conversation turns exported to: {csv_filename}\n")
+    
+    if tracer:
+        trace_format = os.getenv("TRACE_FORMAT", "chrome").lower()
+        trace_filename = os.path.join(os.getenv("METRICS_OUTPUT_DIR", "."), f"trace_python_ollama_{timestamp}.json")
+        tracer.export(trace_filename, trace_format)
+        print(f"✓ Trace ({trace_format}) exported to: {trace_filename}\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(run_performance_test())
+    run_with_event_loop(run_performance_test())
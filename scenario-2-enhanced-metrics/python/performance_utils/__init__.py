@@ -6,10 +6,273 @@ from .performance_metrics import (
     MemorySnapshot,
     CpuSnapshot,
 )
+from .gc_monitor import (
+    GcMonitor,
+    GcPause,
+    GcCorrelation,
+    GcResult,
+    gc_to_dict,
+)
+from .gc_tuning import GcTuning, GC_PRESETS
+from .tracing import PhaseTracer, phase_statistics_to_dict
+from .http_timing import (
+    HttpTimingCollector,
+    HttpTiming,
+    HttpTimingResult,
+    http_timing_to_dict,
+    merge_event_hooks,
+)
+from .ollama_timing import (
+    OllamaServerTiming,
+    ServerTimingSample,
+    ServerTimingResult,
+    server_timing_to_dict,
+)
+from .token_accounting import (
+    TokenAccounting,
+    TokenEstimator,
+    TokenCount,
+    TokenResult,
+    tokens_to_dict,
+    usage_from_response,
+)
+from .workload import (
+    PromptEntry,
+    PromptSampler,
+    TraceEvent,
+    ReplayResult,
+    load_corpus,
+    load_trace,
+    replay_trace,
+    workload_to_dict,
+)
+from .scenarios import (
+    BENCHMARK_SCENARIOS,
+    ScenarioRun,
+    ScenarioStats,
+    interleaved_schedule,
+    run_streamed,
+    scenario_results_to_dict,
+)
+from .conversation import (
+    ConversationRecorder,
+    ConversationTurn,
+    ConversationResult,
+    conversation_prompt,
+    conversation_to_dict,
+    latency_chart,
+)
+from .response_cache import (
+    MemoryCacheBackend,
+    DiskCacheBackend,
+    ResponseCache,
+    CacheResult,
+    cache_key,
+    repeating_prompts,
+    response_cache_from_env,
+    cache_to_dict,
+)
+from .single_flight import (
+    SingleFlight,
+    SingleFlightResult,
+    duplicate_bursts,
+    single_flight_to_dict,
+)
+from .load_balancer import (
+    OllamaLoadBalancer,
+    LoadBalancerResult,
+    EndpointStats,
+    POLICIES as BALANCING_POLICIES,
+    parse_endpoints,
+    load_balancer_to_dict,
+)
+from .histogram import LatencyHistogram
+from .distributed import (
+    Coordinator,
+    WorkerResult,
+    DistributedResult,
+    run_worker,
+    distributed_to_dict,
+)
+from .process_pool import (
+    ShardResult,
+    ShardedRun,
+    ScalingPoint,
+    run_sharded,
+    scaling_sweep,
+    scaling_to_dict,
+)
+from .event_loop import (
+    EVENT_LOOPS,
+    available_event_loops,
+    current_event_loop,
+    resolve_event_loop,
+    run_with_event_loop,
+)
+from .loop_lag import LoopLagMonitor, LoopLagResult, LagWindow, loop_lag_to_dict
+from .resilience import (
+    ResiliencePolicy,
+    ResilienceResult,
+    ResilientCaller,
+    CircuitBreaker,
+    CircuitOpenError,
+    classify_error,
+    retry_after_s,
+    resilience_policy_from_env,
+    resilience_to_dict,
+)
+from .rate_limit import (
+    AimdConcurrency,
+    RateLimitedRunner,
+    ThroughputResult,
+    ThroughputWindow,
+    aimd_from_env,
+    throughput_to_dict,
+)
+from .leak_detection import (
+    LeakDetector,
+    LeakResult,
+    LeakSample,
+    TrendFit,
+    TypeGrowth,
+    fit_trend,
+    leak_detector_from_env,
+    leak_to_dict,
+)
+from .allocation_profiler import (
+    AllocationProfiler,
+    AllocationResult,
+    AllocationSite,
+    AllocationSample,
+    allocations_to_dict,
+)
+from .adaptive_sampling import (
+    AdaptiveStopRule,
+    PrecisionReport,
+    confidence_interval,
+    precision_to_dict,
+    adaptive_rule_from_env,
+)
 
 __all__ = [
     "PerformanceMetrics",
     "MetricsResult",
     "MemorySnapshot",
     "CpuSnapshot",
+    "GcMonitor",
+    "GcPause",
+    "GcCorrelation",
+    "GcResult",
+    "gc_to_dict",
+    "GcTuning",
+    "GC_PRESETS",
+    "PhaseTracer",
+    "phase_statistics_to_dict",
+    "HttpTimingCollector",
+    "HttpTiming",
+    "HttpTimingResult",
+    "http_timing_to_dict",
+    "merge_event_hooks",
+    "OllamaServerTiming",
+    "ServerTimingSample",
+    "ServerTimingResult",
+    "server_timing_to_dict",
+    "TokenAccounting",
+    "TokenEstimator",
+    "TokenCount",
+    "TokenResult",
+    "tokens_to_dict",
+    "usage_from_response",
+    "PromptEntry",
+    "PromptSampler",
+    "TraceEvent",
+    "ReplayResult",
+    "load_corpus",
+    "load_trace",
+    "replay_trace",
+    "workload_to_dict",
+    "BENCHMARK_SCENARIOS",
+    "ScenarioRun",
+    "ScenarioStats",
+    "interleaved_schedule",
+    "run_streamed",
+    "scenario_results_to_dict",
+    "ConversationRecorder",
+    "ConversationTurn",
+    "ConversationResult",
+    "conversation_prompt",
+    "conversation_to_dict",
+    "latency_chart",
+    "MemoryCacheBackend",
+    "DiskCacheBackend",
+    "ResponseCache",
+    "CacheResult",
+    "cache_key",
+    "repeating_prompts",
+    "response_cache_from_env",
+    "cache_to_dict",
+    "SingleFlight",
+    "SingleFlightResult",
+    "duplicate_bursts",
+    "single_flight_to_dict",
+    "OllamaLoadBalancer",
+    "LoadBalancerResult",
+    "EndpointStats",
+    "BALANCING_POLICIES",
+    "parse_endpoints",
+    "load_balancer_to_dict",
+    "LatencyHistogram",
+    "Coordinator",
+    "WorkerResult",
+    "DistributedResult",
+    "run_worker",
+    "distributed_to_dict",
+    "ShardResult",
+    "ShardedRun",
+    "ScalingPoint",
+    "run_sharded",
+    "scaling_sweep",
+    "scaling_to_dict",
+    "EVENT_LOOPS",
+    "available_event_loops",
+    "current_event_loop",
+    "resolve_event_loop",
+    "run_with_event_loop",
+    "LoopLagMonitor",
+    "LoopLagResult",
+    "LagWindow",
+    "loop_lag_to_dict",
+    "ResiliencePolicy",
+    "ResilienceResult",
+    "ResilientCaller",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "classify_error",
+    "retry_after_s",
+    "resilience_policy_from_env",
+    "resilience_to_dict",
+    "AimdConcurrency",
+    "RateLimitedRunner",
+    "ThroughputResult",
+    "ThroughputWindow",
+    "aimd_from_env",
+    "throughput_to_dict",
+    "LeakDetector",
+    "LeakResult",
+    "LeakSample",
+    "TrendFit",
+    "TypeGrowth",
+    "fit_trend",
+    "leak_detector_from_env",
+    "leak_to_dict",
+    "AllocationProfiler",
+    "AllocationResult",
+    "AllocationSite",
+    "AllocationSample",
+    "allocations_to_dict",
+    "AdaptiveStopRule",
+    "PrecisionReport",
+    "confidence_interval",
+    "precision_to_dict",
+    "adaptive_rule_from_env",
 ]
@@ -0,0 +1,29 @@
+"""
+Command line entry point of performance_utils.
+
+    python -m performance_utils worker --connect HOST:PORT [--id NAME]
+
+starts a distributed load generation worker (see performance_utils.distributed).
+"""
+
+import argparse
+import asyncio
+
+from .distributed import run_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m performance_utils")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="Run a distributed load generation worker")
+    worker.add_argument("--connect", required=True, help="Coordinator address, HOST:PORT")
+    worker.add_argument("--id", help="Worker name (default: hostname-pid)")
+    worker.add_argument("--progress-interval", type=float, default=1.0, help="Seconds between progress reports")
+    args = parser.parse_args()
+
+    host, _, port = args.connect.rpartition(":")
+    asyncio.run(run_worker(host or "127.0.0.1", int(port), args.id, args.progress_interval))
+
+
+if __name__ == "__main__":
+    main()
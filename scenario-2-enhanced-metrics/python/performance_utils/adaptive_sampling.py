@@ -0,0 +1,190 @@
+"""
+Adaptive sample-size termination based on confidence interval width.
+
+Instead of running a fixed number of iterations, a runner can keep iterating until the
+confidence interval of the mean (or of a chosen percentile) is narrower than a target
+relative width, bounded by a minimum and maximum iteration count.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+
+SUPPORTED_STATISTICS = ("mean", "median", "p90", "p95", "p99")
+
+_PERCENTILE_STATISTICS = {
+    "median": 0.50,
+    "p90": 0.90,
+    "p95": 0.95,
+    "p99": 0.99,
+}
+
+
+@dataclass
+class PrecisionReport:
+    """Achieved precision of a statistic at the end (or at a checkpoint) of a run."""
+    statistic: str
+    confidence: float
+    sample_count: int
+    estimate: float
+    ci_lower: float
+    ci_upper: float
+    relative_width: float
+    target_relative_width: float
+    target_met: bool
+
+
+def _t_quantile(confidence: float, degrees_of_freedom: int) -> float:
+    """Two-sided Student t quantile via the Cornish-Fisher expansion of the normal quantile."""
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    if degrees_of_freedom <= 0:
+        return float("inf")
+
+    v = float(degrees_of_freedom)
+    return (
+        z
+        + (z ** 3 + z) / (4 * v)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3)
+    )
+
+
+def confidence_interval(
+    values: Sequence[float],
+    statistic: str = "mean",
+    confidence: float = 0.95,
+) -> Tuple[float, float, float]:
+    """
+    Calculate (estimate, lower, upper) for the requested statistic.
+
+    The mean uses a Student t interval; percentiles use the distribution-free
+    order-statistic interval (normal approximation of the binomial rank bounds).
+    """
+    if statistic not in SUPPORTED_STATISTICS:
+        raise ValueError(f"Unsupported statistic '{statistic}', expected one of {SUPPORTED_STATISTICS}")
+
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    if n == 1:
+        return values[0], float("-inf"), float("inf")
+
+    if statistic == "mean":
+        mean = statistics.mean(values)
+        half_width = _t_quantile(confidence, n - 1) * statistics.stdev(values) / math.sqrt(n)
+        return mean, mean - half_width, mean + half_width
+
+    quantile = _PERCENTILE_STATISTICS[statistic]
+    sorted_values = sorted(values)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    center = quantile * (n - 1)
+    spread = z * math.sqrt(n * quantile * (1 - quantile))
+    lower_index = max(0, int(math.floor(center - spread)))
+    upper_index = min(n - 1, int(math.ceil(center + spread)))
+
+    # Interpolated point estimate, matching PerformanceMetrics._percentile
+    lower = int(center)
+    fraction = center - lower
+    estimate = sorted_values[lower]
+    if lower + 1 < n:
+        estimate = sorted_values[lower] * (1 - fraction) + sorted_values[lower + 1] * fraction
+
+    return estimate, sorted_values[lower_index], sorted_values[upper_index]
+
+
+class AdaptiveStopRule:
+    """Decides when enough iterations have been run for the requested precision."""
+
+    def __init__(
+        self,
+        target_relative_width: float = 0.05,
+        min_iterations: int = 30,
+        max_iterations: int = 10000,
+        statistic: str = "mean",
+        confidence: float = 0.95,
+        check_every: int = 10,
+    ):
+        if statistic not in SUPPORTED_STATISTICS:
+            raise ValueError(f"Unsupported statistic '{statistic}', expected one of {SUPPORTED_STATISTICS}")
+        if target_relative_width <= 0:
+            raise ValueError("target_relative_width must be positive")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        self.target_relative_width = target_relative_width
+        self.min_iterations = max(2, min_iterations)
+        self.max_iterations = max(self.min_iterations, max_iterations)
+        self.statistic = statistic
+        self.confidence = confidence
+        self.check_every = max(1, check_every)
+
+    def precision(self, values: Sequence[float]) -> PrecisionReport:
+        """Compute the achieved precision for the given samples."""
+        estimate, lower, upper = confidence_interval(values, self.statistic, self.confidence)
+        if estimate and math.isfinite(lower) and math.isfinite(upper):
+            relative_width = (upper - lower) / abs(estimate)
+        else:
+            relative_width = float("inf")
+
+        report = PrecisionReport(
+            statistic=self.statistic,
+            confidence=self.confidence,
+            sample_count=len(values),
+            estimate=estimate,
+            ci_lower=lower,
+            ci_upper=upper,
+            relative_width=relative_width,
+            target_relative_width=self.target_relative_width,
+            target_met=relative_width <= self.target_relative_width,
+        )
+        return report
+
+    def should_stop(self, values: Sequence[float]) -> bool:
+        """Return True once the target precision (or the iteration cap) has been reached."""
+        count = len(values)
+        if count >= self.max_iterations:
+            return True
+        if count < self.min_iterations:
+            return False
+        if (count - self.min_iterations) % self.check_every != 0:
+            return False
+        return self.precision(values).target_met
+
+    def final_report(self, values: Sequence[float]) -> PrecisionReport:
+        """Precision report for the final sample set."""
+        return self.precision(values)
+
+
+def precision_to_dict(report: PrecisionReport) -> dict:
+    """Estimate, confidence interval and whether the target width was met, for Metrics.Precision."""
+    def _finite(value: float) -> Optional[float]:
+        return value if math.isfinite(value) else None
+
+    return {
+        "Statistic": report.statistic,
+        "Confidence": report.confidence,
+        "SampleCount": report.sample_count,
+        "Estimate": report.estimate,
+        "CILower": _finite(report.ci_lower),
+        "CIUpper": _finite(report.ci_upper),
+        "RelativeWidth": _finite(report.relative_width),
+        "TargetRelativeWidth": report.target_relative_width,
+        "TargetMet": report.target_met,
+    }
+
+
+def adaptive_rule_from_env(env: dict) -> Optional[AdaptiveStopRule]:
+    """Build an AdaptiveStopRule from ADAPTIVE_* environment variables, or None when disabled."""
+    if env.get("ADAPTIVE_ITERATIONS", "").lower() not in ("1", "true", "yes"):
+        return None
+
+    return AdaptiveStopRule(
+        target_relative_width=float(env.get("TARGET_CI_WIDTH", "0.05")),
+        min_iterations=int(env.get("MIN_ITERATIONS", "30")),
+        max_iterations=int(env.get("MAX_ITERATIONS", env.get("ITERATIONS", "10000"))),
+        statistic=env.get("CI_STATISTIC", "mean").lower(),
+        confidence=float(env.get("CI_CONFIDENCE", "0.95")),
+    )
+
@@ -0,0 +1,241 @@
+"""
+Opt-in allocation profiling based on tracemalloc.
+
+RSS/VMS deltas show that memory grew, but not which code allocated it. The profiler
+snapshots tracemalloc at start/end (and periodically), tracks the transient allocation
+peak of every iteration and groups the top allocation sites by module.
+"""
+
+import os
+import sys
+import sysconfig
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# Module groups reported separately; anything else in site-packages is "third_party"
+MODULE_GROUPS = (
+    "agent_framework",
+    "httpx",
+    "httpcore",
+    "pydantic",
+    "ollama",
+    "openai",
+    "azure",
+    "anyio",
+)
+
+_STDLIB_DIR = os.path.normcase(sysconfig.get_paths()["stdlib"])
+_PROJECT_DIR = os.path.normcase(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class AllocationSite:
+    """One allocation site (source line) and how much it allocated during the session."""
+    location: str
+    module_group: str
+    size_diff_bytes: int
+    count_diff: int
+
+
+@dataclass
+class AllocationSample:
+    """Traced memory at a point in time."""
+    timestamp_ms: float
+    iteration: int
+    traced_bytes: int
+    traced_blocks: int
+
+
+@dataclass
+class AllocationResult:
+    """Allocation profile of a measurement session."""
+    iterations: int
+    start_traced_bytes: int = 0
+    end_traced_bytes: int = 0
+    peak_traced_bytes: int = 0
+    net_bytes_per_iteration: float = 0.0
+    net_blocks_per_iteration: float = 0.0
+    mean_transient_bytes_per_iteration: float = 0.0
+    max_transient_bytes_per_iteration: int = 0
+    by_module: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    top_sites: List[AllocationSite] = field(default_factory=list)
+    timeline: List[AllocationSample] = field(default_factory=list)
+
+
+def classify_filename(filename: str) -> str:
+    """Map a source filename to a module group (agent_framework, httpx, ..., our_code, stdlib)."""
+    normalized = os.path.normcase(filename).replace("\\", "/")
+    for group in MODULE_GROUPS:
+        if f"/{group}/" in normalized or normalized.endswith(f"/{group}.py"):
+            return group
+    if "site-packages" in normalized or "dist-packages" in normalized:
+        return "third_party"
+    if normalized.startswith(_PROJECT_DIR.replace("\\", "/")):
+        return "our_code"
+    if normalized.startswith(_STDLIB_DIR.replace("\\", "/")) or normalized.startswith("<"):
+        return "stdlib"
+    return "our_code"
+
+
+class AllocationProfiler:
+    """tracemalloc-based allocation profiler used by PerformanceMetrics."""
+
+    def __init__(self, frames: int = 10, top_sites: int = 15):
+        self._frames = max(1, frames)
+        self._top_sites = top_sites
+        self._started_here = False
+        self._start_time = 0.0
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_traced = 0
+        self._iterations = 0
+        self._transient: List[int] = []
+        self._timeline: List[AllocationSample] = []
+        self._peak = 0
+
+    def start(self):
+        """Start tracing (if not already) and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._started_here = True
+        self._start_time = time.perf_counter()
+        self._start_snapshot = self._take_snapshot()
+        self._last_traced, _ = tracemalloc.get_traced_memory()
+        self._reset_peak()
+        self._timeline.append(self._sample(self._start_snapshot))
+
+    def on_iteration(self):
+        """Record the transient allocation peak of the iteration that just finished."""
+        current, peak = tracemalloc.get_traced_memory()
+        self._transient.append(max(0, peak - self._last_traced))
+        self._peak = max(self._peak, peak)
+        self._last_traced = current
+        self._iterations += 1
+        self._reset_peak()
+
+    def snapshot(self):
+        """Take a periodic snapshot for the traced-memory timeline."""
+        self._timeline.append(self._sample(self._take_snapshot()))
+        # Snapshotting allocates; do not charge it to the next iteration
+        self._last_traced, _ = tracemalloc.get_traced_memory()
+        self._reset_peak()
+
+    def stop(self) -> AllocationResult:
+        """Take the final snapshot, compare it to the baseline and stop tracing."""
+        _, peak = tracemalloc.get_traced_memory()
+        end_snapshot = self._take_snapshot()
+        end_sample = self._sample(end_snapshot)
+        self._timeline.append(end_sample)
+
+        result = AllocationResult(iterations=self._iterations)
+        result.start_traced_bytes = self._timeline[0].traced_bytes
+        result.end_traced_bytes = end_sample.traced_bytes
+        result.peak_traced_bytes = max(self._peak, peak)
+        if self._transient:
+            result.mean_transient_bytes_per_iteration = sum(self._transient) / len(self._transient)
+            result.max_transient_bytes_per_iteration = max(self._transient)
+
+        diffs = end_snapshot.compare_to(self._start_snapshot, "traceback")
+        net_blocks = 0
+        for diff in diffs:
+            group = self._group_for(diff.traceback)
+            bucket = result.by_module.setdefault(group, {"bytes": 0, "blocks": 0})
+            bucket["bytes"] += diff.size_diff
+            bucket["blocks"] += diff.count_diff
+            net_blocks += diff.count_diff
+
+        iterations = max(1, self._iterations)
+        result.net_bytes_per_iteration = (result.end_traced_bytes - result.start_traced_bytes) / iterations
+        result.net_blocks_per_iteration = net_blocks / iterations
+
+        growing = sorted((d for d in diffs if d.size_diff > 0), key=lambda d: d.size_diff, reverse=True)
+        for diff in growing[: self._top_sites]:
+            frame = self._attributed_frame(diff.traceback)
+            result.top_sites.append(
+                AllocationSite(
+                    location=f"{frame.filename}:{frame.lineno}",
+                    module_group=classify_filename(frame.filename),
+                    size_diff_bytes=diff.size_diff,
+                    count_diff=diff.count_diff,
+                )
+            )
+        result.timeline = self._timeline
+
+        if self._started_here:
+            tracemalloc.stop()
+        return result
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+
+    def _sample(self, snapshot: tracemalloc.Snapshot) -> AllocationSample:
+        stats = snapshot.statistics("filename")
+        return AllocationSample(
+            timestamp_ms=(time.perf_counter() - self._start_time) * 1000,
+            iteration=self._iterations,
+            traced_bytes=sum(s.size for s in stats),
+            traced_blocks=sum(s.count for s in stats),
+        )
+
+    @staticmethod
+    def _attributed_frame(traceback: tracemalloc.Traceback) -> tracemalloc.Frame:
+        """Innermost frame outside the standard library, so json/copy calls are charged to their caller."""
+        # tracemalloc orders frames most-recent-last by default since Python 3.7
+        for frame in reversed(traceback):
+            if classify_filename(frame.filename) != "stdlib":
+                return frame
+        return traceback[-1]
+
+    def _group_for(self, traceback: tracemalloc.Traceback) -> str:
+        return classify_filename(self._attributed_frame(traceback).filename)
+
+    @staticmethod
+    def _reset_peak():
+        # tracemalloc.reset_peak() is available from Python 3.9
+        if sys.version_info >= (3, 9):
+            tracemalloc.reset_peak()
+
+
+def allocations_to_dict(result: AllocationResult) -> dict:
+    """Top allocation sites and memory timeline for Metrics.Allocations."""
+    return {
+        "Iterations": result.iterations,
+        "StartTracedBytes": result.start_traced_bytes,
+        "EndTracedBytes": result.end_traced_bytes,
+        "PeakTracedBytes": result.peak_traced_bytes,
+        "NetBytesPerIteration": result.net_bytes_per_iteration,
+        "NetBlocksPerIteration": result.net_blocks_per_iteration,
+        "MeanTransientBytesPerIteration": result.mean_transient_bytes_per_iteration,
+        "MaxTransientBytesPerIteration": result.max_transient_bytes_per_iteration,
+        "ByModule": {
+            group: {"Bytes": totals["bytes"], "Blocks": totals["blocks"]}
+            for group, totals in sorted(result.by_module.items(), key=lambda item: -item[1]["bytes"])
+        },
+        "TopSites": [
+            {
+                "Location": site.location,
+                "Module": site.module_group,
+                "SizeDiffBytes": site.size_diff_bytes,
+                "CountDiff": site.count_diff,
+            }
+            for site in result.top_sites
+        ],
+        "Timeline": [
+            {
+                "TimestampMs": sample.timestamp_ms,
+                "Iteration": sample.iteration,
+                "TracedBytes": sample.traced_bytes,
+                "TracedBlocks": sample.traced_blocks,
+            }
+            for sample in result.timeline
+        ],
+    }
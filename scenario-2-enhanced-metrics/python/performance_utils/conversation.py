@@ -0,0 +1,198 @@
+"""
+Multi-turn conversation benchmark support.
+
+A conversation keeps one agent thread across K turns, so every request carries the
+whole history. For each turn the recorder stores latency, the HTTP request payload size
+(captured by an httpx request hook), an estimate of the context length in tokens and the
+client RSS, which shows where history handling in the client starts to dominate.
+"""
+
+import csv
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+
+CONVERSATION_OPENING = "Let's write a short story together about a lighthouse keeper. Start with one sentence."
+CONVERSATION_FOLLOW_UP = "Continue the story with exactly one more sentence (turn {turn})."
+
+
+def conversation_prompt(turn: int) -> str:
+    """Prompt of a 1-based turn."""
+    return CONVERSATION_OPENING if turn == 1 else CONVERSATION_FOLLOW_UP.format(turn=turn)
+
+
+@dataclass
+class ConversationTurn:
+    """Measurements of one turn."""
+    conversation: int
+    turn: int
+    latency_ms: float
+    request_bytes: int
+    http_requests: int
+    context_messages: int
+    context_tokens: int
+    rss_mb: float
+
+
+@dataclass
+class ConversationResult:
+    """Conversation benchmark summary."""
+    conversations: int
+    turns_per_conversation: int
+    per_turn: List[Dict[str, float]] = field(default_factory=list)
+    latency_ms_per_1k_context_tokens: float = 0.0
+    request_bytes_per_turn: float = 0.0
+    rss_mb_per_turn: float = 0.0
+    latency_context_correlation: float = 0.0
+
+
+def _fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """Least-squares slope and Pearson correlation of ys over xs."""
+    n = len(xs)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx if sxx > 0 else 0.0
+    correlation = sxy / math.sqrt(sxx * syy) if sxx > 0 and syy > 0 else 0.0
+    return slope, correlation
+
+
+class ConversationRecorder:
+    """Collects per-turn measurements of conversation runs."""
+
+    def __init__(self):
+        self._turns: List[ConversationTurn] = []
+        self._pending_bytes = 0
+        self._pending_requests = 0
+
+    def httpx_event_hooks(self) -> Dict[str, List[Callable]]:
+        """Async httpx event hooks measuring request payload sizes."""
+        async def on_request(request):
+            self._pending_bytes += len(request.content or b"")
+            self._pending_requests += 1
+
+        return {"request": [on_request]}
+
+    def begin_turn(self):
+        """Reset the payload counters before a turn starts."""
+        self._pending_bytes = 0
+        self._pending_requests = 0
+
+    def record_turn(
+        self,
+        conversation: int,
+        turn: int,
+        latency_ms: float,
+        context_messages: int,
+        context_tokens: int,
+        rss_mb: float,
+    ) -> ConversationTurn:
+        """Store the measurements of the turn that just finished."""
+        record = ConversationTurn(
+            conversation=conversation,
+            turn=turn,
+            latency_ms=latency_ms,
+            request_bytes=self._pending_bytes,
+            http_requests=self._pending_requests,
+            context_messages=context_messages,
+            context_tokens=context_tokens,
+            rss_mb=rss_mb,
+        )
+        self._turns.append(record)
+        return record
+
+    @property
+    def turns(self) -> List[ConversationTurn]:
+        """Recorded turns (live list, do not modify)."""
+        return self._turns
+
+    def get_result(self) -> ConversationResult:
+        """Per-turn means across conversations and growth rates over the context length."""
+        conversations = len({t.conversation for t in self._turns})
+        by_turn: Dict[int, List[ConversationTurn]] = {}
+        for record in self._turns:
+            by_turn.setdefault(record.turn, []).append(record)
+
+        result = ConversationResult(
+            conversations=conversations,
+            turns_per_conversation=max(by_turn) if by_turn else 0,
+        )
+        for turn in sorted(by_turn):
+            records = by_turn[turn]
+            result.per_turn.append({
+                "turn": turn,
+                "samples": len(records),
+                "latency_ms": sum(r.latency_ms for r in records) / len(records),
+                "request_bytes": sum(r.request_bytes for r in records) / len(records),
+                "context_tokens": sum(r.context_tokens for r in records) / len(records),
+                "rss_mb": sum(r.rss_mb for r in records) / len(records),
+            })
+
+        if len(self._turns) >= 2:
+            slope, correlation = _fit(
+                [t.context_tokens / 1000 for t in self._turns], [t.latency_ms for t in self._turns]
+            )
+            result.latency_ms_per_1k_context_tokens = slope
+            result.latency_context_correlation = correlation
+            result.request_bytes_per_turn, _ = _fit(
+                [t.turn for t in self._turns], [t.request_bytes for t in self._turns]
+            )
+            result.rss_mb_per_turn, _ = _fit([t.turn for t in self._turns], [t.rss_mb for t in self._turns])
+        return result
+
+    def write_csv(self, path: str):
+        """Write one row per turn for plotting latency against context length."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                "conversation", "turn", "latency_ms", "request_bytes", "http_requests",
+                "context_messages", "context_tokens", "rss_mb",
+            ])
+            for t in self._turns:
+                writer.writerow([
+                    t.conversation, t.turn, f"{t.latency_ms:.3f}", t.request_bytes, t.http_requests,
+                    t.context_messages, t.context_tokens, f"{t.rss_mb:.2f}",
+                ])
+
+
+def latency_chart(per_turn: List[Dict[str, float]], width: int = 40) -> List[str]:
+    """Text bar chart of mean latency by turn, labelled with the context length."""
+    if not per_turn:
+        return []
+    longest = max(point["latency_ms"] for point in per_turn) or 1.0
+    lines = []
+    for point in per_turn:
+        bar = "#" * max(1, round(point["latency_ms"] / longest * width))
+        lines.append(
+            f"turn {int(point['turn']):>3} | ctx {int(point['context_tokens']):>6} tok | "
+            f"{bar} {point['latency_ms']:.1f} ms"
+        )
+    return lines
+
+
+def conversation_to_dict(result: ConversationResult) -> dict:
+    """Per-turn latency and context growth for Metrics.Conversation."""
+    return {
+        "Conversations": result.conversations,
+        "TurnsPerConversation": result.turns_per_conversation,
+        "LatencyMsPer1kContextTokens": result.latency_ms_per_1k_context_tokens,
+        "LatencyContextCorrelation": result.latency_context_correlation,
+        "RequestBytesPerTurn": result.request_bytes_per_turn,
+        "RssMBPerTurn": result.rss_mb_per_turn,
+        "PerTurn": [
+            {
+                "Turn": point["turn"],
+                "Samples": point["samples"],
+                "MeanLatencyMs": point["latency_ms"],
+                "MeanRequestBytes": point["request_bytes"],
+                "MeanContextTokens": point["context_tokens"],
+                "MeanRssMB": point["rss_mb"],
+            }
+            for point in result.per_turn
+        ],
+    }
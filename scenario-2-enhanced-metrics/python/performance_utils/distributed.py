@@ -0,0 +1,339 @@
+"""
+Distributed load generation with one coordinator and many workers.
+
+Workers connect to the coordinator over TCP and exchange newline-delimited JSON:
+
+    worker      -> coordinator  {"type": "hello", "worker": "host-1234", "host": "host", "pid": 1234}
+    coordinator -> worker       {"type": "start", "workload": {...}}
+    worker      -> coordinator  {"type": "ready", "worker": "host-1234"}
+    coordinator -> worker       {"type": "go"}
+    worker      -> coordinator  {"type": "progress", "completed": 120, "errors": 0, "histogram": {...}, ...}
+    worker      -> coordinator  {"type": "done", ...same fields as progress...}
+
+Workers build their workload (including the Ollama warmup call) between "start" and
+"ready"; the coordinator sends "go" once every worker is ready and starts the wall clock
+then, so setup time is not counted as load. Progress messages carry the worker's cumulative LatencyHistogram, so the coordinator
+always holds each worker's latest state and merges them into one combined distribution.
+Workers only run the built-in workloads ("mock" simulates requests like the HelloWorld
+agent, "ollama" sends them through an agent_framework Ollama agent); the coordinator
+sends parameters, never code.
+
+Local workers are started with `python -m performance_utils worker --connect HOST:PORT`
+from the python/ directory; remote hosts run the same command against the coordinator.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .histogram import LatencyHistogram
+
+
+AGENT_INSTRUCTIONS = "You are a helpful assistant. Provide brief, concise responses."
+
+
+async def send_message(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[dict]:
+    """Next message, or None once the peer closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+async def _mock_workload(workload: dict) -> Callable[[str], Awaitable[Any]]:
+    delay_s = float(workload.get("mock_latency_ms", 1.0)) / 1000
+
+    async def request(prompt: str) -> str:
+        await asyncio.sleep(delay_s)  # Simulate work
+        return f"Response to: {prompt}"
+
+    return request
+
+
+async def _ollama_workload(workload: dict) -> Callable[[str], Awaitable[Any]]:
+    from agent_framework.ollama import OllamaChatClient
+    from ollama import AsyncClient
+
+    agent = OllamaChatClient(
+        model_id=workload["model"], client=AsyncClient(host=workload["endpoint"])
+    ).create_agent(name="PerformanceTestAgent", instructions=AGENT_INSTRUCTIONS)
+    await agent.run("Hello, this is a warmup call.")
+    return agent.run
+
+
+WORKLOADS: Dict[str, Callable[[dict], Awaitable[Callable[[str], Awaitable[Any]]]]] = {
+    "mock": _mock_workload,
+    "ollama": _ollama_workload,
+}
+
+
+async def run_worker(
+    host: str,
+    port: int,
+    worker_id: Optional[str] = None,
+    progress_interval_s: float = 1.0,
+    connect_timeout_s: float = 60.0,
+):
+    """Connect to a coordinator, run the workload it assigns and stream results back."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    deadline = time.monotonic() + connect_timeout_s
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            break
+        except OSError:
+            # The coordinator may not be listening yet
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(1.0)
+
+    await send_message(writer, {"type": "hello", "worker": worker_id, "host": socket.gethostname(), "pid": os.getpid()})
+    message = await read_message(reader)
+    if not message or message.get("type") != "start":
+        writer.close()
+        return
+    workload = message["workload"]
+    request = await WORKLOADS[workload["agent"]](workload)
+    # Measurement starts together on every worker once all of them are set up
+    await send_message(writer, {"type": "ready", "worker": worker_id})
+    message = await read_message(reader)
+    if not message or message.get("type") != "go":
+        writer.close()
+        return
+
+    histogram = LatencyHistogram()
+    completed = 0
+    errors = 0
+    pending = iter(range(workload["iterations"]))
+    prompt_template = workload.get("prompt", "Say hello {i}")
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    def snapshot(kind: str) -> dict:
+        elapsed_s = time.perf_counter() - start
+        return {
+            "type": kind,
+            "worker": worker_id,
+            "completed": completed,
+            "errors": errors,
+            "elapsed_ms": elapsed_s * 1000,
+            "cpu_percent": (time.process_time() - cpu_start) / elapsed_s * 100 if elapsed_s > 0 else 0.0,
+            "histogram": histogram.to_dict(),
+        }
+
+    async def loop():
+        nonlocal completed, errors
+        for i in pending:
+            prompt = prompt_template.format(i=workload.get("offset", 0) + i + 1)
+            request_start = time.perf_counter()
+            try:
+                await request(prompt)
+            except Exception:
+                errors += 1
+                continue
+            histogram.record((time.perf_counter() - request_start) * 1000)
+            completed += 1
+
+    async def report():
+        while True:
+            await asyncio.sleep(progress_interval_s)
+            await send_message(writer, snapshot("progress"))
+
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(*(loop() for _ in range(max(1, workload.get("concurrency", 1)))))
+    finally:
+        reporter.cancel()
+    await send_message(writer, snapshot("done"))
+    writer.close()
+    await writer.wait_closed()
+
+
+@dataclass
+class WorkerResult:
+    """Latest state reported by one worker."""
+    worker: str
+    host: str
+    pid: int
+    iterations: int = 0
+    completed: int = 0
+    errors: int = 0
+    elapsed_ms: float = 0.0
+    cpu_percent: float = 0.0
+    finished: bool = False
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.completed / (self.elapsed_ms / 1000) if self.elapsed_ms > 0 else 0.0
+
+
+@dataclass
+class DistributedResult:
+    """Combined result of a distributed run."""
+    workload: dict
+    wall_time_ms: float
+    workers: List[WorkerResult]
+    histogram: LatencyHistogram
+
+    @property
+    def completed(self) -> int:
+        return sum(w.completed for w in self.workers)
+
+    @property
+    def errors(self) -> int:
+        return sum(w.errors for w in self.workers)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.completed / (self.wall_time_ms / 1000) if self.wall_time_ms > 0 else 0.0
+
+
+class Coordinator:
+    """Accepts worker connections, splits a workload among them and merges their results."""
+
+    def __init__(
+        self,
+        expected_workers: int,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        connect_timeout_s: float = 120.0,
+        on_progress: Optional[Callable[[WorkerResult], None]] = None,
+    ):
+        self.expected_workers = expected_workers
+        self.host = host
+        self.port = port
+        self.connect_timeout_s = connect_timeout_s
+        self.on_progress = on_progress
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._workers: List[WorkerResult] = []
+        self._writers: List[asyncio.StreamWriter] = []
+        self._ready: List[asyncio.Event] = []
+        self._finished: List[asyncio.Event] = []
+        self._all_connected = asyncio.Event()
+
+    async def start(self) -> int:
+        """Start listening; returns the bound port."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_message(reader)
+        if not hello or hello.get("type") != "hello" or len(self._workers) >= self.expected_workers:
+            writer.close()
+            return
+        worker = WorkerResult(worker=hello["worker"], host=hello.get("host", ""), pid=hello.get("pid", 0))
+        ready = asyncio.Event()
+        finished = asyncio.Event()
+        self._workers.append(worker)
+        self._writers.append(writer)
+        self._ready.append(ready)
+        self._finished.append(finished)
+        if len(self._workers) == self.expected_workers:
+            self._all_connected.set()
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                if message.get("type") == "ready":
+                    ready.set()
+                if message.get("type") in ("progress", "done"):
+                    worker.completed = message["completed"]
+                    worker.errors = message["errors"]
+                    worker.elapsed_ms = message["elapsed_ms"]
+                    worker.cpu_percent = message.get("cpu_percent", 0.0)
+                    worker.histogram = LatencyHistogram.from_dict(message["histogram"])
+                    if self.on_progress:
+                        self.on_progress(worker)
+                if message.get("type") == "done":
+                    worker.finished = True
+                    break
+        finally:
+            # A worker that disconnects early keeps its last reported state and does not hold up the others
+            ready.set()
+            finished.set()
+            writer.close()
+
+    async def run(self, workload: dict) -> DistributedResult:
+        """
+        Wait for the workers, split workload["iterations"] among them and collect the results.
+
+        The wall time runs from "go", sent once every worker has finished its setup, until the last worker is done.
+        """
+        try:
+            await asyncio.wait_for(self._all_connected.wait(), self.connect_timeout_s)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"only {len(self._workers)} of {self.expected_workers} workers connected "
+                f"within {self.connect_timeout_s:.0f} s"
+            ) from None
+
+        base, extra = divmod(workload["iterations"], self.expected_workers)
+        offset = 0
+        for index, (worker, writer) in enumerate(zip(self._workers, self._writers)):
+            worker.iterations = base + (1 if index < extra else 0)
+            await send_message(writer, {
+                "type": "start",
+                "workload": dict(workload, iterations=worker.iterations, offset=offset),
+            })
+            offset += worker.iterations
+        await asyncio.gather(*(event.wait() for event in self._ready))
+
+        start = time.perf_counter()
+        for writer, finished in zip(self._writers, self._finished):
+            if not finished.is_set():
+                await send_message(writer, {"type": "go"})
+        await asyncio.gather(*(event.wait() for event in self._finished))
+        wall_time_ms = (time.perf_counter() - start) * 1000
+
+        combined = LatencyHistogram()
+        for worker in self._workers:
+            combined.merge(worker.histogram)
+        return DistributedResult(workload=workload, wall_time_ms=wall_time_ms, workers=list(self._workers), histogram=combined)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+def distributed_to_dict(result: DistributedResult) -> dict:
+    """Merged and per-worker results for Metrics.Distributed."""
+    return {
+        "Workload": dict(result.workload),
+        "Workers": len(result.workers),
+        "WallTimeMs": result.wall_time_ms,
+        "Completed": result.completed,
+        "Errors": result.errors,
+        "RequestsPerSecond": result.requests_per_second,
+        "Latency": result.histogram.summary(),
+        "Histogram": result.histogram.to_dict(),
+        "PerWorker": [
+            {
+                "Worker": worker.worker,
+                "Host": worker.host,
+                "Pid": worker.pid,
+                "Iterations": worker.iterations,
+                "Completed": worker.completed,
+                "Errors": worker.errors,
+                "Finished": worker.finished,
+                "ElapsedMs": worker.elapsed_ms,
+                "RequestsPerSecond": worker.requests_per_second,
+                "CpuPercent": worker.cpu_percent,
+                "Latency": worker.histogram.summary(),
+            }
+            for worker in result.workers
+        ],
+    }
@@ -0,0 +1,57 @@
+"""
+Event loop selection for the Python runners.
+
+EVENT_LOOP=asyncio (default) runs the standard library loop, EVENT_LOOP=uvloop the
+libuv-based loop from the optional uvloop package (Linux and macOS only). If the
+requested loop is not installed the runner falls back to asyncio with a warning; the
+loop that actually ran is recorded in TestInfo.EventLoop so results are never
+attributed to the wrong implementation.
+"""
+
+import asyncio
+import os
+from typing import Any, Coroutine, List, Optional
+
+# Optional dependency with graceful fallback
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
+
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+
+def available_event_loops() -> List[str]:
+    """Event loop implementations importable in this interpreter."""
+    return [name for name in EVENT_LOOPS if name != "uvloop" or UVLOOP_AVAILABLE]
+
+
+def resolve_event_loop(name: Optional[str] = None) -> str:
+    """Loop that will run for a requested name (default: the EVENT_LOOP environment variable)."""
+    name = (name or os.getenv("EVENT_LOOP") or "asyncio").lower()
+    if name not in EVENT_LOOPS:
+        raise ValueError(f"Unknown event loop '{name}', expected one of {', '.join(EVENT_LOOPS)}")
+    if name == "uvloop" and not UVLOOP_AVAILABLE:
+        print("⚠ EVENT_LOOP=uvloop but uvloop is not installed, falling back to asyncio")
+        return "asyncio"
+    return name
+
+
+def run_with_event_loop(main: Coroutine[Any, Any, Any], name: Optional[str] = None) -> Any:
+    """asyncio.run(main) on the selected event loop implementation."""
+    if resolve_event_loop(name) == "uvloop":
+        if hasattr(uvloop, "run"):
+            return uvloop.run(main)
+        # uvloop < 0.18 has no run(); installing the policy has the same effect
+        uvloop.install()
+    return asyncio.run(main)
+
+
+def current_event_loop() -> str:
+    """Implementation of the running loop: 'uvloop' or 'asyncio'."""
+    loop = asyncio.get_running_loop()
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
@@ -0,0 +1,261 @@
+"""
+Garbage collector instrumentation based on gc.callbacks.
+
+gc.get_count() returns the current allocation counters of each generation, not the
+number of collections, so deltas of it are meaningless (and can be negative). The
+monitor hooks gc.callbacks to record every collection with its generation, pause
+duration and collected object count, and cross-checks the totals with gc.get_stats().
+Long soak runs keep only the gc.get_stats() counts (record_pauses=False), since the
+pause list grows with every collection.
+"""
+
+import bisect
+import gc
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .percentiles import percentile
+
+
+@dataclass
+class GcPause:
+    """A single garbage collection."""
+    timestamp_ms: float
+    generation: int
+    duration_ms: float
+    collected: int
+    uncollectable: int
+
+
+@dataclass
+class GcCorrelation:
+    """How GC pauses line up with iteration latency."""
+    iterations_with_pause: int = 0
+    slow_iteration_threshold_ms: float = 0.0
+    slow_iterations: int = 0
+    slow_iterations_with_pause: int = 0
+    mean_ms_with_pause: float = 0.0
+    mean_ms_without_pause: float = 0.0
+    pause_ms_in_slow_iterations: float = 0.0
+
+
+@dataclass
+class GcResult:
+    """Garbage collection summary of a measurement session."""
+    collections: List[int] = field(default_factory=lambda: [0, 0, 0])
+    stats_collections: List[int] = field(default_factory=list)
+    total_pause_ms: float = 0.0
+    mean_pause_ms: float = 0.0
+    pause_p50_ms: float = 0.0
+    pause_p95_ms: float = 0.0
+    pause_p99_ms: float = 0.0
+    max_pause_ms: float = 0.0
+    collected_objects: int = 0
+    uncollectable_objects: int = 0
+    pauses: List[GcPause] = field(default_factory=list)
+    correlation: Optional[GcCorrelation] = None
+
+
+class GcMonitor:
+    """Records every garbage collection while installed."""
+
+    def __init__(self, record_pauses: bool = True):
+        """
+        Args:
+            record_pauses: Hook gc.callbacks to record every pause; otherwise only collection counts are kept.
+        """
+        self.record_pauses = record_pauses
+        self._origin = time.perf_counter()
+        self._pauses: List[GcPause] = []
+        self._pending: Optional[Tuple[float, int]] = None
+        self._stats_start: List[dict] = []
+        self._installed = False
+
+    def install(self, origin: Optional[float] = None):
+        """Start recording collections; timestamps are relative to `origin` (perf_counter)."""
+        if origin is not None:
+            self._origin = origin
+        self._stats_start = gc.get_stats()
+        if self.record_pauses and not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        """Stop recording collections."""
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def _callback(self, phase: str, info: dict):
+        now = time.perf_counter()
+        if phase == "start":
+            self._pending = (now, info.get("generation", 0))
+        elif phase == "stop" and self._pending is not None:
+            started, generation = self._pending
+            self._pending = None
+            self._pauses.append(
+                GcPause(
+                    timestamp_ms=(started - self._origin) * 1000,
+                    generation=generation,
+                    duration_ms=(now - started) * 1000,
+                    collected=info.get("collected", 0),
+                    uncollectable=info.get("uncollectable", 0),
+                )
+            )
+
+    @property
+    def pauses(self) -> List[GcPause]:
+        """Collections recorded so far (live list, do not modify)."""
+        return self._pauses
+
+    def collection_counts(self) -> List[int]:
+        """Number of collections per generation recorded so far."""
+        if not self.record_pauses:
+            return (self.stats_collection_counts() + [0, 0, 0])[:3]
+        counts = [0, 0, 0]
+        for pause in self._pauses:
+            if 0 <= pause.generation < len(counts):
+                counts[pause.generation] += 1
+        return counts
+
+    def stats_collection_counts(self) -> List[int]:
+        """Collections per generation according to gc.get_stats() since install()."""
+        return [
+            end["collections"] - start["collections"]
+            for start, end in zip(self._stats_start, gc.get_stats())
+        ]
+
+    def pause_percentiles(self) -> Dict[str, float]:
+        """Pause duration statistics (ms) across all recorded collections."""
+        durations = sorted(p.duration_ms for p in self._pauses)
+        if not durations:
+            return {"total": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        def _pct(q: float) -> float:
+            index = q * (len(durations) - 1)
+            lower = int(index)
+            if lower + 1 >= len(durations):
+                return durations[lower]
+            return durations[lower] + (durations[lower + 1] - durations[lower]) * (index - lower)
+
+        total = sum(durations)
+        return {
+            "total": total,
+            "mean": total / len(durations),
+            "p50": _pct(0.50),
+            "p95": _pct(0.95),
+            "p99": _pct(0.99),
+            "max": durations[-1],
+        }
+
+    def get_result(
+        self,
+        measurements: Sequence[float] = (),
+        end_timestamps_ms: Sequence[float] = (),
+    ) -> GcResult:
+        """Summarize recorded collections, correlated with iteration windows when given."""
+        pause_stats = self.pause_percentiles()
+        return GcResult(
+            collections=self.collection_counts(),
+            stats_collections=self.stats_collection_counts(),
+            total_pause_ms=pause_stats["total"],
+            mean_pause_ms=pause_stats["mean"],
+            pause_p50_ms=pause_stats["p50"],
+            pause_p95_ms=pause_stats["p95"],
+            pause_p99_ms=pause_stats["p99"],
+            max_pause_ms=pause_stats["max"],
+            collected_objects=sum(p.collected for p in self._pauses),
+            uncollectable_objects=sum(p.uncollectable for p in self._pauses),
+            pauses=list(self._pauses),
+            correlation=self.correlate(measurements, end_timestamps_ms) if measurements else None,
+        )
+
+    def correlate(
+        self,
+        measurements: Sequence[float],
+        end_timestamps_ms: Sequence[float],
+        slow_percentile: float = 0.99,
+    ) -> GcCorrelation:
+        """
+        Match pauses to iteration windows [end - duration, end] and compare the latency of
+        iterations that contained a GC pause with those that did not.
+        """
+        result = GcCorrelation()
+        if not measurements or len(measurements) != len(end_timestamps_ms):
+            return result
+
+        ordered = sorted(measurements)
+        result.slow_iteration_threshold_ms = percentile(ordered, slow_percentile)
+
+        pauses = sorted(self._pauses, key=lambda p: p.timestamp_ms)
+        starts = [p.timestamp_ms for p in pauses]
+        longest = max((p.duration_ms for p in pauses), default=0.0)
+        with_pause: List[float] = []
+        without_pause: List[float] = []
+        # Windows may overlap (concurrent modes), so each one is matched independently
+        for duration, end in zip(measurements, end_timestamps_ms):
+            start = end - duration
+            pause_ms = 0.0
+            for index in range(bisect.bisect_left(starts, start - longest), bisect.bisect_right(starts, end)):
+                pause = pauses[index]
+                if pause.timestamp_ms + pause.duration_ms >= start:
+                    pause_ms += pause.duration_ms
+
+            is_slow = duration >= result.slow_iteration_threshold_ms
+            if is_slow:
+                result.slow_iterations += 1
+            if pause_ms > 0:
+                with_pause.append(duration)
+                if is_slow:
+                    result.slow_iterations_with_pause += 1
+                    result.pause_ms_in_slow_iterations += pause_ms
+            else:
+                without_pause.append(duration)
+
+        result.iterations_with_pause = len(with_pause)
+        if with_pause:
+            result.mean_ms_with_pause = sum(with_pause) / len(with_pause)
+        if without_pause:
+            result.mean_ms_without_pause = sum(without_pause) / len(without_pause)
+        return result
+
+
+def gc_to_dict(result: GcResult, timeline_limit: int = 10000) -> dict:
+    """Collections, pauses and their effect on latency for Metrics.GarbageCollection."""
+    data = {
+        "Gen0Collections": result.collections[0],
+        "Gen1Collections": result.collections[1],
+        "Gen2Collections": result.collections[2],
+        "StatsCollections": result.stats_collections,
+        "TotalPauseMs": result.total_pause_ms,
+        "MeanPauseMs": result.mean_pause_ms,
+        "PauseP50Ms": result.pause_p50_ms,
+        "PauseP95Ms": result.pause_p95_ms,
+        "PauseP99Ms": result.pause_p99_ms,
+        "MaxPauseMs": result.max_pause_ms,
+        "CollectedObjects": result.collected_objects,
+        "UncollectableObjects": result.uncollectable_objects,
+        "TimelineTruncated": len(result.pauses) > timeline_limit,
+        "Timeline": [
+            {
+                "TimestampMs": p.timestamp_ms,
+                "Generation": p.generation,
+                "DurationMs": p.duration_ms,
+                "Collected": p.collected,
+            }
+            for p in result.pauses[:timeline_limit]
+        ],
+    }
+    if result.correlation is not None:
+        correlation = result.correlation
+        data["Correlation"] = {
+            "IterationsWithPause": correlation.iterations_with_pause,
+            "SlowIterationThresholdMs": correlation.slow_iteration_threshold_ms,
+            "SlowIterations": correlation.slow_iterations,
+            "SlowIterationsWithPause": correlation.slow_iterations_with_pause,
+            "MeanMsWithPause": correlation.mean_ms_with_pause,
+            "MeanMsWithoutPause": correlation.mean_ms_without_pause,
+            "PauseMsInSlowIterations": correlation.pause_ms_in_slow_iterations,
+        }
+    return data
@@ -0,0 +1,112 @@
+"""
+Garbage collector configuration for GC tuning experiments.
+
+Runners apply a threshold preset at startup, optionally gc.freeze() everything allocated
+by agent construction and warmup, and optionally disable the collector during the timed
+loop. run_performance_tests.py --gc-matrix sweeps these settings.
+"""
+
+import gc
+from typing import Dict, Optional, Tuple
+
+
+# gc.set_threshold(gen0, gen1, gen2) presets; "default" keeps the interpreter defaults
+GC_PRESETS: Dict[str, Optional[Tuple[int, int, int]]] = {
+    "default": None,
+    "aggressive": (200, 5, 5),
+    "relaxed": (5000, 20, 20),
+    "high": (50000, 50, 100),
+}
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+class GcTuning:
+    """Applies and reverts one GC configuration around a benchmark run."""
+
+    def __init__(
+        self,
+        preset: str = "default",
+        threshold: Optional[Tuple[int, int, int]] = None,
+        freeze_after_warmup: bool = False,
+        disable_during_loop: bool = False,
+    ):
+        if preset not in GC_PRESETS:
+            raise ValueError(f"Unknown GC preset '{preset}', expected one of {list(GC_PRESETS)}")
+
+        self.preset = preset
+        self.threshold = threshold or GC_PRESETS[preset]
+        self.freeze_after_warmup = freeze_after_warmup
+        self.disable_during_loop = disable_during_loop
+        self._original_threshold = gc.get_threshold()
+        self._frozen_objects = 0
+
+    @classmethod
+    def from_env(cls, env: dict) -> "GcTuning":
+        """Build from GC_PRESET, GC_THRESHOLD ("700,10,10"), GC_FREEZE and GC_DISABLE."""
+        threshold = None
+        if env.get("GC_THRESHOLD"):
+            parts = [int(part) for part in env["GC_THRESHOLD"].split(",")]
+            threshold = tuple((parts + [10, 10])[:3])
+
+        return cls(
+            preset=env.get("GC_PRESET", "default").lower(),
+            threshold=threshold,
+            freeze_after_warmup=_flag(env.get("GC_FREEZE")),
+            disable_during_loop=_flag(env.get("GC_DISABLE")),
+        )
+
+    @property
+    def is_default(self) -> bool:
+        return self.threshold is None and not self.freeze_after_warmup and not self.disable_during_loop
+
+    def apply(self):
+        """Apply the threshold preset; call before the agent is created."""
+        if self.threshold:
+            gc.set_threshold(*self.threshold)
+
+    def after_warmup(self):
+        """Move everything allocated so far to the permanent generation (gc.freeze, Python 3.7+)."""
+        if self.freeze_after_warmup and hasattr(gc, "freeze"):
+            gc.collect()
+            gc.freeze()
+            self._frozen_objects = gc.get_freeze_count()
+
+    def enter_timed_loop(self):
+        """Disable the collector for the timed loop, if configured."""
+        if self.disable_during_loop:
+            gc.disable()
+
+    def exit_timed_loop(self):
+        """Re-enable the collector after the timed loop."""
+        if self.disable_during_loop:
+            gc.enable()
+
+    def restore(self):
+        """Restore interpreter defaults (thresholds, enabled collector, unfrozen heap)."""
+        gc.set_threshold(*self._original_threshold)
+        gc.enable()
+        if self._frozen_objects and hasattr(gc, "unfreeze"):
+            gc.unfreeze()
+
+    def describe(self) -> str:
+        """Short label such as 'relaxed+freeze'."""
+        parts = [self.preset if self.threshold == GC_PRESETS.get(self.preset) else "custom"]
+        if self.freeze_after_warmup:
+            parts.append("freeze")
+        if self.disable_during_loop:
+            parts.append("disabled")
+        return "+".join(parts)
+
+    def to_dict(self) -> dict:
+        """Settings applied to the collector, for Metrics.GcTuning."""
+        return {
+            "Label": self.describe(),
+            "Preset": self.preset,
+            "Threshold": list(self.threshold or gc.get_threshold()),
+            "FreezeAfterWarmup": self.freeze_after_warmup,
+            "FrozenObjects": self._frozen_objects,
+            "DisabledDuringLoop": self.disable_during_loop,
+        }
@@ -0,0 +1,107 @@
+"""
+Mergeable latency histogram.
+
+Values are counted in logarithmic buckets whose width is a fixed fraction of the value
+(1% by default), so percentiles keep that relative accuracy at any scale while the
+histogram stays small. Histograms with the same precision merge by adding bucket counts,
+which lets separate processes or hosts record locally and combine their results exactly
+as if one process had recorded everything.
+"""
+
+import math
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of millisecond values."""
+
+    def __init__(self, precision: float = 0.01, lowest_ms: float = 0.001):
+        if precision <= 0:
+            raise ValueError("precision must be positive")
+        self.precision = precision
+        self.lowest_ms = lowest_ms
+        self._log_base = math.log1p(precision)
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def _index(self, value_ms: float) -> int:
+        return int(math.log(max(value_ms, self.lowest_ms) / self.lowest_ms) / self._log_base)
+
+    def _value(self, index: int) -> float:
+        # Geometric midpoint of the bucket
+        return self.lowest_ms * math.exp((index + 0.5) * self._log_base)
+
+    def record(self, value_ms: float, count: int = 1):
+        index = self._index(value_ms)
+        self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += count
+        self.sum_ms += value_ms * count
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add other's counts to this histogram."""
+        if other.precision != self.precision or other.lowest_ms != self.lowest_ms:
+            raise ValueError("histograms with different precision cannot be merged")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        if other.min_ms is not None:
+            self.min_ms = other.min_ms if self.min_ms is None else min(self.min_ms, other.min_ms)
+        if other.max_ms is not None:
+            self.max_ms = other.max_ms if self.max_ms is None else max(self.max_ms, other.max_ms)
+
+    @property
+    def mean(self) -> float:
+        return self.sum_ms / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """Value at a percentile in [0, 1], within the histogram precision."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percentile * self.count))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # Clamp the bucket midpoint to the exact extremes
+                return min(max(self._value(index), self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "Count": self.count,
+            "Mean": self.mean,
+            "Min": self.min_ms or 0.0,
+            "P50": self.percentile(0.50),
+            "P90": self.percentile(0.90),
+            "P95": self.percentile(0.95),
+            "P99": self.percentile(0.99),
+            "Max": self.max_ms or 0.0,
+        }
+
+    def to_dict(self) -> dict:
+        """Serializable form, e.g. to send over the wire."""
+        return {
+            "Precision": self.precision,
+            "LowestMs": self.lowest_ms,
+            "Count": self.count,
+            "SumMs": self.sum_ms,
+            "MinMs": self.min_ms,
+            "MaxMs": self.max_ms,
+            "Buckets": {str(index): count for index, count in self._buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls(precision=data["Precision"], lowest_ms=data["LowestMs"])
+        histogram._buckets = {int(index): count for index, count in data["Buckets"].items()}
+        histogram.count = data["Count"]
+        histogram.sum_ms = data["SumMs"]
+        histogram.min_ms = data["MinMs"]
+        histogram.max_ms = data["MaxMs"]
+        return histogram
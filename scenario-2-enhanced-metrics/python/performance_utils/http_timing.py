@@ -0,0 +1,205 @@
+"""
+HTTP connection timing for httpx-based clients (the ollama client uses httpx).
+
+A request event hook attaches an httpcore "trace" extension to every request, which
+reports connection setup, request write, time to first byte and body read. Requests
+that never open a TCP connection reused a pooled keep-alive connection.
+
+Note: httpcore resolves DNS inside connect_tcp, so DNS time is part of connect_ms.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .percentiles import percentile
+
+
+@dataclass
+class HttpTiming:
+    """Timing breakdown of one HTTP request (milliseconds)."""
+    method: str
+    url: str
+    reused_connection: bool
+    pool_wait_ms: float = 0.0
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    request_write_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    body_read_ms: float = 0.0
+    total_ms: float = 0.0
+    status_code: Optional[int] = None
+    failed: bool = False
+
+
+@dataclass
+class HttpTimingResult:
+    """HTTP timing summary of a measurement session; phase stats are in ms."""
+    requests: int = 0
+    failed_requests: int = 0
+    dropped_records: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    phases: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+class _RequestTrace:
+    """Collects httpcore trace events of one request."""
+
+    def __init__(self, collector: "HttpTimingCollector", method: str, url: str):
+        self._collector = collector
+        self._method = method
+        self._url = url
+        self._start = time.perf_counter()
+        self._events: Dict[str, float] = {}
+        self._finished = False
+        self.status_code: Optional[int] = None
+
+    async def __call__(self, event_name: str, info: dict):
+        # Names look like "connection.connect_tcp.started" or "http11.send_request_headers.complete"
+        key = ".".join(event_name.split(".")[-2:])
+        self._events.setdefault(key, time.perf_counter())
+        if self._finished:
+            return
+        if key.startswith("response_closed.") and not key.endswith(".started"):
+            self._finished = True
+            self._collector._add(self._finish(failed=key.endswith(".failed")))
+        elif key.endswith(".failed"):
+            # httpcore closes the response itself on errors, but a failed connect never gets that far
+            self._finished = True
+            self._collector._add(self._finish(failed=True))
+
+    def _span_ms(self, start: str, end: str) -> Optional[float]:
+        if start in self._events and end in self._events:
+            return (self._events[end] - self._events[start]) * 1000
+        return None
+
+    def _finish(self, failed: bool) -> HttpTiming:
+        events = self._events
+        first_activity = min(
+            (events[key] for key in ("connect_tcp.started", "send_request_headers.started") if key in events),
+            default=self._start,
+        )
+        return HttpTiming(
+            method=self._method,
+            url=self._url,
+            reused_connection="connect_tcp.started" not in events,
+            pool_wait_ms=(first_activity - self._start) * 1000,
+            connect_ms=self._span_ms("connect_tcp.started", "connect_tcp.complete"),
+            tls_ms=self._span_ms("start_tls.started", "start_tls.complete"),
+            request_write_ms=self._span_ms("send_request_headers.started", "send_request_body.complete") or 0.0,
+            ttfb_ms=self._span_ms("send_request_body.complete", "receive_response_headers.complete") or 0.0,
+            body_read_ms=self._span_ms("receive_response_body.started", "response_closed.started") or 0.0,
+            total_ms=(time.perf_counter() - self._start) * 1000,
+            status_code=self.status_code,
+            failed=failed,
+        )
+
+
+class HttpTimingCollector:
+    """Records an HttpTiming for every request sent through the instrumented client."""
+
+    def __init__(self, max_records: int = 100000):
+        self._records: List[HttpTiming] = []
+        self._max_records = max_records
+        self._dropped = 0
+
+    def _add(self, timing: HttpTiming):
+        if len(self._records) >= self._max_records:
+            self._dropped += 1
+            return
+        self._records.append(timing)
+
+    def httpx_event_hooks(self) -> Dict[str, List[Callable]]:
+        """Async httpx event hooks installing the httpcore trace extension."""
+        async def on_request(request):
+            trace = _RequestTrace(self, request.method, str(request.url))
+            request.extensions["trace"] = trace
+
+        async def on_response(response):
+            trace = response.request.extensions.get("trace")
+            if isinstance(trace, _RequestTrace):
+                trace.status_code = response.status_code
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def reset(self):
+        """Discard the records collected so far (e.g. warmup requests)."""
+        self._records = []
+        self._dropped = 0
+
+    @property
+    def records(self) -> List[HttpTiming]:
+        """Completed request timings (live list, do not modify)."""
+        return self._records
+
+    def get_result(self) -> HttpTimingResult:
+        """Per-phase statistics plus connection reuse counts."""
+        records = self._records
+        new_connections = [r for r in records if not r.reused_connection]
+        phase_values = {
+            "pool_wait": [r.pool_wait_ms for r in records],
+            # DNS resolution happens inside httpcore's connect_tcp and is included here
+            "connect": [r.connect_ms for r in new_connections if r.connect_ms is not None],
+            "tls": [r.tls_ms for r in new_connections if r.tls_ms is not None],
+            "request_write": [r.request_write_ms for r in records],
+            "time_to_first_byte": [r.ttfb_ms for r in records],
+            "body_read": [r.body_read_ms for r in records],
+            "total": [r.total_ms for r in records],
+            "total_new_connection": [r.total_ms for r in new_connections],
+        }
+
+        phases: Dict[str, Dict[str, float]] = {}
+        for name, values in phase_values.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            phases[name] = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1],
+            }
+
+        return HttpTimingResult(
+            requests=len(records),
+            failed_requests=sum(1 for r in records if r.failed),
+            dropped_records=self._dropped,
+            new_connections=len(new_connections),
+            reused_connections=len(records) - len(new_connections),
+            phases=phases,
+        )
+
+
+def merge_event_hooks(*hook_sets: Dict[str, List[Callable]]) -> Dict[str, List[Callable]]:
+    """Combine several httpx event hook dictionaries, preserving order."""
+    merged: Dict[str, List[Callable]] = {"request": [], "response": []}
+    for hooks in hook_sets:
+        for event, callbacks in (hooks or {}).items():
+            merged.setdefault(event, []).extend(callbacks)
+    return merged
+
+
+def http_timing_to_dict(result: HttpTimingResult) -> dict:
+    """Connection reuse and per-phase request timings for Metrics.HttpTiming."""
+    return {
+        "Requests": result.requests,
+        "FailedRequests": result.failed_requests,
+        "DroppedRecords": result.dropped_records,
+        "NewConnections": result.new_connections,
+        "ReusedConnections": result.reused_connections,
+        "ConnectionReuseRatio": result.reused_connections / result.requests if result.requests else 0.0,
+        "Phases": {
+            "".join(part.capitalize() for part in name.split("_")): {
+                "Count": values["count"],
+                "MeanMs": values["mean"],
+                "P50Ms": values["p50"],
+                "P95Ms": values["p95"],
+                "P99Ms": values["p99"],
+                "MaxMs": values["max"],
+            }
+            for name, values in result.phases.items()
+        },
+    }
@@ -0,0 +1,298 @@
+"""
+Memory leak detection for soak runs.
+
+LeakDetector samples RSS, allocated heap blocks (sys.getallocatedblocks) and the
+collector's allocation counters (gc.get_count) every `interval_s` while a runner keeps
+sending requests for a wall-clock duration. Samples taken before `warmup_s` are ignored: caches, connection
+pools and lazily imported modules legitimately grow there.
+
+After warmup RSS and heap blocks are fitted against the number of completed requests with
+ordinary least squares. Growth is flagged when the one-sided 99% lower confidence bound
+of the slope is above zero and the fitted growth over the window exceeds
+`min_relative_growth` of the baseline. Consecutive samples are autocorrelated, which
+makes the confidence interval optimistic; the relative floor keeps allocator noise
+from being reported as a leak.
+
+Live GC-tracked objects are counted per type at the end of warmup and at the end of the
+run (a full gc.get_objects() walk, too slow to repeat every sample); the total and the
+types that grew most per 1k requests point at what is leaking. The sampled gc.get_count()
+total drops at every collection, so it is recorded for the timeline but not fitted.
+
+A soak run must not grow by itself, so request latencies go into a fixed-size
+LatencyHistogram (record_request) instead of a list of samples.
+"""
+
+import asyncio
+import gc
+import math
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import psutil
+
+from .adaptive_sampling import _t_quantile
+from .histogram import LatencyHistogram
+
+
+@dataclass
+class LeakSample:
+    """Memory state at one point of a soak run."""
+    elapsed_s: float
+    requests: int
+    rss_mb: float
+    heap_blocks: int
+    gc_count: int
+
+
+@dataclass
+class TrendFit:
+    """Least-squares growth of one series per 1k requests after warmup."""
+    metric: str
+    samples: int
+    baseline: float
+    slope_per_1k: float
+    slope_ci_lower: float
+    slope_ci_upper: float
+    r_squared: float
+    fitted_growth: float
+    significant: bool
+
+
+@dataclass
+class TypeGrowth:
+    """Growth of the live objects of one type between warmup and the end of the run."""
+    type_name: str
+    count_after_warmup: int
+    count_at_end: int
+    growth_per_1k: float
+
+
+@dataclass
+class LeakResult:
+    """Outcome of a soak run."""
+    duration_s: float
+    warmup_s: float
+    requests: int
+    warmup_requests: int
+    latency: Optional[LatencyHistogram] = None
+    leak_suspected: bool = False
+    trends: List[TrendFit] = field(default_factory=list)
+    top_growing_types: List[TypeGrowth] = field(default_factory=list)
+    gc_objects: Optional[TypeGrowth] = None
+    samples: List[LeakSample] = field(default_factory=list)
+
+
+def fit_trend(metric: str, requests: List[float], values: List[float],
+              min_relative_growth: float = 0.01) -> Optional[TrendFit]:
+    """Fit values ~ requests; None with fewer than 3 samples or no spread in requests."""
+    n = len(values)
+    if n < 3:
+        return None
+    mean_x = sum(requests) / n
+    mean_y = sum(values) / n
+    sxx = sum((x - mean_x) ** 2 for x in requests)
+    if sxx == 0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(requests, values))
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    residuals = [y - (intercept + slope * x) for x, y in zip(requests, values)]
+    sse = sum(r * r for r in residuals)
+    syy = sum((y - mean_y) ** 2 for y in values)
+    r_squared = 1 - sse / syy if syy else 0.0
+    standard_error = math.sqrt(sse / (n - 2) / sxx)
+
+    fitted_growth = slope * (max(requests) - min(requests))
+    baseline = intercept + slope * min(requests)
+    one_sided_lower = slope - _t_quantile(0.98, n - 2) * standard_error
+    t95 = _t_quantile(0.95, n - 2)
+    return TrendFit(
+        metric=metric,
+        samples=n,
+        baseline=baseline,
+        slope_per_1k=slope * 1000,
+        slope_ci_lower=(slope - t95 * standard_error) * 1000,
+        slope_ci_upper=(slope + t95 * standard_error) * 1000,
+        r_squared=r_squared,
+        fitted_growth=fitted_growth,
+        significant=one_sided_lower > 0 and fitted_growth > abs(baseline) * min_relative_growth,
+    )
+
+
+def object_type_counts() -> Counter:
+    """Live GC-tracked objects per type name."""
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+
+
+class LeakDetector:
+    """Samples memory periodically on the running event loop and fits growth trends."""
+
+    def __init__(self, interval_s: float = 5.0, warmup_s: float = 60.0, min_relative_growth: float = 0.01,
+                 top_types: int = 10):
+        """
+        Args:
+            interval_s: Time between samples.
+            warmup_s: Initial part of the run excluded from the trend fit.
+            min_relative_growth: Fitted growth, relative to the baseline, below which a trend is not flagged.
+            top_types: Number of growing object types reported.
+        """
+        self.interval_s = interval_s
+        self.warmup_s = warmup_s
+        self.min_relative_growth = min_relative_growth
+        self.top_types = top_types
+        self.requests = 0
+        self.latency = LatencyHistogram()
+        self._process = psutil.Process(os.getpid())
+        self._samples: List[LeakSample] = []
+        self._task: Optional[asyncio.Task] = None
+        self._origin = 0.0
+        self._warmup_requests = 0
+        self._warmup_types: Optional[Counter] = None
+
+    def record_request(self, latency_ms: Optional[float] = None):
+        self.requests += 1
+        if latency_ms is not None:
+            self.latency.record(latency_ms)
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self._origin
+
+    def sample(self) -> LeakSample:
+        snapshot = LeakSample(
+            elapsed_s=self.elapsed_s,
+            requests=self.requests,
+            rss_mb=self._process.memory_info().rss / 1024 / 1024,
+            heap_blocks=sys.getallocatedblocks(),
+            gc_count=sum(gc.get_count()),
+        )
+        self._samples.append(snapshot)
+        if self._warmup_types is None and snapshot.elapsed_s >= self.warmup_s:
+            self._warmup_requests = self.requests
+            self._warmup_types = object_type_counts()
+        return snapshot
+
+    async def _sample_loop(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval_s)
+
+    def start(self):
+        """Start sampling on the running loop."""
+        self._origin = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._sample_loop())
+
+    async def stop(self) -> LeakResult:
+        """Stop sampling, take a final sample and fit the trends."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.sample()
+        return self.get_result()
+
+    def get_result(self) -> LeakResult:
+        result = LeakResult(
+            duration_s=self.elapsed_s,
+            warmup_s=self.warmup_s,
+            requests=self.requests,
+            warmup_requests=self._warmup_requests,
+            latency=self.latency,
+            samples=list(self._samples),
+        )
+        # Count object types first, before the fit allocates anything
+        window_requests = self.requests - self._warmup_requests
+        final_types = object_type_counts() if self._warmup_types is not None and window_requests > 0 else None
+
+        measured = [s for s in self._samples if s.elapsed_s >= self.warmup_s]
+        requests = [float(s.requests) for s in measured]
+        for metric in ("rss_mb", "heap_blocks"):
+            trend = fit_trend(metric, requests, [float(getattr(s, metric)) for s in measured], self.min_relative_growth)
+            if trend:
+                result.trends.append(trend)
+        result.leak_suspected = any(trend.significant for trend in result.trends)
+
+        if final_types is not None:
+            # The detector's own samples grow by design
+            own_before = self._warmup_types.get(LeakSample.__qualname__, 0)
+            own_after = final_types.get(LeakSample.__qualname__, 0)
+            total_before = sum(self._warmup_types.values()) - own_before
+            total_after = sum(final_types.values()) - own_after
+            result.gc_objects = TypeGrowth(
+                "all", total_before, total_after, (total_after - total_before) * 1000 / window_requests
+            )
+            growth: List[Tuple[str, int, int]] = [
+                (name, self._warmup_types.get(name, 0), count)
+                for name, count in final_types.items()
+                if count > self._warmup_types.get(name, 0) and name != LeakSample.__qualname__
+            ]
+            growth.sort(key=lambda item: item[1] - item[2])
+            result.top_growing_types = [
+                TypeGrowth(name, before, after, (after - before) * 1000 / window_requests)
+                for name, before, after in growth[:self.top_types]
+            ]
+        return result
+
+
+def leak_detector_from_env(env: dict, duration_s: float) -> LeakDetector:
+    """Detector from LEAK_SAMPLE_INTERVAL_S and SOAK_WARMUP_S (default: a fifth of the duration)."""
+    return LeakDetector(
+        interval_s=float(env.get("LEAK_SAMPLE_INTERVAL_S", "5")),
+        warmup_s=float(env.get("SOAK_WARMUP_S") or duration_s / 5),
+        min_relative_growth=float(env.get("LEAK_MIN_RELATIVE_GROWTH", "0.01")),
+    )
+
+
+def leak_to_dict(result: LeakResult) -> dict:
+    """Memory trends and the leak verdict for Metrics.LeakDetection."""
+    return {
+        "DurationS": result.duration_s,
+        "WarmupS": result.warmup_s,
+        "Requests": result.requests,
+        "WarmupRequests": result.warmup_requests,
+        "LeakSuspected": result.leak_suspected,
+        "Latency": result.latency.summary() if result.latency and result.latency.count else None,
+        "Trends": {
+            trend.metric: {
+                "Samples": trend.samples,
+                "Baseline": trend.baseline,
+                "SlopePer1kRequests": trend.slope_per_1k,
+                "SlopeCi95": [trend.slope_ci_lower, trend.slope_ci_upper],
+                "RSquared": trend.r_squared,
+                "FittedGrowth": trend.fitted_growth,
+                "Significant": trend.significant,
+            }
+            for trend in result.trends
+        },
+        "GcObjects": {
+            "CountAfterWarmup": result.gc_objects.count_after_warmup,
+            "CountAtEnd": result.gc_objects.count_at_end,
+            "GrowthPer1kRequests": result.gc_objects.growth_per_1k,
+        } if result.gc_objects else None,
+        "TopGrowingTypes": [
+            {
+                "Type": growth.type_name,
+                "CountAfterWarmup": growth.count_after_warmup,
+                "CountAtEnd": growth.count_at_end,
+                "GrowthPer1kRequests": growth.growth_per_1k,
+            }
+            for growth in result.top_growing_types
+        ],
+        "Samples": [
+            {
+                "ElapsedS": s.elapsed_s,
+                "Requests": s.requests,
+                "RssMB": s.rss_mb,
+                "HeapBlocks": s.heap_blocks,
+                "GcCount": s.gc_count,
+            }
+            for s in result.samples
+        ],
+    }
@@ -0,0 +1,294 @@
+"""
+Client-side load balancing across several Ollama hosts.
+
+OllamaLoadBalancer holds one ollama.AsyncClient per endpoint and exposes the chat()
+method the agent framework calls, so it can be passed wherever an AsyncClient is
+expected. Policies:
+
+- round_robin: endpoints in turn
+- least_outstanding: fewest requests in flight (ties broken round-robin)
+- ewma: lowest exponentially weighted moving average latency, scaled by the
+  requests in flight so a fast endpoint is not flooded
+
+Endpoints are marked unhealthy after consecutive request failures or a failed health
+probe and skipped until a probe succeeds again. If every endpoint is unhealthy, all of
+them are used rather than failing every request.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .percentiles import percentile
+
+
+POLICIES = ("round_robin", "least_outstanding", "ewma")
+
+
+def parse_endpoints(value: Optional[str]) -> List[str]:
+    """Split a comma-separated endpoint list, dropping blanks and duplicates."""
+    endpoints: List[str] = []
+    for part in (value or "").split(","):
+        part = part.strip().rstrip("/")
+        if part and part not in endpoints:
+            endpoints.append(part)
+    return endpoints
+
+
+class _Endpoint:
+    """One Ollama host and its live counters."""
+
+    def __init__(self, host: str, client):
+        self.host = host
+        self.client = client
+        self.healthy = True
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.health_checks = 0
+        self.health_check_failures = 0
+        self.ewma_ms: Optional[float] = None
+        self.latencies_ms: List[float] = []
+
+
+@dataclass
+class EndpointStats:
+    """Per-endpoint summary of a measurement session."""
+    host: str
+    healthy: bool
+    requests: int
+    errors: int
+    max_outstanding: int
+    health_checks: int
+    health_check_failures: int
+    ewma_ms: Optional[float]
+    requests_per_second: float
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class LoadBalancerResult:
+    """Load balancer summary of a measurement session."""
+    policy: str
+    elapsed_ms: float
+    requests: int
+    errors: int
+    requests_per_second: float
+    endpoints: List[EndpointStats] = field(default_factory=list)
+
+
+class OllamaLoadBalancer:
+    """Spreads chat calls over several Ollama endpoints."""
+
+    def __init__(
+        self,
+        hosts: List[str],
+        policy: str = "round_robin",
+        client_factory: Optional[Callable[[str], Any]] = None,
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        health_interval_s: float = 10.0,
+        health_timeout_s: float = 5.0,
+        **client_kwargs,
+    ):
+        if not hosts:
+            raise ValueError("at least one endpoint is required")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown balancing policy '{policy}', expected one of {', '.join(POLICIES)}")
+        if client_factory is None:
+            from ollama import AsyncClient
+
+            def client_factory(host):
+                return AsyncClient(host=host, **client_kwargs)
+
+        self.policy = policy
+        self._endpoints = [_Endpoint(host, client_factory(host)) for host in hosts]
+        self._alpha = ewma_alpha
+        self._failure_threshold = failure_threshold
+        self._health_interval_s = health_interval_s
+        self._health_timeout_s = health_timeout_s
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self._start = time.perf_counter()
+
+    @property
+    def hosts(self) -> List[str]:
+        return [endpoint.host for endpoint in self._endpoints]
+
+    def reset(self):
+        """Clear request counters (after warmup); health state and EWMA are kept."""
+        for endpoint in self._endpoints:
+            endpoint.requests = 0
+            endpoint.errors = 0
+            endpoint.max_outstanding = endpoint.outstanding
+            endpoint.latencies_ms = []
+        self._start = time.perf_counter()
+
+    def _pick(self) -> _Endpoint:
+        candidates = [e for e in self._endpoints if e.healthy] or self._endpoints
+        # Rotate the starting point so ties are broken round-robin
+        start = self._next % len(candidates)
+        self._next += 1
+        rotated = candidates[start:] + candidates[:start]
+        if self.policy == "least_outstanding":
+            return min(rotated, key=lambda e: e.outstanding)
+        if self.policy == "ewma":
+            # Endpoints without a measurement yet are scored with the mean EWMA of the others
+            measured = [e.ewma_ms for e in candidates if e.ewma_ms is not None]
+            prior = sum(measured) / len(measured) if measured else 0.0
+            return min(rotated, key=lambda e: (
+                (prior if e.ewma_ms is None else e.ewma_ms) * (e.outstanding + 1), e.outstanding
+            ))
+        return rotated[0]
+
+    def _finish(self, endpoint: _Endpoint, start: float, failed: bool):
+        endpoint.outstanding -= 1
+        if failed:
+            endpoint.errors += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self._failure_threshold:
+                endpoint.healthy = False
+            return
+        latency_ms = (time.perf_counter() - start) * 1000
+        endpoint.consecutive_failures = 0
+        endpoint.latencies_ms.append(latency_ms)
+        endpoint.ewma_ms = latency_ms if endpoint.ewma_ms is None else (
+            self._alpha * latency_ms + (1 - self._alpha) * endpoint.ewma_ms
+        )
+
+    async def chat(self, *args, **kwargs):
+        """ollama.AsyncClient.chat on the endpoint chosen by the policy."""
+        endpoint = self._pick()
+        endpoint.requests += 1
+        endpoint.outstanding += 1
+        endpoint.max_outstanding = max(endpoint.max_outstanding, endpoint.outstanding)
+        start = time.perf_counter()
+        try:
+            response = await endpoint.client.chat(*args, **kwargs)
+        except BaseException:
+            self._finish(endpoint, start, failed=True)
+            raise
+        if kwargs.get("stream"):
+            # The request stays outstanding until the stream is consumed
+            return self._wrap_stream(endpoint, start, response)
+        self._finish(endpoint, start, failed=False)
+        return response
+
+    async def _wrap_stream(self, endpoint: _Endpoint, start: float, stream: AsyncIterator) -> AsyncIterator:
+        failed = True
+        try:
+            async for chunk in stream:
+                yield chunk
+            failed = False
+        finally:
+            self._finish(endpoint, start, failed)
+
+    async def check_health(self):
+        """Probe every endpoint once (GET /api/tags) and update its health state."""
+        async def probe(endpoint: _Endpoint):
+            endpoint.health_checks += 1
+            try:
+                await asyncio.wait_for(endpoint.client.list(), self._health_timeout_s)
+            except Exception:
+                endpoint.health_check_failures += 1
+                endpoint.healthy = False
+            else:
+                endpoint.healthy = True
+                endpoint.consecutive_failures = 0
+
+        await asyncio.gather(*(probe(endpoint) for endpoint in self._endpoints))
+
+    def start_health_checks(self):
+        """Probe all endpoints every health_interval_s in a background task."""
+        async def loop():
+            while True:
+                await self.check_health()
+                await asyncio.sleep(self._health_interval_s)
+
+        if self._health_task is None:
+            self._health_task = asyncio.get_running_loop().create_task(loop())
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def __getattr__(self, name: str):
+        # Anything other than chat (list, show, ...) goes to the first endpoint
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._endpoints[0].client, name)
+
+    def get_result(self) -> LoadBalancerResult:
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        elapsed_s = elapsed_ms / 1000 if elapsed_ms > 0 else 1.0
+        result = LoadBalancerResult(
+            policy=self.policy,
+            elapsed_ms=elapsed_ms,
+            requests=sum(e.requests for e in self._endpoints),
+            errors=sum(e.errors for e in self._endpoints),
+            requests_per_second=sum(len(e.latencies_ms) for e in self._endpoints) / elapsed_s,
+        )
+        for endpoint in self._endpoints:
+            stats = EndpointStats(
+                host=endpoint.host,
+                healthy=endpoint.healthy,
+                requests=endpoint.requests,
+                errors=endpoint.errors,
+                max_outstanding=endpoint.max_outstanding,
+                health_checks=endpoint.health_checks,
+                health_check_failures=endpoint.health_check_failures,
+                ewma_ms=endpoint.ewma_ms,
+                requests_per_second=len(endpoint.latencies_ms) / elapsed_s,
+            )
+            if endpoint.latencies_ms:
+                ordered = sorted(endpoint.latencies_ms)
+                stats.latency_ms = {
+                    "mean": sum(ordered) / len(ordered),
+                    "p50": percentile(ordered, 0.50),
+                    "p95": percentile(ordered, 0.95),
+                    "p99": percentile(ordered, 0.99),
+                    "max": ordered[-1],
+                }
+            result.endpoints.append(stats)
+        return result
+
+
+def load_balancer_to_dict(result: LoadBalancerResult) -> dict:
+    """Routing policy and per-endpoint counters for Metrics.LoadBalancer."""
+    return {
+        "Policy": result.policy,
+        "ElapsedMs": result.elapsed_ms,
+        "Requests": result.requests,
+        "Errors": result.errors,
+        "RequestsPerSecond": result.requests_per_second,
+        "Endpoints": [
+            {
+                "Host": e.host,
+                "Healthy": e.healthy,
+                "Requests": e.requests,
+                "Share": e.requests / result.requests if result.requests else 0.0,
+                "Errors": e.errors,
+                "MaxOutstanding": e.max_outstanding,
+                "HealthChecks": e.health_checks,
+                "HealthCheckFailures": e.health_check_failures,
+                "EwmaMs": e.ewma_ms,
+                "RequestsPerSecond": e.requests_per_second,
+                "LatencyMs": {
+                    "Mean": e.latency_ms.get("mean"),
+                    "P50": e.latency_ms.get("p50"),
+                    "P95": e.latency_ms.get("p95"),
+                    "P99": e.latency_ms.get("p99"),
+                    "Max": e.latency_ms.get("max"),
+                } if e.latency_ms else None,
+            }
+            for e in result.endpoints
+        ],
+    }
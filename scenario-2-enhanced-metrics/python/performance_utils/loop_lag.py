@@ -0,0 +1,142 @@
+"""
+Event loop lag monitor.
+
+A callback re-schedules itself every interval and records how much later than requested
+it ran. Code that blocks the loop (synchronous psutil calls, json.dump,
+cpu_percent(interval=...)) delays every other task by the same amount, so stalls that
+silently inflate measured request latency show up here as lag.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .percentiles import percentile
+
+
+@dataclass
+class LagWindow:
+    """Lag observed during one timeline window."""
+    start_ms: float
+    mean_ms: float
+    max_ms: float
+
+
+@dataclass
+class LoopLagResult:
+    """Scheduling delay of the event loop over a measurement session."""
+    interval_ms: float
+    stall_threshold_ms: float
+    samples: int = 0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    stalls: int = 0
+    total_stall_ms: float = 0.0
+    timeline: List[LagWindow] = field(default_factory=list)
+
+
+class LoopLagMonitor:
+    """Measures how late periodic callbacks run on the current event loop."""
+
+    def __init__(self, interval_ms: float = 10.0, stall_threshold_ms: float = 50.0, window_ms: float = 1000.0):
+        """
+        Args:
+            interval_ms: Delay between probes.
+            stall_threshold_ms: Lag counted as a stall.
+            window_ms: Width of the timeline windows.
+        """
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.window_ms = window_ms
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._origin = 0.0
+        self._expected = 0.0
+        self._lags_ms: List[float] = []
+        self._times_ms: List[float] = []
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self, origin: Optional[float] = None):
+        """Start probing the running loop; timestamps are relative to origin (perf_counter)."""
+        if self._handle is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._origin = time.perf_counter() if origin is None else origin
+        self._schedule()
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._handle = self._loop.call_later(self.interval_ms / 1000, self._probe)
+
+    def _probe(self):
+        now = time.perf_counter()
+        self._lags_ms.append(max(0.0, (now - self._expected) * 1000))
+        self._times_ms.append((now - self._origin) * 1000)
+        self._schedule()
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            # Count a stall that is still blocking the pending probe
+            now = time.perf_counter()
+            if now > self._expected:
+                self._lags_ms.append((now - self._expected) * 1000)
+                self._times_ms.append((now - self._origin) * 1000)
+
+    def get_result(self) -> LoopLagResult:
+        """Stop probing and summarize the recorded lag."""
+        self.stop()
+        result = LoopLagResult(interval_ms=self.interval_ms, stall_threshold_ms=self.stall_threshold_ms)
+        if not self._lags_ms:
+            return result
+        ordered = sorted(self._lags_ms)
+        stalls = [lag for lag in ordered if lag >= self.stall_threshold_ms]
+        result.samples = len(ordered)
+        result.mean_ms = sum(ordered) / len(ordered)
+        result.p50_ms = percentile(ordered, 0.50)
+        result.p95_ms = percentile(ordered, 0.95)
+        result.p99_ms = percentile(ordered, 0.99)
+        result.max_ms = ordered[-1]
+        result.stalls = len(stalls)
+        result.total_stall_ms = sum(stalls)
+
+        window: List[float] = []
+        window_start = 0.0
+        for timestamp_ms, lag_ms in zip(self._times_ms, self._lags_ms):
+            if window and timestamp_ms - window_start >= self.window_ms:
+                result.timeline.append(LagWindow(window_start, sum(window) / len(window), max(window)))
+                window = []
+            if not window:
+                window_start = timestamp_ms - timestamp_ms % self.window_ms
+            window.append(lag_ms)
+        if window:
+            result.timeline.append(LagWindow(window_start, sum(window) / len(window), max(window)))
+        return result
+
+
+def loop_lag_to_dict(result: LoopLagResult) -> dict:
+    """Lag percentiles, stalls and the per-second timeline for Metrics.LoopLag."""
+    return {
+        "IntervalMs": result.interval_ms,
+        "StallThresholdMs": result.stall_threshold_ms,
+        "Samples": result.samples,
+        "MeanMs": result.mean_ms,
+        "P50Ms": result.p50_ms,
+        "P95Ms": result.p95_ms,
+        "P99Ms": result.p99_ms,
+        "MaxMs": result.max_ms,
+        "Stalls": result.stalls,
+        "TotalStallMs": result.total_stall_ms,
+        "Timeline": [
+            {"StartMs": w.start_ms, "MeanMs": w.mean_ms, "MaxMs": w.max_ms}
+            for w in result.timeline
+        ],
+    }
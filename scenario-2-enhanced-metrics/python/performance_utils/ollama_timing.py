@@ -0,0 +1,198 @@
+"""
+Server-side timing decomposition from Ollama responses.
+
+Every Ollama chat response carries total_duration, load_duration, prompt_eval_duration,
+eval_duration (nanoseconds) and prompt_eval_count/eval_count. The collector wraps
+ollama.AsyncClient.chat to read them, sums them per agent iteration (tool calls make
+several chat calls per iteration) and derives the client overhead = wall time - server
+total, which attributes latency to the client stack rather than to the model.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .percentiles import describe
+
+
+_NS_PER_MS = 1_000_000
+
+
+@dataclass
+class ServerTimingSample:
+    """Client wall time and Ollama server timings of one iteration (milliseconds)."""
+    wall_ms: float
+    chat_calls: int = 0
+    total_ms: float = 0.0
+    load_ms: float = 0.0
+    prompt_eval_ms: float = 0.0
+    eval_ms: float = 0.0
+    prompt_eval_count: int = 0
+    eval_count: int = 0
+
+    @property
+    def client_overhead_ms(self) -> float:
+        return self.wall_ms - self.total_ms
+
+    @property
+    def prompt_tokens_per_second(self) -> Optional[float]:
+        return self.prompt_eval_count / (self.prompt_eval_ms / 1000) if self.prompt_eval_ms > 0 else None
+
+    @property
+    def generation_tokens_per_second(self) -> Optional[float]:
+        return self.eval_count / (self.eval_ms / 1000) if self.eval_ms > 0 else None
+
+
+@dataclass
+class ServerTimingResult:
+    """Server timing summary of a measurement session."""
+    iterations: int = 0
+    iterations_without_timing: int = 0
+    chat_calls: int = 0
+    total_prompt_tokens: int = 0
+    total_generated_tokens: int = 0
+    client_overhead_fraction: float = 0.0
+    distributions: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def _field(response: Any, name: str) -> Any:
+    """Read a field from an ollama response model or a plain dict."""
+    value = getattr(response, name, None)
+    if value is None and isinstance(response, dict):
+        value = response.get(name)
+    return value
+
+
+_current_sample: contextvars.ContextVar[Optional[ServerTimingSample]] = contextvars.ContextVar(
+    "performance_utils_ollama_sample", default=None
+)
+
+
+class OllamaServerTiming:
+    """Collects Ollama server timings per iteration from an instrumented ollama client."""
+
+    def __init__(self):
+        self._samples: List[ServerTimingSample] = []
+
+    def instrument(self, client):
+        """Wrap client.chat (ollama.AsyncClient) so every response is recorded; returns the client."""
+        original_chat = client.chat
+
+        async def chat(*args, **kwargs):
+            response = await original_chat(*args, **kwargs)
+            if kwargs.get("stream"):
+                return self._wrap_stream(response)
+            self._record(response)
+            return response
+
+        client.chat = chat
+        return client
+
+    async def _wrap_stream(self, stream: AsyncIterator) -> AsyncIterator:
+        async for chunk in stream:
+            # Only the final chunk (done=True) carries the timings
+            if _field(chunk, "done"):
+                self._record(chunk)
+            yield chunk
+
+    def _record(self, response: Any):
+        sample = _current_sample.get()
+        if sample is None:
+            # Outside a measured iteration (warmup, sample output)
+            return
+        sample.chat_calls += 1
+        sample.total_ms += (_field(response, "total_duration") or 0) / _NS_PER_MS
+        sample.load_ms += (_field(response, "load_duration") or 0) / _NS_PER_MS
+        sample.prompt_eval_ms += (_field(response, "prompt_eval_duration") or 0) / _NS_PER_MS
+        sample.eval_ms += (_field(response, "eval_duration") or 0) / _NS_PER_MS
+        sample.prompt_eval_count += _field(response, "prompt_eval_count") or 0
+        sample.eval_count += _field(response, "eval_count") or 0
+
+    @contextmanager
+    def iteration(self):
+        """Attribute the chat calls made inside the block to one iteration."""
+        sample = ServerTimingSample(wall_ms=0.0)
+        token = _current_sample.set(sample)
+        start = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            sample.wall_ms = (time.perf_counter() - start) * 1000
+            _current_sample.reset(token)
+            self._samples.append(sample)
+
+    @property
+    def samples(self) -> List[ServerTimingSample]:
+        """Recorded iterations (live list, do not modify)."""
+        return self._samples
+
+    def get_result(self) -> ServerTimingResult:
+        """Distributions of server phases, client overhead and token rates."""
+        timed = [s for s in self._samples if s.chat_calls and s.total_ms > 0]
+        result = ServerTimingResult(
+            iterations=len(self._samples),
+            iterations_without_timing=len(self._samples) - len(timed),
+            chat_calls=sum(s.chat_calls for s in self._samples),
+            total_prompt_tokens=sum(s.prompt_eval_count for s in timed),
+            total_generated_tokens=sum(s.eval_count for s in timed),
+        )
+        if not timed:
+            return result
+
+        wall_total = sum(s.wall_ms for s in timed)
+        if wall_total > 0:
+            result.client_overhead_fraction = sum(s.client_overhead_ms for s in timed) / wall_total
+
+        values = {
+            "wall_ms": [s.wall_ms for s in timed],
+            "server_total_ms": [s.total_ms for s in timed],
+            "load_ms": [s.load_ms for s in timed],
+            "prompt_eval_ms": [s.prompt_eval_ms for s in timed],
+            "eval_ms": [s.eval_ms for s in timed],
+            "client_overhead_ms": [s.client_overhead_ms for s in timed],
+            "prompt_tokens_per_second": [
+                s.prompt_tokens_per_second for s in timed if s.prompt_tokens_per_second is not None
+            ],
+            "generation_tokens_per_second": [
+                s.generation_tokens_per_second for s in timed if s.generation_tokens_per_second is not None
+            ],
+        }
+        for name, series in values.items():
+            if series:
+                result.distributions[name] = describe(series)
+        return result
+
+
+def server_timing_to_dict(result: ServerTimingResult) -> dict:
+    """Server-reported timing distributions and client overhead for Metrics.ServerTiming."""
+    names = {
+        "wall_ms": "WallMs",
+        "server_total_ms": "ServerTotalMs",
+        "load_ms": "LoadMs",
+        "prompt_eval_ms": "PromptEvalMs",
+        "eval_ms": "EvalMs",
+        "client_overhead_ms": "ClientOverheadMs",
+        "prompt_tokens_per_second": "PromptTokensPerSecond",
+        "generation_tokens_per_second": "GenerationTokensPerSecond",
+    }
+    return {
+        "Iterations": result.iterations,
+        "IterationsWithoutTiming": result.iterations_without_timing,
+        "ChatCalls": result.chat_calls,
+        "TotalPromptTokens": result.total_prompt_tokens,
+        "TotalGeneratedTokens": result.total_generated_tokens,
+        "ClientOverheadFraction": result.client_overhead_fraction,
+        "Distributions": {
+            names[name]: {
+                "Mean": stats["mean"],
+                "Min": stats["min"],
+                "P50": stats["p50"],
+                "P95": stats["p95"],
+                "P99": stats["p99"],
+                "Max": stats["max"],
+            }
+            for name, stats in result.distributions.items()
+        },
+    }
@@ -0,0 +1,32 @@
+"""
+Percentile helpers shared by the metrics collectors.
+
+Percentiles interpolate linearly between the two closest ranks, the same way
+PerformanceMetrics computes P90/P95/P99, so every section of a metrics file agrees.
+"""
+
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentile (0-1) of already sorted values; 0.0 when there are none."""
+    if not sorted_values:
+        return 0.0
+    index = fraction * (len(sorted_values) - 1)
+    lower = int(index)
+    if lower + 1 >= len(sorted_values):
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[lower + 1] - sorted_values[lower]) * (index - lower)
+
+
+def describe(values: List[float]) -> Dict[str, float]:
+    """Mean, min, p50/p95/p99 and max of a non-empty list of values."""
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
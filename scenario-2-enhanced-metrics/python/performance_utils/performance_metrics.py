@@ -2,14 +2,19 @@
 Enhanced performance metrics tracker for Python providing accurate memory, CPU, and statistical measurements.
 """
 
+import asyncio
 import gc
 import os
 import time
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 import psutil
 import statistics
 
+from .allocation_profiler import AllocationProfiler, AllocationResult
+from .gc_monitor import GcMonitor, GcResult
+from .loop_lag import LoopLagMonitor, LoopLagResult
+
 
 @dataclass
 class MemorySnapshot:
@@ -19,6 +24,7 @@ class MemorySnapshot:
     vms_mb: float
     shared_mb: float
     available_system_mb: float
+    # Collections per generation since start() (recorded via gc.callbacks)
     gc_gen0_count: int
     gc_gen1_count: int
     gc_gen2_count: int
@@ -54,10 +60,14 @@ class MetricsResult:
     peak_rss_mb: float = 0.0
     peak_vms_mb: float = 0.0
     
-    # GC metrics
+    # GC metrics (real collection counts and pause times, recorded via gc.callbacks)
     gc_gen0_collections: int = 0
     gc_gen1_collections: int = 0
     gc_gen2_collections: int = 0
+    gc_total_pause_ms: float = 0.0
+    gc_pause_p99_ms: float = 0.0
+    gc_max_pause_ms: float = 0.0
+    gc: Optional[GcResult] = None
     
     # CPU metrics
     average_cpu_percent: float = 0.0
@@ -66,23 +76,44 @@ class MetricsResult:
     # Detailed snapshots
     memory_snapshots: List[MemorySnapshot] = field(default_factory=list)
     cpu_snapshots: List[CpuSnapshot] = field(default_factory=list)
+    
+    # Allocation profile (only when allocation profiling is enabled)
+    allocations: Optional[AllocationResult] = None
+    
+    # Event loop scheduling delay (only when started inside a running event loop)
+    loop_lag: Optional[LoopLagResult] = None
 
 
 class PerformanceMetrics:
     """Enhanced performance metrics tracker."""
     
-    def __init__(self):
+    def __init__(self, allocation_profiling: bool = False, allocation_frames: int = 10,
+                 allocation_top_sites: int = 15, loop_lag_interval_ms: Optional[float] = None,
+                 gc_pauses: bool = True):
+        """
+        Args:
+            allocation_profiling: Trace allocations with tracemalloc (adds noticeable overhead).
+            allocation_frames: Stack frames stored per allocation when profiling.
+            allocation_top_sites: Number of top allocation sites reported.
+            loop_lag_interval_ms: Event loop lag probe interval; None or 0 (default) disables the probe.
+            gc_pauses: Record every GC pause; False keeps only collection counts (soak runs).
+        """
         self._process = psutil.Process(os.getpid())
+        self._allocation_profiler = (
+            AllocationProfiler(frames=allocation_frames, top_sites=allocation_top_sites)
+            if allocation_profiling else None
+        )
         self._start_time = None
         self._measurements: List[float] = []
         self._memory_snapshots: List[MemorySnapshot] = []
         self._cpu_snapshots: List[CpuSnapshot] = []
         
+        self._measurement_ends_ms: List[float] = []
+        self._gc_monitor = GcMonitor(record_pauses=gc_pauses)
+        self._loop_lag_monitor = LoopLagMonitor(interval_ms=loop_lag_interval_ms) if loop_lag_interval_ms else None
+        
         self._start_rss = 0
         self._start_vms = 0
-        self._gc_gen0_start = 0
-        self._gc_gen1_start = 0
-        self._gc_gen2_start = 0
     
     def start(self):
         """Start performance measurement session."""
@@ -96,25 +127,42 @@ class PerformanceMetrics:
         self._start_rss = mem_info.rss
         self._start_vms = mem_info.vms
         
-        # Get starting GC counts
-        gc_counts = gc.get_count()
-        self._gc_gen0_start = gc_counts[0]
-        self._gc_gen1_start = gc_counts[1]
-        self._gc_gen2_start = gc_counts[2]
+        if self._allocation_profiler:
+            self._allocation_profiler.start()
         
         self._start_time = time.perf_counter()
+        
+        # Record every collection from here on (after the baseline collections above)
+        self._gc_monitor.install(origin=self._start_time)
+        
+        if self._loop_lag_monitor:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Synchronous callers have no loop to probe
+                self._loop_lag_monitor = None
+            else:
+                self._loop_lag_monitor.start(origin=self._start_time)
     
     def record_measurement(self, value_ms: float):
         """Record a single measurement (e.g., one iteration time in milliseconds)."""
         self._measurements.append(value_ms)
+        self._measurement_ends_ms.append((time.perf_counter() - self._start_time) * 1000)
+        if self._allocation_profiler:
+            self._allocation_profiler.on_iteration()
+    
+    @property
+    def measurements(self) -> List[float]:
+        """Measurements recorded so far (live list, do not modify)."""
+        return self._measurements
     
     def capture_memory_snapshot(self):
         """Capture a memory snapshot at the current point in time."""
         elapsed_ms = (time.perf_counter() - self._start_time) * 1000
         mem_info = self._process.memory_info()
         
-        # Get GC stats
-        gc_counts = gc.get_count()
+        # Get GC collection counts
+        gc_counts = self._gc_monitor.collection_counts()
         
         # Get system memory
         vm = psutil.virtual_memory()
@@ -125,11 +173,14 @@ class PerformanceMetrics:
             vms_mb=mem_info.vms / 1024 / 1024,
             shared_mb=getattr(mem_info, 'shared', 0) / 1024 / 1024,
             available_system_mb=vm.available / 1024 / 1024,
-            gc_gen0_count=gc_counts[0] - self._gc_gen0_start,
-            gc_gen1_count=gc_counts[1] - self._gc_gen1_start,
-            gc_gen2_count=gc_counts[2] - self._gc_gen2_start
+            gc_gen0_count=gc_counts[0],
+            gc_gen1_count=gc_counts[1],
+            gc_gen2_count=gc_counts[2]
         )
         self._memory_snapshots.append(snapshot)
+        
+        if self._allocation_profiler:
+            self._allocation_profiler.snapshot()
     
     def capture_cpu_snapshot(self):
         """Capture a CPU usage snapshot."""
@@ -183,10 +234,14 @@ class PerformanceMetrics:
             result.peak_vms_mb = mem_info.vms / 1024 / 1024
         
         # GC metrics
-        gc_counts = gc.get_count()
-        result.gc_gen0_collections = gc_counts[0] - self._gc_gen0_start
-        result.gc_gen1_collections = gc_counts[1] - self._gc_gen1_start
-        result.gc_gen2_collections = gc_counts[2] - self._gc_gen2_start
+        self._gc_monitor.uninstall()
+        result.gc = self._gc_monitor.get_result(self._measurements, self._measurement_ends_ms)
+        result.gc_gen0_collections = result.gc.collections[0]
+        result.gc_gen1_collections = result.gc.collections[1]
+        result.gc_gen2_collections = result.gc.collections[2]
+        result.gc_total_pause_ms = result.gc.total_pause_ms
+        result.gc_pause_p99_ms = result.gc.pause_p99_ms
+        result.gc_max_pause_ms = result.gc.max_pause_ms
         
         # CPU metrics
         if self._cpu_snapshots:
@@ -197,6 +252,12 @@ class PerformanceMetrics:
         result.memory_snapshots = self._memory_snapshots
         result.cpu_snapshots = self._cpu_snapshots
         
+        if self._allocation_profiler:
+            result.allocations = self._allocation_profiler.stop()
+        
+        if self._loop_lag_monitor:
+            result.loop_lag = self._loop_lag_monitor.get_result()
+        
         return result
     
     @staticmethod
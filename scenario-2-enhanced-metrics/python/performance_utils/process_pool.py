@@ -0,0 +1,223 @@
+"""
+Multi-process mock load generation on one host.
+
+One asyncio loop runs on one core, so a mock client's throughput ceiling is one core's
+worth of Python. run_sharded() splits the iterations over a process pool, each worker
+running its own event loop, and merges the per-worker latency samples; scaling_sweep()
+repeats this for 1..N processes and reports the speedup and efficiency of each step
+relative to the single-process run.
+
+Each simulated request waits `latency_ms` for the "network" and then builds, serializes and
+parses a chat response of `response_words` words, as the agent path does with every
+model reply. That CPU work is what a single event loop saturates, so the sweep shows the
+single-core ceiling: with enough concurrency one process is CPU-bound (per-process CPU
+near 100%) and more processes scale until the cores run out.
+
+Shards timestamp their own start and end with the wall clock, so the aggregate
+throughput excludes process start-up and pickling of the results.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .percentiles import percentile
+
+
+@dataclass
+class ShardResult:
+    """Samples and timing of one worker process."""
+    shard: int
+    pid: int
+    iterations: int
+    samples: List[float]
+    started_at: float
+    finished_at: float
+    cpu_time_s: float
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (self.finished_at - self.started_at) * 1000
+
+
+@dataclass
+class ShardedRun:
+    """Merged result of one run over a process pool."""
+    processes: int
+    shards: List[ShardResult] = field(default_factory=list)
+
+    @property
+    def samples(self) -> List[float]:
+        return [sample for shard in self.shards for sample in shard.samples]
+
+    @property
+    def wall_time_ms(self) -> float:
+        if not self.shards:
+            return 0.0
+        return (max(s.finished_at for s in self.shards) - min(s.started_at for s in self.shards)) * 1000
+
+    @property
+    def requests_per_second(self) -> float:
+        wall_time_ms = self.wall_time_ms
+        return sum(len(s.samples) for s in self.shards) / (wall_time_ms / 1000) if wall_time_ms > 0 else 0.0
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU time of all workers relative to the wall time (100% = one busy core)."""
+        wall_time_ms = self.wall_time_ms
+        return sum(s.cpu_time_s for s in self.shards) / (wall_time_ms / 1000) * 100 if wall_time_ms > 0 else 0.0
+
+
+@dataclass
+class ScalingPoint:
+    """Throughput at one process count of a scaling sweep."""
+    processes: int
+    requests_per_second: float
+    wall_time_ms: float
+    speedup: float
+    efficiency: float
+    cpu_percent: float
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def cpu_percent_per_process(self) -> float:
+        """Mean CPU use of one worker (100% = its core is saturated)."""
+        return self.cpu_percent / self.processes if self.processes else 0.0
+
+
+def simulated_response(prompt: str, words: int) -> str:
+    """Build a chat response of `words` words, serialize it and parse it back like a client reading a reply."""
+    text = " ".join(f"token{n}" for n in range(words))
+    body = json.dumps({
+        "model": "mock",
+        "created_at": time.time(),
+        "message": {"role": "assistant", "content": f"{prompt}: {text}"},
+        "done": True,
+        "prompt_eval_count": len(prompt.split()),
+        "eval_count": words,
+    })
+    return json.loads(body)["message"]["content"]
+
+
+def mock_shard(
+    shard: int, iterations: int, concurrency: int = 1, latency_ms: float = 1.0, response_words: int = 2000
+) -> ShardResult:
+    """Run `iterations` simulated requests on `concurrency` tasks in a fresh event loop."""
+    async def run() -> List[float]:
+        samples: List[float] = []
+        pending = iter(range(iterations))
+
+        async def loop():
+            for i in pending:
+                start = time.perf_counter()
+                await asyncio.sleep(latency_ms / 1000)  # Simulate the network round trip
+                simulated_response(f"Say hello {i + 1}", response_words)
+                samples.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(loop() for _ in range(max(1, concurrency))))
+        return samples
+
+    cpu_start = time.process_time()
+    started_at = time.time()
+    samples = asyncio.run(run())
+    finished_at = time.time()
+    return ShardResult(
+        shard=shard,
+        pid=os.getpid(),
+        iterations=iterations,
+        samples=samples,
+        started_at=started_at,
+        finished_at=finished_at,
+        cpu_time_s=time.process_time() - cpu_start,
+    )
+
+
+def run_sharded(
+    processes: int, iterations: int, concurrency: int = 1, latency_ms: float = 1.0, response_words: int = 2000
+) -> ShardedRun:
+    """Split `iterations` over `processes` worker processes and merge their results."""
+    if processes < 1:
+        raise ValueError("processes must be at least 1")
+    base, extra = divmod(iterations, processes)
+    result = ShardedRun(processes=processes)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(
+                mock_shard, shard, base + (1 if shard < extra else 0), concurrency, latency_ms, response_words
+            )
+            for shard in range(processes)
+        ]
+        result.shards = [future.result() for future in futures]
+    return result
+
+
+def scaling_steps(max_processes: int) -> List[int]:
+    """Process counts of a sweep: powers of two up to max_processes, plus max_processes itself."""
+    steps = []
+    count = 1
+    while count < max_processes:
+        steps.append(count)
+        count *= 2
+    steps.append(max(1, max_processes))
+    return steps
+
+
+def scaling_sweep(
+    max_processes: int, iterations: int, concurrency: int = 1, latency_ms: float = 1.0, response_words: int = 2000
+) -> Tuple[List[ScalingPoint], Optional[ShardedRun]]:
+    """Run the same total workload at each step of scaling_steps(); returns the points and the last run."""
+    points: List[ScalingPoint] = []
+    last: Optional[ShardedRun] = None
+    baseline: Optional[float] = None
+    for processes in scaling_steps(max_processes):
+        last = run_sharded(processes, iterations, concurrency, latency_ms, response_words)
+        throughput = last.requests_per_second
+        if baseline is None:
+            baseline = throughput
+        speedup = throughput / baseline if baseline else 0.0
+        ordered = sorted(last.samples)
+        points.append(ScalingPoint(
+            processes=processes,
+            requests_per_second=throughput,
+            wall_time_ms=last.wall_time_ms,
+            speedup=speedup,
+            efficiency=speedup / processes,
+            cpu_percent=last.cpu_percent,
+            latency_ms={
+                "mean": statistics.mean(ordered),
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+            } if ordered else {},
+        ))
+    return points, last
+
+
+def scaling_to_dict(points: List[ScalingPoint], cpu_count: Optional[int] = None) -> dict:
+    """Throughput and efficiency per process count for Metrics.MultiCore."""
+    return {
+        "CpuCount": cpu_count if cpu_count is not None else os.cpu_count(),
+        "Points": [
+            {
+                "Processes": p.processes,
+                "RequestsPerSecond": p.requests_per_second,
+                "WallTimeMs": p.wall_time_ms,
+                "Speedup": p.speedup,
+                "Efficiency": p.efficiency,
+                "CpuPercent": p.cpu_percent,
+                "CpuPercentPerProcess": p.cpu_percent_per_process,
+                "LatencyMs": {
+                    "Mean": p.latency_ms.get("mean"),
+                    "P50": p.latency_ms.get("p50"),
+                    "P95": p.latency_ms.get("p95"),
+                    "P99": p.latency_ms.get("p99"),
+                } if p.latency_ms else None,
+            }
+            for p in points
+        ],
+    }
@@ -0,0 +1,291 @@
+"""
+Rate-limit aware throughput runs against a quota-limited deployment.
+
+AimdConcurrency adapts the number of requests in flight like TCP congestion control:
+every request that succeeds raises the limit by 1/limit (about +1 per round of
+requests), a throttled (HTTP 429) request halves it. Only the first throttle of a
+round shrinks the limit; requests that were already in flight when the limit was cut
+do not cut it again. A Retry-After from the service pauses every worker, since the
+quota is shared by the whole deployment.
+
+The limit settles just below the quota, so the achieved tokens/min of a long enough
+run is the sustainable throughput of the deployment, and the throttle events and
+the time spent waiting them out show what pushing harder would cost.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .resilience import classify_error, retry_after_s
+
+
+@dataclass
+class ThroughputWindow:
+    """Activity during one timeline window."""
+    start_s: float
+    requests: int = 0
+    tokens: int = 0
+    throttles: int = 0
+    concurrency: float = 0.0  # Limit at the end of the window
+
+
+@dataclass
+class ThroughputResult:
+    """Outcome of a rate-limited throughput run."""
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    throttle_events: int = 0
+    throttled_requests: int = 0
+    retry_after_honored: int = 0
+    throttle_wait_ms: float = 0.0  # Summed over requests: time between a 429 and the resend
+    paused_ms: float = 0.0  # Wall time all workers were held back by Retry-After
+    elapsed_ms: float = 0.0
+    total_tokens: int = 0
+    tokens_per_minute: float = 0.0
+    requests_per_minute: float = 0.0
+    initial_concurrency: float = 0.0
+    final_concurrency: float = 0.0
+    max_concurrency: float = 0.0
+    mean_in_flight: float = 0.0
+    concurrency_decreases: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    timeline: List[ThroughputWindow] = field(default_factory=list)
+
+
+class AimdConcurrency:
+    """Concurrency limit with additive increase and multiplicative decrease."""
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 64,
+                 increase: float = 1.0, decrease: float = 0.5):
+        """
+        Args:
+            initial: Starting number of requests in flight.
+            minimum, maximum: Bounds of the limit.
+            increase: Limit added per round of successful requests.
+            decrease: Factor applied to the limit on a throttle.
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.max_limit = self.limit
+        self.in_flight = 0
+        self.decreases = 0
+        self.paused_ms = 0.0
+        self._pause_until = 0.0
+        self._last_decrease = float("-inf")
+        self._changed: Optional[asyncio.Condition] = None
+        self._in_flight_area = 0.0
+        self._last_change: Optional[float] = None
+
+    def _track_in_flight(self):
+        # Integral of in_flight over time, for the time-weighted mean
+        now = time.perf_counter()
+        if self._last_change is not None:
+            self._in_flight_area += self.in_flight * (now - self._last_change)
+        self._last_change = now
+
+    def mean_in_flight(self, since: float) -> float:
+        """Time-weighted mean of requests in flight since `since` (perf_counter)."""
+        self._track_in_flight()
+        elapsed = time.perf_counter() - since
+        return self._in_flight_area / elapsed if elapsed > 0 else 0.0
+
+    def _condition(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    async def acquire(self) -> float:
+        """Wait for a free slot (and the end of any pause); returns the start time for on_throttle."""
+        changed = self._condition()
+        async with changed:
+            while True:
+                delay = self._pause_until - time.perf_counter()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < int(self.limit):
+                    self._track_in_flight()
+                    self.in_flight += 1
+                    return time.perf_counter()
+                await changed.wait()
+
+    async def release(self):
+        changed = self._condition()
+        async with changed:
+            self._track_in_flight()
+            self.in_flight -= 1
+            changed.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        self.max_limit = max(self.max_limit, self.limit)
+
+    def on_throttle(self, started_at: float, retry_after: Optional[float] = None):
+        """Shrink the limit unless the request predates the last decrease; pause for retry_after seconds."""
+        now = time.perf_counter()
+        if started_at >= self._last_decrease:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self._last_decrease = now
+            self.decreases += 1
+        if retry_after:
+            pause_until = now + retry_after
+            if pause_until > self._pause_until:
+                self.paused_ms += (pause_until - max(now, self._pause_until)) * 1000
+                self._pause_until = pause_until
+
+
+class RateLimitedRunner:
+    """Runs a fixed number of requests under an AIMD concurrency limit, waiting out throttles."""
+
+    def __init__(self, controller: Optional[AimdConcurrency] = None, max_throttle_retries: int = 10,
+                 fallback_wait_s: float = 1.0, window_s: float = 10.0):
+        """
+        Args:
+            controller: Concurrency limit (default: AimdConcurrency()).
+            max_throttle_retries: Throttles a request may hit before it counts as failed.
+            fallback_wait_s: Wait after a 429 without Retry-After, doubled per throttle of the request.
+            window_s: Width of the timeline windows.
+        """
+        self.controller = controller or AimdConcurrency()
+        self.max_throttle_retries = max_throttle_retries
+        self.fallback_wait_s = fallback_wait_s
+        self.window_s = window_s
+        self._result = ThroughputResult(initial_concurrency=self.controller.limit)
+        self._origin = 0.0
+
+    def _window(self) -> ThroughputWindow:
+        index = int((time.perf_counter() - self._origin) / self.window_s)
+        timeline = self._result.timeline
+        while len(timeline) <= index:
+            timeline.append(ThroughputWindow(start_s=len(timeline) * self.window_s))
+        return timeline[index]
+
+    async def _run_one(self, index: int, request: Callable[[int], Awaitable[int]]):
+        result = self._result
+        throttles = 0
+        while True:
+            started_at = await self.controller.acquire()
+            wait_s = None
+            try:
+                tokens = await request(index)
+            except Exception as ex:
+                error_class = classify_error(ex)
+                if error_class == "rate_limited":
+                    throttles += 1
+                    result.throttle_events += 1
+                    result.throttled_requests += throttles == 1
+                    retry_after = retry_after_s(ex)
+                    if retry_after is not None:
+                        result.retry_after_honored += 1
+                    self.controller.on_throttle(started_at, retry_after)
+                    window = self._window()
+                    window.throttles += 1
+                    window.concurrency = self.controller.limit
+                    if throttles <= self.max_throttle_retries:
+                        wait_s = retry_after if retry_after is not None else self.fallback_wait_s * 2 ** (throttles - 1)
+                if wait_s is None:
+                    result.failed += 1
+                    result.errors[error_class] = result.errors.get(error_class, 0) + 1
+            else:
+                # Raise the limit before releasing the slot so waiters see it
+                self.controller.on_success()
+                result.succeeded += 1
+                result.total_tokens += tokens
+                window = self._window()
+                window.requests += 1
+                window.tokens += tokens
+                window.concurrency = self.controller.limit
+            finally:
+                await self.controller.release()
+            if wait_s is None:
+                return
+            # The slot is free while this request waits out the throttle
+            result.throttle_wait_ms += wait_s * 1000
+            await asyncio.sleep(wait_s)
+
+    async def run(self, count: int, request: Callable[[int], Awaitable[int]],
+                  on_progress: Optional[Callable[[int], None]] = None) -> ThroughputResult:
+        """Send `count` requests; request(index) returns the tokens the call used."""
+        self._origin = time.perf_counter()
+        completed = 0
+
+        async def run_one(index: int):
+            nonlocal completed
+            await self._run_one(index, request)
+            completed += 1
+            if on_progress:
+                on_progress(completed)
+
+        # Each task waits for a slot, so only `limit` requests are ever in flight
+        await asyncio.gather(*(run_one(index) for index in range(count)))
+        return self.get_result()
+
+    def get_result(self) -> ThroughputResult:
+        result = self._result
+        result.requests = result.succeeded + result.failed
+        result.elapsed_ms = (time.perf_counter() - self._origin) * 1000
+        result.paused_ms = self.controller.paused_ms
+        result.final_concurrency = self.controller.limit
+        result.max_concurrency = self.controller.max_limit
+        result.concurrency_decreases = self.controller.decreases
+        minutes = result.elapsed_ms / 60000
+        if minutes > 0:
+            result.tokens_per_minute = result.total_tokens / minutes
+            result.requests_per_minute = result.succeeded / minutes
+            result.mean_in_flight = self.controller.mean_in_flight(self._origin)
+        return result
+
+
+def aimd_from_env(env: dict, default_initial: float = 4) -> AimdConcurrency:
+    """AIMD limit from CONCURRENT_REQUESTS (initial), THROUGHPUT_MIN_CONCURRENCY and THROUGHPUT_MAX_CONCURRENCY."""
+    return AimdConcurrency(
+        initial=float(env.get("CONCURRENT_REQUESTS", default_initial)),
+        minimum=float(env.get("THROUGHPUT_MIN_CONCURRENCY", "1")),
+        maximum=float(env.get("THROUGHPUT_MAX_CONCURRENCY", "64")),
+    )
+
+
+def throughput_to_dict(result: ThroughputResult) -> dict:
+    """Achieved rate, throttling and Retry-After waits for Metrics.Throughput."""
+    return {
+        "Requests": result.requests,
+        "Succeeded": result.succeeded,
+        "Failed": result.failed,
+        "ElapsedMs": result.elapsed_ms,
+        "TotalTokens": result.total_tokens,
+        "TokensPerMinute": result.tokens_per_minute,
+        "RequestsPerMinute": result.requests_per_minute,
+        "ThrottleEvents": result.throttle_events,
+        "ThrottledRequests": result.throttled_requests,
+        "RetryAfterHonored": result.retry_after_honored,
+        "ThrottleWaitMs": result.throttle_wait_ms,
+        "PausedMs": result.paused_ms,
+        "Concurrency": {
+            "Initial": result.initial_concurrency,
+            "Final": result.final_concurrency,
+            "Max": result.max_concurrency,
+            "MeanInFlight": result.mean_in_flight,
+            "Decreases": result.concurrency_decreases,
+        },
+        "Errors": result.errors,
+        "Timeline": [
+            {
+                "StartS": w.start_s,
+                "Requests": w.requests,
+                "Tokens": w.tokens,
+                "Throttles": w.throttles,
+                "Concurrency": w.concurrency,
+            }
+            for w in result.timeline
+        ],
+    }
@@ -0,0 +1,357 @@
+"""
+Per-request timeout, retry with backoff and jitter, and a circuit breaker.
+
+ResilientCaller.call(fn) runs one logical request as up to 1 + max_retries attempts and
+records what that cost: latency of requests that succeeded on the first attempt versus
+those that needed retries, time spent backing off, timeouts, and failures per error
+class. Retries back off exponentially with full jitter (a random delay between 0 and
+the exponential cap), and never sooner than a server's Retry-After header.
+
+The circuit breaker opens after `breaker_failures` consecutive failed attempts and
+rejects calls without contacting the model for `breaker_reset_s`; then one trial call
+is let through (half-open) and closes the circuit again if it succeeds.
+
+With the default policy (no timeout, no retries, no breaker) a call is a single attempt
+that is only classified and measured.
+"""
+
+import asyncio
+import email.utils
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from .percentiles import percentile
+
+
+@dataclass
+class ResiliencePolicy:
+    """Timeout, retry and circuit breaker settings."""
+    timeout_s: Optional[float] = None
+    max_retries: int = 0
+    backoff_base_ms: float = 200.0
+    backoff_max_ms: float = 10000.0
+    jitter: bool = True
+    breaker_failures: int = 0  # Consecutive failed attempts that open the circuit; 0 disables it
+    breaker_reset_s: float = 30.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.timeout_s or self.max_retries or self.breaker_failures)
+
+    def describe(self) -> str:
+        parts = []
+        if self.timeout_s:
+            parts.append(f"timeout {self.timeout_s:g} s")
+        if self.max_retries:
+            parts.append(f"{self.max_retries} retries (backoff {self.backoff_base_ms:g}-{self.backoff_max_ms:g} ms"
+                         f"{', jittered' if self.jitter else ''})")
+        if self.breaker_failures:
+            parts.append(f"circuit breaker after {self.breaker_failures} failures, reset {self.breaker_reset_s:g} s")
+        return ", ".join(parts) or "single attempt"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the model while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)."""
+
+    def __init__(self, failure_threshold: int, reset_s: float):
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.state = "closed"
+        self.opens = 0
+        self.rejections = 0
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.perf_counter() - self._opened_at >= self.reset_s:
+            self.state = "half_open"
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejections += 1
+        return False
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+        self.state = "closed"
+
+    def release(self):
+        """Give up a half-open trial that ended without an outcome (cancelled), so another may run."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self._consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self._opened_at = time.perf_counter()
+
+
+def _exception_chain(ex: BaseException) -> Iterator[BaseException]:
+    # Agent frameworks wrap client errors, so look at the causes as well
+    seen = set()
+    while ex is not None and id(ex) not in seen:
+        seen.add(id(ex))
+        yield ex
+        ex = ex.__cause__ or ex.__context__
+
+
+def _status_code(ex: BaseException) -> Optional[int]:
+    for error in _exception_chain(ex):
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def classify_error(ex: BaseException) -> str:
+    """Error class of a failed attempt: timeout, connection, rate_limited, server_error, client_error or the type name."""
+    for error in _exception_chain(ex):
+        if isinstance(error, CircuitOpenError):
+            return "circuit_open"
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)) or type(error).__name__.endswith("Timeout"):
+            return "timeout"
+        if isinstance(error, ConnectionError) or type(error).__name__ in ("ConnectError", "RemoteProtocolError"):
+            return "connection"
+    status = _status_code(ex)
+    if status == 429:
+        return "rate_limited"
+    if status is not None and status >= 500:
+        return "server_error"
+    if status is not None and status >= 400:
+        return "client_error"
+    return type(ex).__name__
+
+
+RETRYABLE_ERRORS = ("timeout", "connection", "rate_limited", "server_error")
+
+
+def _header_seconds(value: str, per_second: float) -> Optional[float]:
+    # inf or nan would turn into an endless or invalid sleep, so only finite delays count
+    try:
+        seconds = float(value) / per_second
+    except ValueError:
+        return None
+    return max(0.0, seconds) if math.isfinite(seconds) else None
+
+
+def retry_after_s(ex: BaseException) -> Optional[float]:
+    """Delay requested by the server (retry-after-ms / retry-after headers), if any."""
+    for error in _exception_chain(ex):
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        value = headers.get("retry-after-ms")
+        if value:
+            seconds = _header_seconds(value, 1000)
+            if seconds is not None:
+                return seconds
+        value = headers.get("retry-after")
+        if value:
+            seconds = _header_seconds(value, 1)
+            if seconds is not None:
+                return seconds
+            try:
+                moment = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                # Neither seconds nor an HTTP date: ignore the header rather than fail the request
+                return None
+            if moment is not None:
+                if moment.tzinfo is None:
+                    moment = moment.replace(tzinfo=timezone.utc)
+                return max(0.0, moment.timestamp() - time.time())
+    return None
+
+
+@dataclass
+class ResilienceResult:
+    """Attempt-level outcome of a measurement session."""
+    policy: ResiliencePolicy
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    attempts: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    circuit_opens: int = 0
+    circuit_rejections: int = 0
+    backoff_total_ms: float = 0.0
+    first_attempt_latency_ms: Dict[str, float] = field(default_factory=dict)
+    retried_latency_ms: Dict[str, float] = field(default_factory=dict)
+    attempt_errors: Dict[str, int] = field(default_factory=dict)  # Every failed attempt
+    request_errors: Dict[str, int] = field(default_factory=dict)  # Requests that failed for good
+
+    @property
+    def retried_requests(self) -> int:
+        return self.retried_latency_ms.get("count", 0)
+
+
+class ResilientCaller:
+    """Runs requests under a ResiliencePolicy and records per-attempt metrics."""
+
+    def __init__(
+        self,
+        policy: Optional[ResiliencePolicy] = None,
+        retryable: Callable[[str], bool] = lambda error_class: error_class in RETRYABLE_ERRORS,
+        seed: Optional[int] = None,
+    ):
+        self.policy = policy or ResiliencePolicy()
+        self.breaker = (
+            CircuitBreaker(self.policy.breaker_failures, self.policy.breaker_reset_s)
+            if self.policy.breaker_failures else None
+        )
+        self._retryable = retryable
+        self._rng = random.Random(seed)
+        self._result = ResilienceResult(policy=self.policy)
+        self._first_attempt_ms: List[float] = []
+        self._retried_ms: List[float] = []
+
+    def backoff_s(self, retry: int, ex: Optional[BaseException] = None) -> float:
+        """Delay before retry number `retry` (1-based)."""
+        cap_ms = min(self.policy.backoff_max_ms, self.policy.backoff_base_ms * 2 ** (retry - 1))
+        delay_s = (self._rng.uniform(0, cap_ms) if self.policy.jitter else cap_ms) / 1000
+        server_delay_s = retry_after_s(ex) if ex is not None else None
+        return max(delay_s, server_delay_s or 0.0)
+
+    def _count_error(self, bucket: Dict[str, int], error_class: str):
+        bucket[error_class] = bucket.get(error_class, 0) + 1
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() with timeout, retries and the circuit breaker; re-raises the final error."""
+        result = self._result
+        result.requests += 1
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if self.breaker and not self.breaker.allow():
+                result.circuit_rejections += 1
+                result.failed += 1
+                self._count_error(result.request_errors, "circuit_open")
+                raise CircuitOpenError("circuit open, request not sent")
+            attempt += 1
+            result.attempts += 1
+            try:
+                if self.policy.timeout_s:
+                    response = await asyncio.wait_for(fn(), self.policy.timeout_s)
+                else:
+                    response = await fn()
+            except Exception as ex:
+                error_class = classify_error(ex)
+                self._count_error(result.attempt_errors, error_class)
+                if error_class == "timeout":
+                    result.timeouts += 1
+                if self.breaker:
+                    self.breaker.record_failure()
+                if attempt > self.policy.max_retries or not self._retryable(error_class):
+                    result.failed += 1
+                    self._count_error(result.request_errors, error_class)
+                    raise
+                delay_s = self.backoff_s(attempt, ex)
+                result.retries += 1
+                result.backoff_total_ms += delay_s * 1000
+                await asyncio.sleep(delay_s)
+                continue
+            except BaseException:
+                # Cancelled mid-attempt: neither a success nor a failure, but a half-open trial must not stay taken
+                if self.breaker:
+                    self.breaker.release()
+                raise
+            if self.breaker:
+                self.breaker.record_success()
+            result.succeeded += 1
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            (self._first_attempt_ms if attempt == 1 else self._retried_ms).append(elapsed_ms)
+            return response
+
+    def get_result(self) -> ResilienceResult:
+        result = ResilienceResult(**{**vars(self._result), "attempt_errors": dict(self._result.attempt_errors),
+                                     "request_errors": dict(self._result.request_errors)})
+        if self.breaker:
+            result.circuit_opens = self.breaker.opens
+        result.first_attempt_latency_ms = _summary(self._first_attempt_ms)
+        result.retried_latency_ms = _summary(self._retried_ms)
+        return result
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
+
+
+def resilience_policy_from_env(env: dict) -> ResiliencePolicy:
+    """Build a policy from REQUEST_TIMEOUT_S, MAX_RETRIES, RETRY_BACKOFF_MS, RETRY_BACKOFF_MAX_MS,
+    RETRY_JITTER, BREAKER_FAILURES and BREAKER_RESET_S."""
+    return ResiliencePolicy(
+        timeout_s=float(env["REQUEST_TIMEOUT_S"]) if env.get("REQUEST_TIMEOUT_S") else None,
+        max_retries=int(env.get("MAX_RETRIES", "0")),
+        backoff_base_ms=float(env.get("RETRY_BACKOFF_MS", "200")),
+        backoff_max_ms=float(env.get("RETRY_BACKOFF_MAX_MS", "10000")),
+        jitter=(env.get("RETRY_JITTER") or "1").lower() in ("1", "true", "yes"),
+        breaker_failures=int(env.get("BREAKER_FAILURES", "0")),
+        breaker_reset_s=float(env.get("BREAKER_RESET_S", "30")),
+    )
+
+
+def resilience_to_dict(result: ResilienceResult) -> dict:
+    """Attempts, retries, timeouts and circuit breaker trips for Metrics.Resilience."""
+    def latency(summary: Dict[str, float]) -> Optional[dict]:
+        if not summary:
+            return None
+        return {
+            "Count": summary["count"],
+            "Mean": summary["mean"],
+            "P50": summary["p50"],
+            "P95": summary["p95"],
+            "P99": summary["p99"],
+            "Max": summary["max"],
+        }
+
+    policy = result.policy
+    return {
+        "Policy": {
+            "TimeoutS": policy.timeout_s,
+            "MaxRetries": policy.max_retries,
+            "BackoffBaseMs": policy.backoff_base_ms,
+            "BackoffMaxMs": policy.backoff_max_ms,
+            "Jitter": policy.jitter,
+            "BreakerFailures": policy.breaker_failures,
+            "BreakerResetS": policy.breaker_reset_s,
+        },
+        "Requests": result.requests,
+        "Succeeded": result.succeeded,
+        "Failed": result.failed,
+        "Attempts": result.attempts,
+        "Retries": result.retries,
+        "RetriedRequests": result.retried_requests,
+        "Timeouts": result.timeouts,
+        "CircuitOpens": result.circuit_opens,
+        "CircuitRejections": result.circuit_rejections,
+        "BackoffTotalMs": result.backoff_total_ms,
+        "FirstAttemptLatencyMs": latency(result.first_attempt_latency_ms),
+        "RetriedLatencyMs": latency(result.retried_latency_ms),
+        "AttemptErrors": result.attempt_errors,
+        "RequestErrors": result.request_errors,
+    }
@@ -0,0 +1,294 @@
+"""
+Exact-match response cache between a runner and the model.
+
+Keys are a SHA-256 of the normalized prompt (whitespace collapsed, case folded), the
+agent instructions and the model name. Entries expire after a TTL and the least recently
+used entry is evicted when the cache is full. MemoryCacheBackend keeps entries in an
+OrderedDict; DiskCacheBackend stores them in SQLite so they can survive between runs.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .percentiles import percentile
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case-fold, so trivially different prompts share an entry."""
+    return _WHITESPACE.sub(" ", prompt).strip().casefold()
+
+
+def cache_key(prompt: str, instructions: str = "", model: str = "") -> str:
+    """Exact-match key of a request: normalized prompt, instructions and model."""
+    payload = json.dumps([normalize_prompt(prompt), instructions, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str):
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        pass
+
+
+class DiskCacheBackend:
+    """SQLite-backed LRU cache with TTL."""
+
+    name = "disk"
+
+    def __init__(
+        self, path: str, max_entries: int = 10000, ttl_seconds: Optional[float] = None, clear: bool = False
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        if clear:
+            self._db.execute("DELETE FROM responses")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, stored_at = row
+        now = time.time()
+        if self.ttl_seconds is not None and now - stored_at > self.ttl_seconds:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self.expirations += 1
+            return None
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return value
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, stored_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+@dataclass
+class CacheResult:
+    """Cache effectiveness and overhead of a measurement session."""
+    backend: str
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    estimated_saved_ms: float = 0.0
+    latency_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+
+class ResponseCache:
+    """Serves repeated prompts from a cache backend and records hit/miss latencies."""
+
+    def __init__(self, backend, instructions: str = "", model: str = ""):
+        self.backend = backend
+        self._instructions = instructions
+        self._model = model
+        self._hits = 0
+        self._misses = 0
+        self._lookup_ms: Dict[bool, List[float]] = {True: [], False: []}
+        self._request_ms: Dict[bool, List[float]] = {True: [], False: []}
+        self._store_ms: List[float] = []
+
+    async def get_or_compute(self, prompt: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (response, hit). On a hit the response is the cached text; on a miss
+        compute() is awaited and its text (response.text or str) is stored.
+        """
+        start = time.perf_counter()
+        key = cache_key(prompt, self._instructions, self._model)
+        cached = self.backend.get(key)
+        lookup_ms = (time.perf_counter() - start) * 1000
+        hit = cached is not None
+        self._lookup_ms[hit].append(lookup_ms)
+
+        if hit:
+            self._hits += 1
+            response = cached
+        else:
+            self._misses += 1
+            response = await compute()
+            store_start = time.perf_counter()
+            self.backend.put(key, getattr(response, "text", None) or str(response))
+            self._store_ms.append((time.perf_counter() - store_start) * 1000)
+
+        self._request_ms[hit].append((time.perf_counter() - start) * 1000)
+        return response, hit
+
+    def get_result(self) -> CacheResult:
+        result = CacheResult(
+            backend=self.backend.name,
+            requests=self._hits + self._misses,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self.backend.evictions,
+            expirations=self.backend.expirations,
+            entries=len(self.backend),
+        )
+        series = {
+            "hit_lookup": self._lookup_ms[True],
+            "miss_lookup": self._lookup_ms[False],
+            "store": self._store_ms,
+            "hit_request": self._request_ms[True],
+            "miss_request": self._request_ms[False],
+        }
+        for name, values in series.items():
+            if values:
+                ordered = sorted(values)
+                result.latency_ms[name] = {
+                    "mean": sum(ordered) / len(ordered),
+                    "p50": percentile(ordered, 0.50),
+                    "p99": percentile(ordered, 0.99),
+                }
+        # Model time avoided by hits, minus the lookup and store overhead every miss pays
+        if "hit_request" in result.latency_ms and "miss_request" in result.latency_ms:
+            stats = result.latency_ms
+            miss_overhead = stats["miss_lookup"]["mean"] + stats["store"]["mean"]
+            model_ms = stats["miss_request"]["mean"] - miss_overhead
+            result.estimated_saved_ms = (
+                result.hits * (model_ms - stats["hit_request"]["mean"]) - result.misses * miss_overhead
+            )
+        return result
+
+
+def repeating_prompts(
+    base: Callable[[int], str], count: int, repeat_ratio: float, seed: Optional[int] = None
+) -> List[str]:
+    """
+    Workload of `count` prompts where a fraction `repeat_ratio` repeats an earlier prompt
+    (chosen uniformly) and the rest are new prompts base(0), base(1), ...
+    """
+    if not 0.0 <= repeat_ratio <= 1.0:
+        raise ValueError("repeat_ratio must be between 0 and 1")
+    rng = random.Random(seed)
+    prompts: List[str] = []
+    distinct = 0
+    for _ in range(count):
+        if prompts and rng.random() < repeat_ratio:
+            prompts.append(rng.choice(prompts))
+        else:
+            prompts.append(base(distinct))
+            distinct += 1
+    return prompts
+
+
+def response_cache_from_env(env: dict, instructions: str = "", model: str = "") -> Optional[ResponseCache]:
+    """
+    Build a ResponseCache from RESPONSE_CACHE, CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS and CACHE_PATH.
+
+    The disk backend keeps entries between runs only in an explicit CACHE_PATH; the default
+    .response_cache.sqlite is emptied at startup, so hits from earlier runs do not inflate the hit ratio.
+    """
+    if (env.get("RESPONSE_CACHE") or "").lower() not in ("1", "true", "yes"):
+        return None
+    max_entries = int(env.get("CACHE_MAX_ENTRIES", "1000"))
+    ttl = float(env["CACHE_TTL_SECONDS"]) if env.get("CACHE_TTL_SECONDS") else None
+    backend_name = env.get("CACHE_BACKEND", "memory").lower()
+    if backend_name == "disk":
+        path = env.get("CACHE_PATH")
+        backend = DiskCacheBackend(path or ".response_cache.sqlite", max_entries, ttl, clear=not path)
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries, ttl)
+    else:
+        raise ValueError(f"Unknown cache backend '{backend_name}', expected 'memory' or 'disk'")
+    return ResponseCache(backend, instructions, model)
+
+
+def cache_to_dict(result: CacheResult) -> dict:
+    """Hit/miss counts, evictions and lookup latencies for Metrics.Cache."""
+    names = {
+        "hit_lookup": "HitLookup",
+        "miss_lookup": "MissLookup",
+        "store": "Store",
+        "hit_request": "HitRequest",
+        "miss_request": "MissRequest",
+    }
+    return {
+        "Backend": result.backend,
+        "Requests": result.requests,
+        "Hits": result.hits,
+        "Misses": result.misses,
+        "HitRatio": result.hit_ratio,
+        "Evictions": result.evictions,
+        "Expirations": result.expirations,
+        "Entries": result.entries,
+        "EstimatedSavedMs": result.estimated_saved_ms,
+        "LatencyMs": {
+            names[name]: {"Mean": stats["mean"], "P50": stats["p50"], "P99": stats["p99"]}
+            for name, stats in result.latency_ms.items()
+        },
+    }
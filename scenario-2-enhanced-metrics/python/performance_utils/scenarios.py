@@ -0,0 +1,114 @@
+"""
+Benchmark scenarios against real agents.
+
+Each scenario prompt is run through the streaming API so time to first token can be
+measured alongside total latency and token counts. Scenarios are interleaved in
+randomized rounds (every round runs each scenario once, in shuffled order) so slow
+drift - thermal throttling, model cache state, server load - affects all scenarios
+equally instead of biasing whichever ran last.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from .percentiles import describe
+from .token_accounting import TokenAccounting, tokens_to_dict
+
+
+BENCHMARK_SCENARIOS: Dict[str, str] = {
+    "simple": "Say hello",
+    "medium": "Explain what an AI agent is in one sentence",
+    "long_output": "Write a detailed paragraph about the benefits of cloud computing",
+    "reasoning": "If you have 3 apples and buy 2 more, then give away 1, how many do you have? Explain your reasoning",
+    "conceptual": "What is the difference between machine learning and deep learning?",
+}
+
+
+@dataclass
+class ScenarioRun:
+    """Result of one streamed scenario request."""
+    latency_ms: float
+    ttft_ms: Optional[float]
+    response: Any
+
+
+@dataclass
+class ScenarioStats:
+    """Measurements collected for one scenario."""
+    prompt: str
+    latencies_ms: List[float] = field(default_factory=list)
+    ttfts_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    tokens: TokenAccounting = field(default_factory=TokenAccounting)
+
+
+def interleaved_schedule(names: Sequence[str], rounds: int, seed: Optional[int] = None) -> List[str]:
+    """Scenario order for `rounds` randomized rounds of every scenario."""
+    rng = random.Random(seed)
+    schedule: List[str] = []
+    for _ in range(rounds):
+        round_order = list(names)
+        rng.shuffle(round_order)
+        schedule.extend(round_order)
+    return schedule
+
+
+async def run_streamed(agent, prompt: str) -> ScenarioRun:
+    """Stream one agent response, timing the first text chunk and the full response."""
+    updates = []
+    ttft_ms = None
+    start = time.perf_counter()
+    async for update in agent.run_stream(prompt):
+        if ttft_ms is None and getattr(update, "text", None):
+            ttft_ms = (time.perf_counter() - start) * 1000
+        updates.append(update)
+    latency_ms = (time.perf_counter() - start) * 1000
+    return ScenarioRun(latency_ms=latency_ms, ttft_ms=ttft_ms, response=_combine_updates(updates))
+
+
+def _combine_updates(updates: list) -> Any:
+    """Merge streamed updates into one response so usage data and text can be read."""
+    try:
+        from agent_framework import AgentRunResponse
+        return AgentRunResponse.from_agent_run_response_updates(updates)
+    except Exception:
+        return "".join(getattr(update, "text", None) or "" for update in updates)
+
+
+def _describe(values: List[float]) -> Dict[str, float]:
+    stats = describe(values)
+    return {
+        "Count": len(values),
+        "MeanMs": stats["mean"],
+        "MinMs": stats["min"],
+        "MedianMs": stats["p50"],
+        "P95Ms": stats["p95"],
+        "P99Ms": stats["p99"],
+        "MaxMs": stats["max"],
+    }
+
+
+def scenario_results_to_dict(results: Dict[str, ScenarioStats]) -> dict:
+    """Per-scenario statistics in the ScenarioResults layout used in metrics JSON files."""
+    data = {}
+    for name, stats in results.items():
+        if not stats.latencies_ms:
+            data[name] = {"Prompt": stats.prompt, "Errors": stats.errors}
+            continue
+        latency = _describe(stats.latencies_ms)
+        entry = {
+            "Prompt": stats.prompt,
+            # Same keys as the HelloWorld runner's ScenarioResults
+            "AverageMs": latency["MeanMs"],
+            "MinMs": latency["MinMs"],
+            "MaxMs": latency["MaxMs"],
+            "MedianMs": latency["MedianMs"],
+            "Latency": latency,
+            "TimeToFirstToken": _describe(stats.ttfts_ms) if stats.ttfts_ms else None,
+            "Errors": stats.errors,
+            "Tokens": tokens_to_dict(stats.tokens.get_result()),
+        }
+        data[name] = entry
+    return data
@@ -0,0 +1,118 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+While a request for a key is running, further requests for the same key do not call
+the model again: they wait for the running call and receive its result (or its
+exception). Only in-flight requests are shared, nothing is kept once the call
+completes, so this complements rather than replaces a response cache.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class SingleFlightResult:
+    """Coalescing counters of a measurement session."""
+    requests: int = 0
+    executions: int = 0
+    coalesced: int = 0
+    failed_executions: int = 0
+    coalesced_failures: int = 0
+    max_waiters: int = 0
+
+    @property
+    def coalesced_ratio(self) -> float:
+        return self.coalesced / self.requests if self.requests else 0.0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and fans its outcome out to every caller."""
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self._result = SingleFlightResult()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True when another caller's call was reused."""
+        self._result.requests += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._result.coalesced += 1
+            self._waiters[key] += 1
+            self._result.max_waiters = max(self._result.max_waiters, self._waiters[key])
+            try:
+                # shield: a cancelled follower must not cancel the call other callers wait on
+                return await asyncio.shield(future), True
+            except Exception:
+                self._result.coalesced_failures += 1
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._waiters[key] = 0
+        self._result.executions += 1
+        try:
+            result = await fn()
+        except BaseException as ex:
+            self._result.failed_executions += 1
+            if isinstance(ex, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(ex)
+                # Mark the exception retrieved so a failure without followers is not logged as unhandled
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+            del self._waiters[key]
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys with a call currently running."""
+        return len(self._in_flight)
+
+    def get_result(self) -> SingleFlightResult:
+        return SingleFlightResult(**vars(self._result))
+
+
+def duplicate_bursts(
+    base: Callable[[int], str], count: int, burst_size: int, duplicate_ratio: float, seed: Optional[int] = None
+) -> List[str]:
+    """
+    `count` prompts sent in bursts of `burst_size` concurrent requests, where a fraction
+    `duplicate_ratio` of each burst (after its first request) repeats a prompt already in
+    the same burst and the rest are new prompts base(0), base(1), ...
+    """
+    if not 0.0 <= duplicate_ratio <= 1.0:
+        raise ValueError("duplicate_ratio must be between 0 and 1")
+    rng = random.Random(seed)
+    prompts: List[str] = []
+    distinct = 0
+    for index in range(count):
+        burst = prompts[index - index % burst_size:]
+        if burst and rng.random() < duplicate_ratio:
+            prompts.append(rng.choice(burst))
+        else:
+            prompts.append(base(distinct))
+            distinct += 1
+    return prompts
+
+
+def single_flight_to_dict(result: SingleFlightResult) -> dict:
+    """Model calls and coalesced requests for Metrics.SingleFlight."""
+    return {
+        "Requests": result.requests,
+        "ModelCalls": result.executions,
+        "CoalescedRequests": result.coalesced,
+        "CoalescedRatio": result.coalesced_ratio,
+        "FailedModelCalls": result.failed_executions,
+        "CoalescedFailures": result.coalesced_failures,
+        "MaxWaitersPerCall": result.max_waiters,
+    }
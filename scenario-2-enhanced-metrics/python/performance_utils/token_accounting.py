@@ -0,0 +1,206 @@
+"""
+Token accounting for agent responses.
+
+Per-iteration prompt/completion token counts come from the response usage data
+(AgentRunResponse.usage_details) when the provider reports it. Otherwise they are
+estimated from the prompt and response text with tiktoken, if installed, or a
+character-based heuristic. Estimated counts only cover the user prompt and the final
+response text (no instructions, tool schemas or tool round trips).
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .percentiles import describe
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass
+class TokenCount:
+    """Prompt and completion tokens of one response."""
+    prompt_tokens: int
+    completion_tokens: int
+    source: str  # "usage" or "estimated"
+
+
+@dataclass
+class TokenIterationSample:
+    """Token counts and wall time of one iteration."""
+    wall_ms: float
+    prompt_tokens: int
+    completion_tokens: int
+    source: str
+
+    @property
+    def completion_tokens_per_second(self) -> Optional[float]:
+        return self.completion_tokens / (self.wall_ms / 1000) if self.wall_ms > 0 else None
+
+    @property
+    def total_tokens_per_second(self) -> Optional[float]:
+        return (self.prompt_tokens + self.completion_tokens) / (self.wall_ms / 1000) if self.wall_ms > 0 else None
+
+
+@dataclass
+class TokenResult:
+    """Token accounting summary of a measurement session."""
+    iterations: int = 0
+    estimated_iterations: int = 0
+    tokenizer: str = ""
+    total_prompt_tokens: int = 0
+    total_completion_tokens: int = 0
+    elapsed_ms: float = 0.0
+    completion_throughput_tokens_per_second: float = 0.0
+    total_throughput_tokens_per_second: float = 0.0
+    distributions: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+class TokenEstimator:
+    """Local token counter used when a response carries no usage data."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding)
+            except Exception:
+                # Encodings are downloaded on first use; fall back when offline
+                self._encoding = None
+        self.name = f"tiktoken:{encoding}" if self._encoding else "heuristic"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        # Roughly one token per 4 characters of a word, one per punctuation mark
+        return sum(math.ceil(len(piece) / 4) for piece in _WORD_PATTERN.findall(text))
+
+
+def usage_from_response(response: Any) -> Optional[TokenCount]:
+    """Token counts reported by the provider (agent_framework usage_details), if any."""
+    usage = getattr(response, "usage_details", None)
+    if usage is None:
+        return None
+    prompt_tokens = getattr(usage, "input_token_count", None)
+    completion_tokens = getattr(usage, "output_token_count", None)
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+    return TokenCount(prompt_tokens or 0, completion_tokens or 0, "usage")
+
+
+class TokenAccounting:
+    """Collects per-iteration token counts and derives tokens/sec statistics."""
+
+    def __init__(self, estimator: Optional[TokenEstimator] = None):
+        self._estimator = estimator or TokenEstimator()
+        self._samples: List[TokenIterationSample] = []
+
+    def count(self, prompt: str, response: Any = None, response_text: Optional[str] = None) -> TokenCount:
+        """Token counts of one response: usage data first, local estimate otherwise."""
+        usage = usage_from_response(response)
+        if usage is not None:
+            return usage
+        if response_text is None:
+            response_text = getattr(response, "text", None) or (response if isinstance(response, str) else "")
+        return TokenCount(self._estimator.count(prompt), self._estimator.count(response_text), "estimated")
+
+    def record(
+        self,
+        wall_ms: float,
+        prompt: str,
+        response: Any = None,
+        response_text: Optional[str] = None,
+    ) -> TokenIterationSample:
+        """Record the tokens of one iteration."""
+        counts = self.count(prompt, response, response_text)
+        sample = TokenIterationSample(wall_ms, counts.prompt_tokens, counts.completion_tokens, counts.source)
+        self._samples.append(sample)
+        return sample
+
+    @property
+    def samples(self) -> List[TokenIterationSample]:
+        """Recorded iterations (live list, do not modify)."""
+        return self._samples
+
+    def get_result(self, elapsed_ms: Optional[float] = None) -> TokenResult:
+        """
+        Summarize token counts and throughput.
+
+        `elapsed_ms` is the wall time the iterations covered; it defaults to the sum of
+        iteration times, which is only right for sequential runs.
+        """
+        samples = self._samples
+        result = TokenResult(
+            iterations=len(samples),
+            estimated_iterations=sum(1 for s in samples if s.source == "estimated"),
+            tokenizer=self._estimator.name,
+            total_prompt_tokens=sum(s.prompt_tokens for s in samples),
+            total_completion_tokens=sum(s.completion_tokens for s in samples),
+        )
+        if not samples:
+            return result
+
+        result.elapsed_ms = elapsed_ms if elapsed_ms is not None else sum(s.wall_ms for s in samples)
+        if result.elapsed_ms > 0:
+            seconds = result.elapsed_ms / 1000
+            result.completion_throughput_tokens_per_second = result.total_completion_tokens / seconds
+            result.total_throughput_tokens_per_second = (
+                result.total_prompt_tokens + result.total_completion_tokens
+            ) / seconds
+
+        values = {
+            "prompt_tokens": [s.prompt_tokens for s in samples],
+            "completion_tokens": [s.completion_tokens for s in samples],
+            "completion_tokens_per_second": [
+                s.completion_tokens_per_second for s in samples if s.completion_tokens_per_second is not None
+            ],
+            "total_tokens_per_second": [
+                s.total_tokens_per_second for s in samples if s.total_tokens_per_second is not None
+            ],
+            "ms_per_completion_token": [s.wall_ms / s.completion_tokens for s in samples if s.completion_tokens > 0],
+        }
+        for name, series in values.items():
+            if series:
+                result.distributions[name] = describe(series)
+        return result
+
+
+def tokens_to_dict(result: TokenResult) -> dict:
+    """Token counts and tokens/sec distributions for Metrics.Tokens."""
+    names = {
+        "prompt_tokens": "PromptTokens",
+        "completion_tokens": "CompletionTokens",
+        "completion_tokens_per_second": "CompletionTokensPerSecond",
+        "total_tokens_per_second": "TotalTokensPerSecond",
+        "ms_per_completion_token": "MsPerCompletionToken",
+    }
+    return {
+        "Iterations": result.iterations,
+        "EstimatedIterations": result.estimated_iterations,
+        "Tokenizer": result.tokenizer,
+        "TotalPromptTokens": result.total_prompt_tokens,
+        "TotalCompletionTokens": result.total_completion_tokens,
+        "ElapsedMs": result.elapsed_ms,
+        "CompletionThroughputTokensPerSecond": result.completion_throughput_tokens_per_second,
+        "TotalThroughputTokensPerSecond": result.total_throughput_tokens_per_second,
+        "Distributions": {
+            names[name]: {
+                "Mean": stats["mean"],
+                "Min": stats["min"],
+                "P50": stats["p50"],
+                "P95": stats["p95"],
+                "P99": stats["p99"],
+                "Max": stats["max"],
+            }
+            for name, stats in result.distributions.items()
+        },
+    }
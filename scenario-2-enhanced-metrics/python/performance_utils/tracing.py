@@ -0,0 +1,253 @@
+"""
+Lightweight per-request phase tracing with local file exporters.
+
+Each agent request is split into contiguous phases by markers: the tracer opens
+"message_build" when the request starts, switches to "http_wait_first_byte" when the
+HTTP request is sent, to "response_parse" when the response headers arrive and to
+"tool_execution" while a tool runs. Spans are kept as tuples in a bounded in-memory
+buffer and can be exported as Chrome trace events or OpenTelemetry (OTLP) JSON.
+"""
+
+import contextvars
+import json
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .percentiles import percentile
+
+
+PHASE_MESSAGE_BUILD = "message_build"
+PHASE_HTTP_WAIT = "http_wait_first_byte"
+PHASE_RESPONSE_PARSE = "response_parse"
+PHASE_TOOL_EXECUTION = "tool_execution"
+ROOT_SPAN = "agent_run"
+
+# (trace_index, span_id, name, start_ns, end_ns, attributes)
+SpanRecord = Tuple[int, int, str, int, int, Optional[Dict[str, Any]]]
+
+
+class _ActiveRequest:
+    """Phase state of one in-flight request."""
+    __slots__ = ("trace_index", "root_span_id", "start_ns", "phase", "phase_start_ns", "attributes")
+
+    def __init__(self, trace_index: int, root_span_id: int, start_ns: int, attributes: Optional[Dict[str, Any]]):
+        self.trace_index = trace_index
+        self.root_span_id = root_span_id
+        self.start_ns = start_ns
+        self.phase = PHASE_MESSAGE_BUILD
+        self.phase_start_ns = start_ns
+        self.attributes = attributes
+
+
+_current_request: contextvars.ContextVar[Optional[_ActiveRequest]] = contextvars.ContextVar(
+    "performance_utils_current_request", default=None
+)
+
+
+class PhaseTracer:
+    """Records phase spans for agent requests into a bounded buffer."""
+
+    def __init__(self, service_name: str = "python-agent", buffer_size: int = 100000):
+        self.service_name = service_name
+        self._spans: Deque[SpanRecord] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._next_span_id = 1
+        self._next_trace_index = 0
+        self._dropped = 0
+        self._run_id = random.getrandbits(64)
+        # Wall clock offset so perf_counter_ns timestamps can be exported as Unix time
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def _new_span_id(self) -> int:
+        with self._lock:
+            span_id = self._next_span_id
+            self._next_span_id += 1
+            return span_id
+
+    def _record(self, record: SpanRecord):
+        if len(self._spans) == self._spans.maxlen:
+            self._dropped += 1
+        self._spans.append(record)
+
+    @contextmanager
+    def request(self, **attributes):
+        """Trace one agent request; phases recorded inside are attributed to it."""
+        with self._lock:
+            trace_index = self._next_trace_index
+            self._next_trace_index += 1
+        active = _ActiveRequest(trace_index, self._new_span_id(), time.perf_counter_ns(), attributes or None)
+        token = _current_request.set(active)
+        try:
+            yield active
+        finally:
+            end_ns = time.perf_counter_ns()
+            self._close_phase(active, end_ns)
+            self._record((trace_index, active.root_span_id, ROOT_SPAN, active.start_ns, end_ns, active.attributes))
+            _current_request.reset(token)
+
+    def _close_phase(self, active: _ActiveRequest, now_ns: int):
+        if now_ns > active.phase_start_ns:
+            self._record(
+                (active.trace_index, self._new_span_id(), active.phase, active.phase_start_ns, now_ns, None)
+            )
+
+    def mark(self, phase: str):
+        """Close the current phase of the active request and start `phase`."""
+        active = _current_request.get()
+        if active is None or active.phase == phase:
+            return
+        now_ns = time.perf_counter_ns()
+        self._close_phase(active, now_ns)
+        active.phase = phase
+        active.phase_start_ns = now_ns
+
+    def trace_tool(self, func: Callable) -> Callable:
+        """Decorate a tool so its execution is recorded as the tool_execution phase."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.mark(PHASE_TOOL_EXECUTION)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # The framework builds the follow-up request right after the tool returns
+                self.mark(PHASE_MESSAGE_BUILD)
+        return wrapper
+
+    def httpx_event_hooks(self) -> Dict[str, List[Callable]]:
+        """Async httpx event hooks marking request send and response headers."""
+        async def on_request(request):
+            self.mark(PHASE_HTTP_WAIT)
+
+        async def on_response(response):
+            self.mark(PHASE_RESPONSE_PARSE)
+
+        return {"request": [on_request], "response": [on_response]}
+
+    @property
+    def dropped_spans(self) -> int:
+        """Spans evicted because the buffer was full."""
+        return self._dropped
+
+    def spans(self) -> List[SpanRecord]:
+        """Snapshot of the buffered spans."""
+        return list(self._spans)
+
+    def phase_statistics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-request duration statistics (ms) of every phase.
+
+        Phases that occur several times in one request (e.g. one HTTP round trip per
+        tool call) are summed per request first.
+        """
+        per_request: Dict[str, Dict[int, float]] = {}
+        for trace_index, _, name, start_ns, end_ns, _ in self._spans:
+            totals = per_request.setdefault(name, {})
+            totals[trace_index] = totals.get(trace_index, 0.0) + (end_ns - start_ns) / 1e6
+
+        result: Dict[str, Dict[str, float]] = {}
+        for name, totals in per_request.items():
+            values = sorted(totals.values())
+            result[name] = {
+                "count": len(values),
+                "mean": statistics.mean(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+            }
+        return result
+
+    def export_chrome_trace(self, path: str):
+        """Write the spans in Chrome trace event format (chrome://tracing, Perfetto)."""
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": 1,
+                "args": {"name": self.service_name},
+            }
+        ]
+        for trace_index, _, name, start_ns, end_ns, attributes in self._spans:
+            event = {
+                "name": name,
+                "cat": "agent" if name == ROOT_SPAN else "phase",
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": 1,
+                # One row per request keeps concurrent requests readable
+                "tid": trace_index,
+            }
+            if attributes:
+                event["args"] = attributes
+            events.append(event)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_otlp_json(self, path: str):
+        """Write the spans as OTLP/JSON (the OpenTelemetry file exporter layout)."""
+        roots = {record[0]: record[1] for record in self._spans if record[2] == ROOT_SPAN}
+        otlp_spans = []
+        for trace_index, span_id, name, start_ns, end_ns, attributes in self._spans:
+            span = {
+                "traceId": f"{self._run_id:016x}{trace_index:016x}",
+                "spanId": f"{span_id:016x}",
+                "name": name,
+                "kind": 1 if name == ROOT_SPAN else 3,
+                "startTimeUnixNano": str(start_ns + self._epoch_offset_ns),
+                "endTimeUnixNano": str(end_ns + self._epoch_offset_ns),
+            }
+            if name != ROOT_SPAN and trace_index in roots:
+                span["parentSpanId"] = f"{roots[trace_index]:016x}"
+            if attributes:
+                span["attributes"] = [
+                    {"key": key, "value": {"stringValue": str(value)}} for key, value in attributes.items()
+                ]
+            otlp_spans.append(span)
+
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]
+                    },
+                    "scopeSpans": [{"scope": {"name": "performance_utils.tracing"}, "spans": otlp_spans}],
+                }
+            ]
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    def export(self, path: str, fmt: str = "chrome"):
+        """Export in 'chrome' or 'otlp' format."""
+        if fmt == "otlp":
+            self.export_otlp_json(path)
+        elif fmt == "chrome":
+            self.export_chrome_trace(path)
+        else:
+            raise ValueError(f"Unknown trace format '{fmt}', expected 'chrome' or 'otlp'")
+
+
+def phase_statistics_to_dict(stats: Dict[str, Dict[str, float]], dropped_spans: int = 0) -> dict:
+    """Per-phase latency statistics for Metrics.Phases."""
+    return {
+        "DroppedSpans": dropped_spans,
+        "Phases": {
+            name: {
+                "Count": values["count"],
+                "MeanMs": values["mean"],
+                "P50Ms": values["p50"],
+                "P95Ms": values["p95"],
+                "P99Ms": values["p99"],
+                "MaxMs": values["max"],
+            }
+            for name, values in stats.items()
+        },
+    }
@@ -0,0 +1,244 @@
+"""
+Workload definitions: prompt corpora and recorded trace replay.
+
+A prompt corpus is a JSONL file with one prompt per line:
+
+    {"prompt": "Summarize this ticket ...", "weight": 3, "expected_output_tokens": 120}
+
+"weight" (default 1) controls how often the prompt is sampled and the optional
+"expected_output_tokens" is compared with the measured completion tokens.
+
+A trace is a JSONL file of recorded requests with their arrival time, either as
+"timestamp" (Unix seconds or ISO 8601) or as "offset_ms" from the start of the trace:
+
+    {"timestamp": "2025-01-10T09:00:00.250Z", "prompt": "..."}
+
+Replay is open-loop: requests start at their original inter-arrival times (divided by
+the speed-up factor) whether or not earlier requests have finished.
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .percentiles import percentile
+
+
+@dataclass
+class PromptEntry:
+    """One prompt of a corpus."""
+    prompt: str
+    weight: float = 1.0
+    expected_output_tokens: Optional[int] = None
+    name: Optional[str] = None
+
+
+@dataclass
+class TraceEvent:
+    """One recorded request; offset_s is relative to the first request of the trace."""
+    offset_s: float
+    prompt: str
+    name: Optional[str] = None
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of a trace replay."""
+    events: int
+    speedup: float
+    completed: int = 0
+    errors: int = 0
+    scheduled_duration_ms: float = 0.0
+    actual_duration_ms: float = 0.0
+    max_in_flight: int = 0
+    start_lag_ms: Dict[str, float] = field(default_factory=dict)
+    error_messages: List[str] = field(default_factory=list)
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as ex:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({ex.msg})") from ex
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            record["_line"] = line_number
+            records.append(record)
+    return records
+
+
+def _prompt_of(record: dict, path: str) -> str:
+    prompt = record.get("prompt", record.get("text"))
+    if not isinstance(prompt, str) or not prompt:
+        raise ValueError(f"{path}:{record['_line']}: missing 'prompt'")
+    return prompt
+
+
+def load_corpus(path: str) -> List[PromptEntry]:
+    """Load a JSONL prompt corpus."""
+    entries = []
+    for record in _read_jsonl(path):
+        weight = float(record.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"{path}:{record['_line']}: 'weight' must be positive")
+        expected = record.get("expected_output_tokens")
+        entries.append(
+            PromptEntry(
+                prompt=_prompt_of(record, path),
+                weight=weight,
+                expected_output_tokens=int(expected) if expected is not None else None,
+                name=record.get("name"),
+            )
+        )
+    if not entries:
+        raise ValueError(f"{path}: corpus is empty")
+    return entries
+
+
+def _arrival_seconds(record: dict, path: str) -> float:
+    if "offset_ms" in record:
+        return float(record["offset_ms"]) / 1000
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+    raise ValueError(f"{path}:{record['_line']}: expected 'timestamp' or 'offset_ms'")
+
+
+def load_trace(path: str) -> List[TraceEvent]:
+    """Load a JSONL request trace, sorted by arrival time."""
+    arrivals = []
+    for record in _read_jsonl(path):
+        arrivals.append((_arrival_seconds(record, path), _prompt_of(record, path), record.get("name")))
+    if not arrivals:
+        raise ValueError(f"{path}: trace is empty")
+
+    arrivals.sort(key=lambda arrival: arrival[0])
+    first = arrivals[0][0]
+    return [TraceEvent(offset_s=arrival - first, prompt=prompt, name=name) for arrival, prompt, name in arrivals]
+
+
+class PromptSampler:
+    """Weighted, reproducible sampling of corpus prompts."""
+
+    def __init__(self, corpus: Sequence[PromptEntry], seed: Optional[int] = None):
+        if not corpus:
+            raise ValueError("corpus is empty")
+        self._corpus = list(corpus)
+        self._weights = [entry.weight for entry in self._corpus]
+        self._random = random.Random(seed)
+
+    def next(self) -> PromptEntry:
+        return self._random.choices(self._corpus, weights=self._weights)[0]
+
+
+async def replay_trace(
+    events: Sequence[TraceEvent],
+    handler: Callable[[int, TraceEvent], Awaitable[Any]],
+    speedup: float = 1.0,
+) -> ReplayResult:
+    """Start handler(index, event) for every event at its (sped-up) arrival time."""
+    if speedup <= 0:
+        raise ValueError("speedup must be positive")
+
+    loop = asyncio.get_running_loop()
+    result = ReplayResult(events=len(events), speedup=speedup)
+    if not events:
+        return result
+
+    in_flight = 0
+    lags: List[float] = []
+
+    async def run(index: int, event: TraceEvent):
+        nonlocal in_flight
+        in_flight += 1
+        result.max_in_flight = max(result.max_in_flight, in_flight)
+        try:
+            return await handler(index, event)
+        finally:
+            in_flight -= 1
+
+    start = loop.time()
+    tasks = []
+    for index, event in enumerate(events):
+        target = start + event.offset_s / speedup
+        delay = target - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # How late the request started compared to the trace (event loop or sleep granularity)
+        lags.append(max(0.0, loop.time() - target) * 1000)
+        tasks.append(asyncio.create_task(run(index, event)))
+
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    result.actual_duration_ms = (loop.time() - start) * 1000
+    result.scheduled_duration_ms = events[-1].offset_s / speedup * 1000
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            result.errors += 1
+            if len(result.error_messages) < 10:
+                result.error_messages.append(f"{type(outcome).__name__}: {outcome}")
+        else:
+            result.completed += 1
+
+    ordered = sorted(lags)
+    result.start_lag_ms = {
+        "mean": sum(ordered) / len(ordered),
+        "p95": percentile(ordered, 0.95),
+        "max": ordered[-1],
+    }
+    return result
+
+
+def workload_to_dict(
+    source: str,
+    entries_used: Sequence[PromptEntry],
+    completion_tokens: Sequence[Optional[int]] = (),
+    replay: Optional[ReplayResult] = None,
+) -> dict:
+    """Prompt source and prompt mix of a run for Metrics.Workload."""
+    data: Dict[str, Any] = {
+        "Source": source,
+        "Requests": len(entries_used),
+        "DistinctPrompts": len({entry.prompt for entry in entries_used}),
+        "MeanPromptChars": sum(len(entry.prompt) for entry in entries_used) / len(entries_used) if entries_used else 0,
+    }
+
+    # Measured vs expected output length, for prompts that declare one (None: served from cache)
+    pairs = [
+        (tokens, entry.expected_output_tokens)
+        for entry, tokens in zip(entries_used, completion_tokens)
+        if entry.expected_output_tokens and tokens is not None
+    ]
+    if pairs:
+        data["ExpectedOutputTokens"] = {
+            "Requests": len(pairs),
+            "MeanExpected": sum(expected for _, expected in pairs) / len(pairs),
+            "MeanActual": sum(actual for actual, _ in pairs) / len(pairs),
+            "MeanActualToExpectedRatio": sum(actual / expected for actual, expected in pairs) / len(pairs),
+        }
+
+    if replay is not None:
+        data["Replay"] = {
+            "Events": replay.events,
+            "Speedup": replay.speedup,
+            "Completed": replay.completed,
+            "Errors": replay.errors,
+            "ScheduledDurationMs": replay.scheduled_duration_ms,
+            "ActualDurationMs": replay.actual_duration_ms,
+            "MaxInFlight": replay.max_in_flight,
+            "StartLagMeanMs": replay.start_lag_ms.get("mean", 0.0),
+            "StartLagP95Ms": replay.start_lag_ms.get("p95", 0.0),
+            "StartLagMaxMs": replay.start_lag_ms.get("max", 0.0),
+            "ErrorMessages": replay.error_messages,
+        }
+    return data
@@ -1,15 +1,18 @@
 import asyncio
 import os
+import random
 import time
 import psutil
 import uuid
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from agent_framework.ollama import OllamaChatClient
+from ollama import AsyncClient
 
 app = FastAPI(title="Python Performance Backend")
 
@@ -29,6 +32,17 @@ class TestConfiguration(BaseModel):
     test_mode: str = "standard"
     batch_size: int = 10
     concurrent_requests: int = 5
+    # Concurrent mode: share of each concurrent group repeating a prompt of the same group,
+    # and whether identical in-flight prompts are coalesced onto one model call
+    duplicate_ratio: float = 0.0
+    coalesce_requests: bool = False
+    # Optional client-side load balancing over several Ollama hosts (overrides endpoint)
+    endpoints: List[str] = []
+    balancing_policy: str = "round_robin"  # round_robin, least_outstanding, ewma
+    # Per-attempt timeout and retries with jittered exponential backoff (retry_backoff_ms doubles per retry)
+    request_timeout_s: Optional[float] = None
+    max_retries: int = 0
+    retry_backoff_ms: float = 200.0
 
 class TestSession:
     def __init__(self, session_id: str, config: TestConfiguration):
@@ -53,6 +67,381 @@ class TestSession:
         self.error_message = None
         self.task = None
         self.cancel_event = asyncio.Event()
+        # Ollama server timings per iteration (summed over the chat calls of that iteration)
+        self.server_timings = []
+        self.single_flight = SingleFlight() if config.coalesce_requests else None
+        self.balancer = None
+        self.health_task = None
+        self.loop_lag = LoopLagProbe()
+        self.retry_policy = RetryPolicy(config.request_timeout_s, config.max_retries, config.retry_backoff_ms)
+
+class BalancedEndpoint:
+    def __init__(self, host: str):
+        self.host = host
+        self.client = AsyncClient(host=host)
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.health_check_failures = 0
+        self.ewma_ms = None
+        self.latency_total_ms = 0.0
+
+class EndpointBalancer:
+    """Spreads (non-streaming) chat calls over several Ollama hosts; unhealthy hosts are skipped."""
+    POLICIES = ("round_robin", "least_outstanding", "ewma")
+
+    def __init__(self, hosts: List[str], policy: str, alpha: float = 0.3, failure_threshold: int = 3):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown balancing policy '{policy}'")
+        self.policy = policy
+        self.endpoints = [BalancedEndpoint(host.rstrip("/")) for host in hosts]
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.next_index = 0
+
+    def pick(self) -> BalancedEndpoint:
+        candidates = [e for e in self.endpoints if e.healthy] or self.endpoints
+        start = self.next_index % len(candidates)
+        self.next_index += 1
+        rotated = candidates[start:] + candidates[:start]
+        if self.policy == "least_outstanding":
+            return min(rotated, key=lambda e: e.outstanding)
+        if self.policy == "ewma":
+            measured = [e.ewma_ms for e in candidates if e.ewma_ms is not None]
+            prior = sum(measured) / len(measured) if measured else 0.0
+            return min(rotated, key=lambda e: ((prior if e.ewma_ms is None else e.ewma_ms) * (e.outstanding + 1), e.outstanding))
+        return rotated[0]
+
+    async def chat(self, *args, **kwargs):
+        endpoint = self.pick()
+        endpoint.requests += 1
+        endpoint.outstanding += 1
+        start = time.perf_counter()
+        try:
+            response = await endpoint.client.chat(*args, **kwargs)
+        except BaseException:
+            endpoint.errors += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.healthy = False
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        latency_ms = (time.perf_counter() - start) * 1000
+        endpoint.consecutive_failures = 0
+        endpoint.latency_total_ms += latency_ms
+        endpoint.ewma_ms = latency_ms if endpoint.ewma_ms is None else self.alpha * latency_ms + (1 - self.alpha) * endpoint.ewma_ms
+        return response
+
+    def __getattr__(self, name: str):
+        # Anything other than chat goes to the first host
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.endpoints[0].client, name)
+
+    async def health_check_loop(self, interval_s: float = 10.0):
+        """Probe every host (GET /api/tags) until cancelled; a successful probe restores a host."""
+        while True:
+            for endpoint in self.endpoints:
+                try:
+                    await asyncio.wait_for(endpoint.client.list(), 5.0)
+                    endpoint.healthy = True
+                    endpoint.consecutive_failures = 0
+                except Exception:
+                    endpoint.health_check_failures += 1
+                    endpoint.healthy = False
+            await asyncio.sleep(interval_s)
+
+    def status(self) -> list:
+        return [
+            {
+                "host": e.host,
+                "healthy": e.healthy,
+                "requests": e.requests,
+                "errors": e.errors,
+                "outstanding": e.outstanding,
+                "ewmaMs": e.ewma_ms,
+            }
+            for e in self.endpoints
+        ]
+
+    def to_dict(self) -> dict:
+        total = sum(e.requests for e in self.endpoints)
+        return {
+            "Policy": self.policy,
+            "Requests": total,
+            "Errors": sum(e.errors for e in self.endpoints),
+            "Endpoints": [
+                {
+                    "Host": e.host,
+                    "Healthy": e.healthy,
+                    "Requests": e.requests,
+                    "Share": e.requests / total if total else 0,
+                    "Errors": e.errors,
+                    "HealthCheckFailures": e.health_check_failures,
+                    "EwmaMs": e.ewma_ms,
+                    "MeanLatencyMs": e.latency_total_ms / (e.requests - e.errors) if e.requests > e.errors else None,
+                }
+                for e in self.endpoints
+            ],
+        }
+
+class SingleFlight:
+    """Coalesces identical in-flight requests onto one model call and shares its outcome."""
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.requests = 0
+        self.model_calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, fn):
+        self.requests += 1
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: a cancelled follower must not cancel the call other requests wait on
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        self.model_calls += 1
+        try:
+            result = await fn()
+        except BaseException as ex:
+            if isinstance(ex, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(ex)
+                future.exception()  # retrieved, even when nobody else was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.in_flight[key]
+
+    def to_dict(self) -> dict:
+        return {
+            "Requests": self.requests,
+            "ModelCalls": self.model_calls,
+            "CoalescedRequests": self.coalesced,
+            "CoalescedRatio": self.coalesced / self.requests if self.requests else 0,
+        }
+
+def _percentile(sorted_values: list, percentile: float) -> float:
+    """Percentile of sorted values with linear interpolation between neighbouring ranks."""
+    index = percentile * (len(sorted_values) - 1)
+    lower = int(index)
+    if lower + 1 >= len(sorted_values):
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[lower + 1] - sorted_values[lower]) * (index - lower)
+
+class LoopLagProbe:
+    """Records how late a periodic callback runs, i.e. how long the event loop was blocked."""
+    def __init__(self, interval_ms: float = 10.0, stall_threshold_ms: float = 50.0):
+        self.interval_ms = interval_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.lags_ms: List[float] = []
+        # Worst lag per second since start, for the timeline
+        self.timeline: List[float] = []
+        self.handle = None
+        self.start_time = 0.0
+        self.expected = 0.0
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.schedule()
+
+    def schedule(self):
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.handle = asyncio.get_running_loop().call_later(self.interval_ms / 1000, self.probe)
+
+    def probe(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self.expected) * 1000)
+        self.lags_ms.append(lag_ms)
+        second = int(now - self.start_time)
+        self.timeline.extend([0.0] * (second + 1 - len(self.timeline)))
+        self.timeline[second] = max(self.timeline[second], lag_ms)
+        self.schedule()
+
+    def stop(self):
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+
+    def percentile(self, percentile: float) -> float:
+        return _percentile(sorted(self.lags_ms), percentile) if self.lags_ms else 0.0
+
+    def status(self) -> dict:
+        return {
+            "lastMs": self.lags_ms[-1] if self.lags_ms else 0,
+            "p99Ms": self.percentile(0.99),
+            "maxMs": max(self.lags_ms, default=0),
+            "stalls": sum(1 for lag in self.lags_ms if lag >= self.stall_threshold_ms),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "IntervalMs": self.interval_ms,
+            "Samples": len(self.lags_ms),
+            "MeanMs": sum(self.lags_ms) / len(self.lags_ms) if self.lags_ms else 0,
+            "P50Ms": self.percentile(0.50),
+            "P95Ms": self.percentile(0.95),
+            "P99Ms": self.percentile(0.99),
+            "MaxMs": max(self.lags_ms, default=0),
+            "StallThresholdMs": self.stall_threshold_ms,
+            "Stalls": sum(1 for lag in self.lags_ms if lag >= self.stall_threshold_ms),
+            "MaxPerSecondMs": self.timeline,
+        }
+
+class RetryPolicy:
+    """Runs a request with a per-attempt timeout and jittered exponential backoff retries, counting every attempt."""
+    def __init__(self, timeout_s: Optional[float], max_retries: int, backoff_ms: float):
+        self.timeout_s = timeout_s
+        self.max_retries = max(0, max_retries)
+        self.backoff_ms = backoff_ms
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.backoff_total_ms = 0.0
+        self.attempt_errors: Dict[str, int] = {}
+        self.first_attempt_ms: List[float] = []
+        self.retried_ms: List[float] = []
+
+    async def call(self, fn):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            self.attempts += 1
+            try:
+                result = await (asyncio.wait_for(fn(), self.timeout_s) if self.timeout_s else fn())
+            except Exception as ex:
+                error_class = "timeout" if isinstance(ex, asyncio.TimeoutError) else type(ex).__name__
+                self.attempt_errors[error_class] = self.attempt_errors.get(error_class, 0) + 1
+                if error_class == "timeout":
+                    self.timeouts += 1
+                if attempt == self.max_retries:
+                    raise
+                delay_ms = random.uniform(0, self.backoff_ms * 2 ** attempt)
+                self.retries += 1
+                self.backoff_total_ms += delay_ms
+                await asyncio.sleep(delay_ms / 1000)
+                continue
+            (self.first_attempt_ms if attempt == 0 else self.retried_ms).append((time.perf_counter() - start) * 1000)
+            return result
+
+    def status(self) -> dict:
+        return {"retries": self.retries, "timeouts": self.timeouts}
+
+    def to_dict(self) -> dict:
+        def mean(values):
+            return sum(values) / len(values) if values else None
+        return {
+            "TimeoutS": self.timeout_s,
+            "MaxRetries": self.max_retries,
+            "Attempts": self.attempts,
+            "Retries": self.retries,
+            "RetriedRequests": len(self.retried_ms),
+            "Timeouts": self.timeouts,
+            "BackoffTotalMs": self.backoff_total_ms,
+            "FirstAttemptMeanMs": mean(self.first_attempt_ms),
+            "RetriedMeanMs": mean(self.retried_ms),
+            "AttemptErrors": self.attempt_errors,
+        }
+
+def build_prompts(config: TestConfiguration) -> list:
+    """Prompts of a test run; in concurrent mode duplicate_ratio of each group repeats an earlier prompt of the group."""
+    group_size = config.concurrent_requests if config.test_mode == "concurrent" else 1
+    rng = random.Random(42)
+    prompts = []
+    for i in range(config.iterations):
+        group = prompts[i - i % group_size:]
+        if group and rng.random() < config.duplicate_ratio:
+            prompts.append(rng.choice(group))
+        else:
+            prompts.append(f"Say hello {i + 1}")
+    return prompts
+
+# Ollama response fields (nanoseconds / token counts) captured per iteration
+SERVER_TIMING_FIELDS = {
+    "total_duration": "server_total_ms",
+    "load_duration": "load_ms",
+    "prompt_eval_duration": "prompt_eval_ms",
+    "eval_duration": "eval_ms",
+}
+
+# Timings of the iteration running in the current task (concurrent iterations run in separate tasks)
+pending_server_timing: ContextVar[Optional[dict]] = ContextVar("pending_server_timing", default=None)
+
+def record_server_timing(response) -> None:
+    """Add the timings of one Ollama chat response to the iteration in progress."""
+    pending = pending_server_timing.get()
+    if pending is None:
+        return
+    def field(name):
+        value = getattr(response, name, None)
+        if value is None and isinstance(response, dict):
+            value = response.get(name)
+        return value or 0
+    pending["chat_calls"] += 1
+    for source, target in SERVER_TIMING_FIELDS.items():
+        pending[target] += field(source) / 1_000_000
+    pending["prompt_eval_count"] += field("prompt_eval_count")
+    pending["eval_count"] += field("eval_count")
+
+def instrument_ollama_client(client):
+    """Wrap client.chat so server-side timings of every response reach the iteration in progress."""
+    original_chat = client.chat
+
+    async def record_stream(stream):
+        async for chunk in stream:
+            # Only the final chunk carries the timings
+            if getattr(chunk, "done", False):
+                record_server_timing(chunk)
+            yield chunk
+
+    async def chat(*args, **kwargs):
+        response = await original_chat(*args, **kwargs)
+        if kwargs.get("stream"):
+            return record_stream(response)
+        record_server_timing(response)
+        return response
+
+    client.chat = chat
+    return client
+
+def summarize_server_timings(timings: list) -> dict:
+    """Distributions of server phases, client overhead (wall - server total) and token rates."""
+    timed = [t for t in timings if t["server_total_ms"] > 0]
+    series = {
+        "ServerTotalMs": [t["server_total_ms"] for t in timed],
+        "LoadMs": [t["load_ms"] for t in timed],
+        "PromptEvalMs": [t["prompt_eval_ms"] for t in timed],
+        "EvalMs": [t["eval_ms"] for t in timed],
+        "ClientOverheadMs": [t["wall_ms"] - t["server_total_ms"] for t in timed],
+        "PromptTokensPerSecond": [t["prompt_eval_count"] / (t["prompt_eval_ms"] / 1000) for t in timed if t["prompt_eval_ms"] > 0],
+        "GenerationTokensPerSecond": [t["eval_count"] / (t["eval_ms"] / 1000) for t in timed if t["eval_ms"] > 0],
+    }
+    def describe(values):
+        ordered = sorted(values)
+        return {
+            "Mean": sum(ordered) / len(ordered),
+            "Min": ordered[0],
+            "P50": _percentile(ordered, 0.50),
+            "P95": _percentile(ordered, 0.95),
+            "P99": _percentile(ordered, 0.99),
+            "Max": ordered[-1],
+        }
+    wall_total = sum(t["wall_ms"] for t in timed)
+    return {
+        "Iterations": len(timings),
+        "IterationsWithoutTiming": len(timings) - len(timed),
+        "TotalPromptTokens": sum(t["prompt_eval_count"] for t in timed),
+        "TotalGeneratedTokens": sum(t["eval_count"] for t in timed),
+        "ClientOverheadFraction": (sum(t["wall_ms"] - t["server_total_ms"] for t in timed) / wall_total) if wall_total > 0 else 0,
+        "Distributions": {name: describe(values) for name, values in series.items() if values},
+    }
 
 # Global state
 current_session: Optional[TestSession] = None
@@ -91,6 +480,8 @@ async def start_test(config: TestConfiguration):
     session.failure_count = 0
     session.iterations_per_second = 0
     session.estimated_time_remaining_ms = 0
+    session.server_timings = []
+    session.single_flight = SingleFlight() if config.coalesce_requests else None
 
     # Start background task
     session.task = asyncio.create_task(execute_test(session))
@@ -125,6 +516,10 @@ async def get_status(sessionId: Optional[str] = None):
     min_time = min(session.iteration_times) if session.iteration_times else 0
     max_time = max(session.iteration_times) if session.iteration_times else 0
     
+    timed = [t for t in session.server_timings if t["server_total_ms"] > 0]
+    avg_server_ms = sum(t["server_total_ms"] for t in timed) / len(timed) if timed else 0
+    avg_overhead_ms = sum(t["wall_ms"] - t["server_total_ms"] for t in timed) / len(timed) if timed else 0
+    
     progress_percentage = (session.current_iteration / session.total_iterations * 100) if session.total_iterations > 0 else 0
     
     return {
@@ -144,6 +539,13 @@ async def get_status(sessionId: Optional[str] = None):
         "successCount": session.success_count,
         "failureCount": session.failure_count,
         "memoryUsedMB": session.memory_used_mb,
+        "averageServerTimeMs": avg_server_ms,
+        "averageClientOverheadMs": avg_overhead_ms,
+        "coalescedRequests": session.single_flight.coalesced if session.single_flight else 0,
+        "endpoints": session.balancer.status() if session.balancer else None,
+        "loopLag": session.loop_lag.status(),
+        "resilience": session.retry_policy.status(),
+        "modelCalls": session.single_flight.model_calls if session.single_flight else session.current_iteration,
         "warmupSuccessful": session.warmup_successful,
         "warmupTimeMs": session.warmup_time_ms,
         "errorMessage": session.error_message,
@@ -153,6 +555,7 @@ async def get_status(sessionId: Optional[str] = None):
 
 async def execute_test(session: TestSession):
     try:
+        session.loop_lag.start()
         start_time = time.time()
         process = psutil.Process(os.getpid())
         start_memory = process.memory_info().rss / 1024 / 1024
@@ -161,8 +564,14 @@ async def execute_test(session: TestSession):
         os.environ["OLLAMA_HOST"] = session.configuration.endpoint
         os.environ["OLLAMA_CHAT_MODEL_ID"] = session.configuration.model
         
-        # Create agent
-        agent = OllamaChatClient(model_id=session.configuration.model).create_agent(
+        # Create agent; the instrumented client captures Ollama's server-side timings
+        if session.configuration.endpoints:
+            session.balancer = EndpointBalancer(session.configuration.endpoints, session.configuration.balancing_policy)
+            session.health_task = asyncio.create_task(session.balancer.health_check_loop())
+            client = instrument_ollama_client(session.balancer)
+        else:
+            client = instrument_ollama_client(AsyncClient(host=session.configuration.endpoint))
+        agent = OllamaChatClient(model_id=session.configuration.model, client=client).create_agent(
             name="PerformanceTestAgent",
             instructions="You are a helpful assistant. Provide brief, concise responses.",
         )
@@ -177,15 +586,23 @@ async def execute_test(session: TestSession):
         except Exception as ex:
             print(f"Warmup failed: {ex}")
         
-        # Run iterations
-        for i in range(session.configuration.iterations):
-            if session.cancel_event.is_set():
-                break
-            
+        prompts = build_prompts(session.configuration)
+        concurrency = max(1, session.configuration.concurrent_requests) if session.configuration.test_mode == "concurrent" else 1
+
+        async def run_iteration(i: int):
+            prompt = prompts[i]
             iteration_start = time.time()
             success = False
+            pending = {
+                "chat_calls": 0, "server_total_ms": 0.0, "load_ms": 0.0, "prompt_eval_ms": 0.0,
+                "eval_ms": 0.0, "prompt_eval_count": 0, "eval_count": 0,
+            }
+            pending_server_timing.set(pending)
             try:
-                await agent.run(f"Say hello {i + 1}")
+                if session.single_flight:
+                    await session.single_flight.run(prompt, lambda: session.retry_policy.call(lambda: agent.run(prompt)))
+                else:
+                    await session.retry_policy.call(lambda: agent.run(prompt))
                 success = True
             except Exception as ex:
                 print(f"Iteration {i + 1} failed: {ex}")
@@ -193,8 +610,11 @@ async def execute_test(session: TestSession):
             iteration_end = time.time()
 
             last_ms = (iteration_end - iteration_start) * 1000
+            pending["wall_ms"] = last_ms
+            pending_server_timing.set(None)
+            session.server_timings.append(pending)
             session.iteration_times.append(last_ms)
-            session.current_iteration = i + 1
+            session.current_iteration += 1
             session.last_iteration_time_ms = last_ms
             session.elapsed_time_ms = (time.time() - start_time) * 1000
             if success:
@@ -206,7 +626,20 @@ async def execute_test(session: TestSession):
             total_sec = max(1, session.elapsed_time_ms) / 1000.0
             session.iterations_per_second = session.current_iteration / total_sec
             avg = sum(session.iteration_times) / len(session.iteration_times) if session.iteration_times else 0
-            session.estimated_time_remaining_ms = (session.configuration.iterations - session.current_iteration) * avg
+            session.estimated_time_remaining_ms = (session.configuration.iterations - session.current_iteration) * avg / concurrency
+
+        # Run iterations, in groups of concurrent_requests in concurrent mode
+        for group_start in range(0, session.configuration.iterations, concurrency):
+            if session.cancel_event.is_set():
+                break
+            group = range(group_start, min(group_start + concurrency, session.configuration.iterations))
+            if concurrency == 1:
+                await run_iteration(group_start)
+            else:
+                await asyncio.gather(*(run_iteration(i) for i in group))
+        if session.health_task:
+            session.health_task.cancel()
+        session.loop_lag.stop()
         
         end_time = time.time()
         end_memory = process.memory_info().rss / 1024 / 1024
@@ -227,7 +660,9 @@ async def execute_test(session: TestSession):
                     "Framework": "Python",
                     "Provider": "Ollama",
                     "Model": session.configuration.model,
-                    "Endpoint": session.configuration.endpoint,
+                    "Endpoint": ", ".join(session.configuration.endpoints) or session.configuration.endpoint,
+                    "TestMode": session.configuration.test_mode,
+                    "EventLoop": "uvloop" if type(asyncio.get_running_loop()).__module__.startswith("uvloop") else "asyncio",
                     "Timestamp": current_timestamp.isoformat(),
                     "WarmupSuccessful": session.warmup_successful,
                     "WarmupTimeMs": session.warmup_time_ms
@@ -241,9 +676,16 @@ async def execute_test(session: TestSession):
                     "MaxIterationTimeMs": max(session.iteration_times) if session.iteration_times else 0,
                     "MemoryUsedMB": session.memory_used_mb,
                     "SuccessCount": session.success_count,
-                    "FailureCount": session.failure_count
+                    "FailureCount": session.failure_count,
+                    "ServerTiming": summarize_server_timings(session.server_timings)
                 }
             }
+            if session.single_flight:
+                metrics_data["Metrics"]["SingleFlight"] = session.single_flight.to_dict()
+            if session.balancer:
+                metrics_data["Metrics"]["LoadBalancer"] = session.balancer.to_dict()
+            metrics_data["Metrics"]["LoopLag"] = session.loop_lag.to_dict()
+            metrics_data["Metrics"]["Resilience"] = session.retry_policy.to_dict()
 
             stamp = current_timestamp.strftime("%Y%m%d_%H%M%S")
             filename = f"metrics_python_ollama_{stamp}.json"
@@ -255,6 +697,9 @@ async def execute_test(session: TestSession):
             print(f"Failed to export metrics JSON: {ex}")
         
     except Exception as ex:
+        if session.health_task:
+            session.health_task.cancel()
+        session.loop_lag.stop()
         session.status = "Failed"
         session.error_message = str(ex)
         print(f"Test failed: {ex}")
@@ -281,4 +726,5 @@ def get_machine_info() -> dict:
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5001)
+    # EVENT_LOOP=asyncio|uvloop pins the loop; uvicorn's default "auto" uses uvloop when installed
+    uvicorn.run(app, host="0.0.0.0", port=5001, loop=os.getenv("EVENT_LOOP", "auto"))